@@ -0,0 +1,84 @@
+import cv2
+import os
+import sys
+
+# Rendre le paquet commun tracking_bench importable depuis ce répertoire
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from tracking_bench.display import create_display
+from tracking_bench.hybrid import TrackerHybrid_create
+from tracking_bench.recovery import with_recovery
+from tracking_bench.streams import MultiStreamRunner, save_streams_to_file
+from tracking_bench.warm import TrackerPool
+
+# Liste des trackers disponibles
+TRACKER_TYPES = {
+    "BOOSTING": cv2.legacy.TrackerBoosting_create,
+    "MIL": cv2.legacy.TrackerMIL_create,
+    "KCF": cv2.legacy.TrackerKCF_create,
+    "TLD": cv2.legacy.TrackerTLD_create,
+    "MEDIANFLOW": cv2.legacy.TrackerMedianFlow_create,
+    "MOSSE": cv2.legacy.TrackerMOSSE_create,
+    "CSRT": cv2.legacy.TrackerCSRT_create,
+    "HYBRID": TrackerHybrid_create,
+}
+
+# Flux à suivre : source (index de webcam, ou chemin d'une vidéo rejouée comme une caméra), tracker,
+# ROI (None : sélection sur la première frame) et fréquence de relecture d'une vidéo (None : celle du fichier)
+FLUX = [
+    {"source": 0, "tracker": "KCF", "roi": None},
+    {"source": os.path.join("test 3", "voitures.mp4"), "tracker": "MOSSE", "roi": None, "fps": 30},
+    {"source": os.path.join("test 3", "voitures.mp4"), "tracker": "CSRT", "roi": None, "fps": 30},
+    {"source": "Projet2_DIP.mp4", "tracker": "KCF", "roi": None, "fps": 30},
+]
+
+# Nombre de threads de suivi partagés par tous les flux (cœurs consommés par le nœud)
+NB_WORKERS = os.cpu_count()
+# Durée maximale de l'essai en secondes (None : jusqu'à la fin des vidéos ; 'q' dans l'aperçu pour arrêter)
+DUREE_MAX = 60
+# Aperçu d'une frame sur N de chaque flux dans un thread séparé (0 : aucun aperçu)
+APERCU_CHAQUE = 5
+# Répertoire des vidéos annotées de chaque flux (None : aucune vidéo écrite)
+SORTIE_VIDEOS = None
+# Reprise automatique d'une cible perdue
+REPRISE_AUTO = True
+# Fichier du bilan par flux
+BILAN = "multi_flux_results.txt"
+
+
+# Programme principal
+if __name__ == "__main__":
+    if SORTIE_VIDEOS is not None:
+        os.makedirs(SORTIE_VIDEOS, exist_ok=True)
+
+    runner = MultiStreamRunner(NB_WORKERS, create_display(headless=True, preview_every=APERCU_CHAQUE), SORTIE_VIDEOS)
+
+    # Ouvrir chaque flux et initialiser son tracker (sélection des ROI manquantes) ; avec la reprise
+    # automatique, chaque flux a sa réserve de trackers pour réinitialiser en arrière-plan
+    pools = []
+    for flux in FLUX:
+        tracker_create = TRACKER_TYPES[flux["tracker"]]
+        if REPRISE_AUTO:
+            pools.append(TrackerPool(tracker_create))
+            tracker_create = with_recovery(tracker_create, pool=pools[-1])
+        print(f"Ouverture du flux : {flux['source']} ({flux['tracker']})")
+        runner.add(flux["source"], flux["tracker"], tracker_create, flux.get("roi"), flux.get("fps"))
+
+    if not runner.streams:
+        print("Aucun flux ouvert.")
+        exit()
+
+    print(f"Suivi de {len(runner.streams)} flux sur {NB_WORKERS} threads.")
+    reports = runner.run(DUREE_MAX)
+    for pool in pools:
+        pool.close()
+
+    # Bilan par flux : débit, pertes et délais, pour dimensionner le nombre de flux par nœud
+    for report in reports:
+        print(f"{report['stream']} ({report['tracker']}) : {report['fps']:.1f} FPS, "
+              f"traitées {report['processed']}, perdues {report['dropped']}, "
+              f"délai p95 {report['latency_p95_ms']:.1f} ms, update p95 {report['update_p95_ms']:.1f} ms, "
+              f"attente p95 {report['wait_p95_ms']:.1f} ms, erreurs {report['errors']}, temps réel : {'oui' if report['realtime'] else 'non'}")
+
+    save_streams_to_file(reports, BILAN, NB_WORKERS, runner.elapsed)
+    print(f"Bilan enregistré dans : {BILAN}")
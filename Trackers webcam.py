@@ -1,4 +1,16 @@
 import cv2
+import os
+import sys
+
+# Rendre le paquet commun tracking_bench importable depuis ce répertoire
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from tracking_bench.capture import ReplayCapture, ThreadedCapture
+from tracking_bench.hybrid import TrackerHybrid_create
+from tracking_bench.multi import MultiObjectTracker
+from tracking_bench.recovery import with_recovery
+from tracking_bench.tuner import load_tuned_config, tuned_tracker
+from tracking_bench.warm import TrackerPool
 
 # Liste des trackers à tester
 TRACKER_TYPES = {
@@ -9,14 +21,36 @@ TRACKER_TYPES = {
     "MEDIANFLOW": cv2.legacy.TrackerMedianFlow_create,
     "MOSSE": cv2.legacy.TrackerMOSSE_create,
     "CSRT": cv2.legacy.TrackerCSRT_create,
+    "HYBRID": TrackerHybrid_create,
 }
 
 # Choisir le tracker
 tracker_name = "CSRT"  # Remplacez par le nom du tracker souhaité
-tracker = TRACKER_TYPES[tracker_name]()
 
-# Capture vidéo depuis la webcam
-cap = cv2.VideoCapture(0)
+# Configuration de l'auto-réglage (python -m tracking_bench.tuner) : si le fichier existe, son tracker et
+# son échelle remplacent le choix ci-dessus (ignorée si elle a été réglée sur une autre vidéo que SOURCE)
+CONFIG_AUTO = "tuned_config.json"
+
+# Suivre plusieurs objets (un tracker par objet, mis à jour en parallèle)
+MULTI_OBJETS = False
+
+# Reprise automatique d'une cible perdue : recherche autour de la position prédite, puis réinitialisation
+REPRISE_AUTO = True
+
+# Source : index de la webcam, ou chemin d'une vidéo rejouée au rythme d'une caméra
+SOURCE = 0
+# Fréquence de relecture d'une vidéo (None : fréquence nominale du fichier) et gigue de capture en ms
+REPLAY_FPS = None
+REPLAY_JITTER_MS = 1.0
+
+# Couleurs des boîtes des différents objets
+COLORS = [(0, 255, 0), (255, 128, 0), (0, 128, 255), (255, 0, 255), (0, 255, 255), (255, 255, 0)]
+
+# Capture vidéo depuis la webcam sur un thread dédié : le tracker reçoit toujours la frame la plus récente
+if isinstance(SOURCE, int):
+    cap = ThreadedCapture(SOURCE).start()
+else:
+    cap = ThreadedCapture(ReplayCapture(SOURCE, REPLAY_FPS, jitter_ms=REPLAY_JITTER_MS)).start()
 
 if not cap.isOpened():
     print("Erreur : Impossible d'ouvrir la webcam.")
@@ -28,31 +62,114 @@ if not ret:
     print("Erreur : Impossible de lire le flux vidéo.")
     exit()
 
-# Sélectionner l'objet à suivre
-roi = cv2.selectROI("Sélectionnez l'objet", frame, fromCenter=False, showCrosshair=True)
-tracker.init(frame, roi)
+# Tracker choisi (ou retenu par l'auto-réglage)
+config = load_tuned_config(CONFIG_AUTO, SOURCE)
+if config is not None:
+    tracker_name, base_create = tuned_tracker(config, TRACKER_TYPES)
+    print(f"Configuration de l'auto-réglage : {tracker_name} (update p95 {config['update_p95_ms']:.1f} ms "
+          f"pour un budget de {config['budget_ms']:.1f} ms)")
+else:
+    base_create = TRACKER_TYPES[tracker_name]
+
+# Préparer les trackers en arrière-plan (passage à blanc pendant la sélection de la ROI)
+pool = TrackerPool(base_create, frame_shape=frame.shape)
+
+# Sélectionner le ou les objets à suivre (Entrée pour valider chaque ROI, Échap pour terminer)
+if MULTI_OBJETS:
+    rois = cv2.selectROIs("Sélectionnez l'objet", frame, fromCenter=False, showCrosshair=True)
+else:
+    rois = [cv2.selectROI("Sélectionnez l'objet", frame, fromCenter=False, showCrosshair=True)]
 cv2.destroyWindow("Sélectionnez l'objet")
 
+if REPRISE_AUTO:
+    # La reprise initialise et réinitialise elle-même le tracker suivi via la réserve, en arrière-plan
+    tracker = MultiObjectTracker(with_recovery(base_create, pool=pool))
+else:
+    tracker = MultiObjectTracker(base_create, pool=pool)
+for roi in rois:
+    tracker.add(frame, tuple(int(v) for v in roi))
+
+# Budget de temps d'une frame d'après la fréquence de la caméra
+camera_fps = cap.get(cv2.CAP_PROP_FPS) or 30
+budget_ms = 1000 / camera_fps
+
+# Ne pas compter les frames jetées pendant la sélection de la ROI
+cap.reset_stats()
+
 while True:
     ret, frame = cap.read()
     if not ret:
         break
 
-    # Mettre à jour le tracker
-    success, box = tracker.update(frame)
-
-    if success:
-        x, y, w, h = [int(v) for v in box]
-        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-    else:
-        cv2.putText(frame, "Echec du suivi !", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (0, 0, 255), 2)
+    # Mettre à jour les trackers de tous les objets
+    for index, (success, box) in enumerate(tracker.update(frame)):
+        if success:
+            x, y, w, h = [int(v) for v in box]
+            cv2.rectangle(frame, (x, y), (x + w, y + h), COLORS[index % len(COLORS)], 2)
+        elif (tracker.objects[index]["pending"] is not None
+              or getattr(tracker.objects[index]["tracker"], "reinitialising", False)):
+            cv2.putText(frame, f"Reinitialisation de l'objet {index + 1}...", (10, 110 + 25 * index),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+        elif getattr(tracker.objects[index]["tracker"], "searching", False):
+            cv2.putText(frame, f"Recherche de l'objet {index + 1}...", (10, 110 + 25 * index),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+        elif len(tracker.objects) == 1:
+            cv2.putText(frame, "Echec du suivi !", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (0, 0, 255), 2)
+        else:
+            cv2.putText(frame, f"Echec du suivi de l'objet {index + 1} !", (10, 110 + 25 * index),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
 
+    report = tracker.budget_report(budget_ms)
     cv2.putText(frame, f"Suivi avec {tracker_name}", (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (255, 255, 255), 2)
+    cv2.putText(frame, f"Budget : {report['last_ms']:.1f} / {budget_ms:.1f} ms", (300, 20), cv2.FONT_HERSHEY_SIMPLEX,
+                0.6, (255, 255, 255) if report['last_ms'] <= budget_ms else (0, 0, 255), 2)
+    cv2.putText(frame, f"Frames perdues : {cap.frames_dropped}", (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
     cv2.imshow("Suivi en temps réel", frame)
+    cap.record_display()
 
     # Quitter avec la touche 'q'
-    if cv2.waitKey(1) & 0xFF == ord('q'):
+    key = cv2.waitKey(1) & 0xFF
+    if key == ord('q'):
         break
 
+    # Réinitialiser avec la touche 'r' : nouvelle ROI pour le premier objet perdu (ou le premier objet)
+    if key == ord('r'):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        lost = [index for index, obj in enumerate(tracker.objects) if not obj["success"]]
+        roi = cv2.selectROI("Sélectionnez l'objet", frame, fromCenter=False, showCrosshair=True)
+        cv2.destroyWindow("Sélectionnez l'objet")
+        if roi[2] > 0 and roi[3] > 0:
+            # L'init se fait en arrière-plan : la boucle continue sans se figer
+            tracker.reinit(lost[0] if lost else 0, frame, tuple(int(v) for v in roi))
+
 cap.release()
+tracker.close()
+pool.close()
 cv2.destroyAllWindows()
+
+# Bilan de la capture
+stats = cap.stats()
+print(f"Frames capturées : {stats['captured']}, traitées : {stats['delivered']}, perdues : {stats['dropped']}")
+print(f"Délai capture → affichage (ms) : p50 {stats['latency_p50_ms']:.1f}, "
+      f"p95 {stats['latency_p95_ms']:.1f}, max {stats['latency_max_ms']:.1f}")
+
+# Bilan du budget par frame et de l'état de chaque objet
+report = tracker.budget_report(budget_ms)
+print(f"Durée de suivi par frame (ms) : p50 {report['p50_ms']:.1f}, p95 {report['p95_ms']:.1f} "
+      f"pour un budget de {budget_ms:.1f} ; hors budget : {report['over_budget']}/{report['frames']} frames, "
+      f"gain du parallélisme : x{report['speedup']:.2f}")
+for index, obj in enumerate(tracker.objects):
+    print(f"Objet {index + 1} : {'suivi' if obj['success'] else 'perdu'}, frames en échec : {obj['failures']}")
+    if hasattr(obj["tracker"], "recovery_stats"):
+        recovery = obj["tracker"].recovery_stats()
+        print(f"  Pertes : {recovery['losses']}, reprises automatiques : {recovery['recoveries']} "
+              f"(après {recovery['mean_lost_frames']:.1f} frames en moyenne, recherche "
+              f"{recovery['mean_search_ms']:.1f} ms, réinitialisation {recovery['mean_reinit_ms']:.1f} ms)")
+
+# Coût des initialisations (hors boucle grâce à la réserve de trackers)
+init_stats = pool.init_stats()
+warm_ms = f"{init_stats['warm_ms']:.1f} ms" if init_stats["warm_ms"] is not None else "non terminé"
+print(f"Initialisations : {init_stats['inits']}, durée moyenne {init_stats['init_mean_ms']:.1f} ms, "
+      f"max {init_stats['init_max_ms']:.1f} ms ; passage à blanc : {warm_ms}")
@@ -1,109 +1,51 @@
 import cv2
-import psutil
-import time
 import os
-
-
-# Fonction pour tester le tracker et collecter les métriques
-def test_tracker(video_path, tracker_name, tracker_create, roi, output_dir):
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        print(f"Erreur : Impossible d'ouvrir la vidéo '{video_path}'.")
-        return None
-
-    # Lire le premier cadre
-    ret, frame = cap.read()
-    if not ret:
-        print(f"Erreur : Impossible de lire le flux vidéo pour '{video_path}'.")
-        cap.release()
-        return None
-
-    # Initialiser le tracker avec le ROI fourni
-    tracker = tracker_create()
-    tracker.init(frame, roi)
-
-    # Préparer l'écrivain vidéo pour sauvegarder la vidéo avec le suivi
-    video_name = os.path.basename(video_path).split('.')[0]
-    output_path = os.path.join(output_dir, f"{video_name}_{tracker_name}.mp4")
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    fps = int(cap.get(cv2.CAP_PROP_FPS))
-    frame_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
-    out = cv2.VideoWriter(output_path, fourcc, fps, frame_size)
-
-    fps_list = []
-    cpu_usage = []
-    total_frames = 0
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        start_time = time.time()
-        success, box = tracker.update(frame)
-        elapsed_time = time.time() - start_time
-        frame_fps = 1 / elapsed_time if elapsed_time > 0 else 0
-        fps_list.append(frame_fps)
-
-        cpu_percent = psutil.cpu_percent(interval=None)
-        cpu_usage.append(cpu_percent)
-
-        if success:
-            x, y, w, h = [int(v) for v in box]
-            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-        else:
-            cv2.putText(frame, "Echec du suivi !", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (0, 0, 255), 2)
-
-        # Ajouter texte sur la vidéo
-        cv2.putText(frame, f"{tracker_name} FPS: {frame_fps:.2f}", (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.75,
-                    (255, 255, 255), 2)
-
-        # Écrire la frame dans la vidéo de sortie
-        out.write(frame)
-
-        # Afficher la vidéo
-        cv2.imshow(f"Suivi - {tracker_name}", frame)
-
-        # Quitter avec 'q'
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
-
-        total_frames += 1
-
-    cap.release()
-    out.release()  # Fermer l'écrivain vidéo
-    cv2.destroyAllWindows()
-
-    # Calculer les métriques
-    avg_fps = sum(fps_list) / len(fps_list) if fps_list else 0
-    avg_cpu = sum(cpu_usage) / len(cpu_usage) if cpu_usage else 0
-
-    return {
-        "tracker": tracker_name,
-        "avg_fps": avg_fps,
-        "avg_cpu": avg_cpu,
-        "total_frames": total_frames
-    }
-
-
-# Enregistrer les résultats dans un fichier
-def save_results_to_file(results, output_file):
-    with open(output_file, 'w') as file:
-        # Écrire l'entête du tableau
-        file.write(f"{'Tracker':<15}{'FPS Moyen':<15}{'CPU Moyen (%)':<15}{'Frames Traitées':<15}\n")
-        file.write("=" * 60 + "\n")
-
-        # Écrire chaque résultat
-        for result in results:
-            file.write(
-                f"{result['tracker']:<15}{result['avg_fps']:<15.2f}{result['avg_cpu']:<15.2f}{result['total_frames']:<15}\n")
+import sys
+
+# Rendre le paquet commun tracking_bench importable depuis ce répertoire
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tracking_bench.benchmark import test_tracker, test_trackers, save_results_to_file
+from tracking_bench.framecache import shared_gray
+from tracking_bench.hybrid import TrackerHybrid_create
+from tracking_bench.manifest import RoiManifest, entry_trackers
+from tracking_bench.parallel import run_grid, print_grid_summary
+from tracking_bench.realtime import run_realtime_grid, save_realtime_to_file
+from tracking_bench.scaling import save_scaling_to_file, scaling_study
+from tracking_bench.store import append_results
+from tracking_bench.tracklog import save_track_logs
+
+# Nombre de processus pour la grille (vidéo × tracker)
+# 1 (par défaut) : exécution séquentielle, chaque vidéo décodée une seule fois pour tous les trackers et
+# mesures non faussées par des essais concurrents ; plus de 1 : débit de la grille, mesures indicatives
+NB_WORKERS = 1
+# Durée maximale d'un couple (vidéo, tracker) en secondes
+JOB_TIMEOUT = 900
+# Mode sans affichage (aucun imshow/waitKey dans la boucle de suivi)
+HEADLESS = False
+# En mode sans affichage, aperçu d'une frame sur N dans un thread séparé (0 : aucun aperçu)
+PREVIEW_EVERY = 0
+# Manifeste des ROI (une entrée par vidéo, indexée par l'empreinte de son contenu)
+ROI_MANIFEST = os.path.join("videos", "roi_manifest.json")
+# Sélection interactive des ROI absentes du manifeste ; False : lot sans intervention (vidéos absentes ignorées)
+SELECTION_INTERACTIVE = True
+# Magasin JSONL des résultats : chaque lot y ajoute ses lignes (comparaison : python -m tracking_bench.store compare)
+RESULTS_STORE = os.path.join("videos", "results.jsonl")
+# Relecture au rythme d'une caméra à ces fréquences pour vérifier le temps réel (vide : désactivée), ex. (30, 120)
+TEMPS_REEL_FPS = ()
+# True : une vidéo annotée par tracker ; False : seulement les journaux de boîtes <vidéo>_tracks.npz,
+# rendus à la demande (python -m tracking_bench.tracklog <journal> --mosaic)
+VIDEOS_ANNOTEES = False
+# Étude de montée en charge sur la première vidéo : chaque tracker relancé avec 1, 2, 4, ... threads OpenCV
+# placés sur autant de cœurs, et en instances mono-thread côte à côte
+ETUDE_COEURS = False
 
 
 # Programme principal
 if __name__ == "__main__":
     # Répertoire vidéo et chemin
     video_dir = os.path.join("videos", "Rue")
-    video_files = [os.path.join(video_dir, f) for f in os.listdir(video_dir) if f.endswith(('.mp4', '.avi', '.mkv'))]
+    video_files = [os.path.join(video_dir, f) for f in sorted(os.listdir(video_dir)) if f.endswith(('.mp4', '.avi', '.mkv'))]
 
     if not video_files:
         print(f"Aucune vidéo trouvée dans le répertoire '{video_dir}'.")
@@ -119,49 +61,86 @@ if __name__ == "__main__":
         "MIL": cv2.legacy.TrackerMIL_create,
         "KCF": cv2.legacy.TrackerKCF_create,
         "TLD": cv2.legacy.TrackerTLD_create,
-        "MEDIANFLOW": cv2.legacy.TrackerMedianFlow_create,
+        "MEDIANFLOW": shared_gray(cv2.legacy.TrackerMedianFlow_create),  # Niveaux de gris partagés (FrameCache)
         "MOSSE": cv2.legacy.TrackerMOSSE_create,
         "CSRT": cv2.legacy.TrackerCSRT_create,
+        "HYBRID": TrackerHybrid_create,
     }
 
     # Résultats globaux
     all_results = []
 
-    # Utiliser le même ROI pour toutes les vidéos
-    first_roi = None
-
-    # Tester chaque vidéo avec chaque tracker
-    for video_index, video_file in enumerate(video_files):
+    # ROI, frame de départ et trackers de chaque vidéo, lus dans le manifeste
+    manifest = RoiManifest(ROI_MANIFEST)
+    entries = {}
+    for video_file in video_files:
         print(f"Traitement de la vidéo : {video_file}")
-
-        # Demander le ROI uniquement pour la première vidéo
-        if first_roi is None:
-            cap = cv2.VideoCapture(video_file)
-            if not cap.isOpened():
-                print(f"Erreur : Impossible d'ouvrir la vidéo '{video_file}'.")
-                continue
-
-            # Lire le premier cadre
-            ret, frame = cap.read()
-            if not ret:
-                print(f"Erreur : Impossible de lire le flux vidéo pour '{video_file}'.")
-                cap.release()
-                continue
-
-            # Sélectionner l'objet dans la première vidéo
-            print("Veuillez sélectionner l'objet à suivre dans la première vidéo.")
-            first_roi = cv2.selectROI("Sélectionnez l'objet", frame, fromCenter=False, showCrosshair=True)
-            cv2.destroyWindow("Sélectionnez l'objet")
-            cap.release()
-
-        # Tester chaque tracker avec le même ROI
-        for tracker_name, tracker_create in TRACKER_TYPES.items():
-            print(f"  Test du tracker : {tracker_name}")
-            result = test_tracker(video_file, tracker_name, tracker_create, first_roi, output_dir)
-            if result:
-                all_results.append(result)
+        entry = manifest.resolve(video_file, interactive=SELECTION_INTERACTIVE)
+        if entry is not None:
+            entries[video_file] = entry
+
+    failures = []
+    if NB_WORKERS > 1:
+        # Répartir la grille (vidéo × tracker) sur le pool de processus, sans affichage (pas de fenêtres concurrentes)
+        labels = []
+        jobs = []
+        for video_file, entry in entries.items():
+            video_output_dir = output_dir if entry["write_video"] and VIDEOS_ANNOTEES else None
+            for tracker_name, tracker_create in entry_trackers(entry, TRACKER_TYPES).items():
+                labels.append((os.path.basename(video_file), tracker_name))
+                jobs.append((test_tracker, (video_file, tracker_name, tracker_create, tuple(entry["roi"]),
+                                            video_output_dir, True, PREVIEW_EVERY, entry["start_frame"], True)))
+
+        print(f"Exécution de {len(jobs)} tests sur {NB_WORKERS} processus.")
+        outcomes = run_grid(jobs, workers=NB_WORKERS, timeout=JOB_TIMEOUT)
+        print_grid_summary([f"{video} / {tracker_name}" for video, tracker_name in labels], outcomes)
+
+        for (video, tracker_name), outcome in zip(labels, outcomes):
+            if outcome["result"]:
+                all_results.append(outcome["result"])
+            else:
+                failures.append((video, tracker_name, outcome["status"]))
+    else:
+        # Tester les trackers de chaque vidéo en un seul décodage
+        for video_file, entry in entries.items():
+            trackers = entry_trackers(entry, TRACKER_TYPES)
+            print(f"  Test des trackers sur {video_file} : {', '.join(trackers)}")
+            results = test_trackers(video_file, trackers, tuple(entry["roi"]),
+                                    output_dir if entry["write_video"] and VIDEOS_ANNOTEES else None, HEADLESS,
+                                    PREVIEW_EVERY, record_boxes=True, start_frame=entry["start_frame"])
+            if results:
+                all_results.extend(results)
 
     # Enregistrer les résultats dans un fichier
     output_file = os.path.join("videos", "tracker_results.txt")
-    save_results_to_file(all_results, output_file)
+    save_results_to_file(all_results, output_file, failures)
     print(f"Résultats enregistrés dans : {output_file}")
+
+    # Journaux compacts des boîtes de chaque tracker (une vidéo annotée se rend ensuite à la demande)
+    track_logs = save_track_logs(all_results, {video_file: entry["start_frame"] for video_file, entry in entries.items()},
+                                 output_dir)
+    print(f"{len(track_logs)} journaux de boîtes enregistrés dans : {output_dir}")
+
+    # Ajouter le lot au magasin structuré pour le comparer aux lots précédents
+    run_id = append_results(all_results, RESULTS_STORE, script=os.path.basename(__file__))
+    print(f"Lot {run_id} ajouté à : {RESULTS_STORE}")
+
+    # Temps réel : chaque tracker suit-il une caméra à ces fréquences ?
+    if TEMPS_REEL_FPS:
+        realtime_results = []
+        for video_file, entry in entries.items():
+            realtime_results.extend(run_realtime_grid(video_file, entry_trackers(entry, TRACKER_TYPES),
+                                                      tuple(entry["roi"]), TEMPS_REEL_FPS))
+
+        realtime_file = os.path.join("videos", "realtime_results.txt")
+        save_realtime_to_file(realtime_results, realtime_file)
+        print(f"Bilan temps réel enregistré dans : {realtime_file}")
+
+    # Montée en charge : quels trackers profitent de plusieurs cœurs, lesquels tourner en mono-thread
+    if ETUDE_COEURS and entries:
+        video_file, entry = next(iter(entries.items()))
+        scaling_rows = scaling_study(video_file, entry_trackers(entry, TRACKER_TYPES), tuple(entry["roi"]),
+                                     start_frame=entry["start_frame"], timeout=JOB_TIMEOUT)
+        scaling_file = os.path.join("videos", "scaling_results.txt")
+        save_scaling_to_file(scaling_rows, scaling_file)
+        print(f"Étude de montée en charge enregistrée dans : {scaling_file}")
@@ -1,13 +1,23 @@
 import cv2
+import math
 import os
 
-def change_video_fps(input_path, output_dir, target_fps):
+
+def change_video_fps_multi(input_path, output_dir, target_fps_list):
     """
-    Change les FPS d'une vidéo et enregistre une nouvelle version.
+    Change les FPS d'une vidéo vers plusieurs fréquences en une seule lecture.
+
+    La source est lue une seule fois et toutes les vidéos cibles sont écrites en
+    même temps, sans garder les frames en mémoire. Le rééchantillonnage se fait
+    sur les horodatages : la frame de sortie k d'une vidéo à `target_fps` montre
+    la frame source affichée à l'instant k / target_fps. Les rapports non entiers
+    et le suréchantillonnage (frames dupliquées) sont donc respectés, et la durée
+    de la vidéo est conservée. Les frames qui ne servent à aucune cible sont
+    sautées avec `grab()` sans être décodées par `retrieve()`.
 
     :param input_path: Chemin de la vidéo d'entrée.
     :param output_dir: Répertoire de sortie.
-    :param target_fps: Fréquence d'images cible (int).
+    :param target_fps_list: Liste des fréquences d'images cibles.
     """
     # Charger la vidéo originale
     cap = cv2.VideoCapture(input_path)
@@ -18,38 +28,65 @@ def change_video_fps(input_path, output_dir, target_fps):
     # Obtenir les propriétés de la vidéo
     width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-    original_fps = int(cap.get(cv2.CAP_PROP_FPS))
+    original_fps = cap.get(cv2.CAP_PROP_FPS)
     fourcc = cv2.VideoWriter_fourcc(*'mp4v')
 
-    # Créer le chemin de sortie
-    base_name = os.path.splitext(os.path.basename(input_path))[0]  # Nom de base de la vidéo
-    output_path = os.path.join(output_dir, f"{base_name}_{target_fps}FPS.mp4")
-
-    # Initialiser l'écrivain vidéo
-    out = cv2.VideoWriter(output_path, fourcc, target_fps, (width, height))
-
-    print(f"Modification de {original_fps} FPS à {target_fps} FPS pour la vidéo : {input_path}")
+    if original_fps <= 0:
+        print(f"Erreur : FPS inconnus pour la vidéo : {input_path}")
+        cap.release()
+        return
 
-    frame_list = []
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        frame_list.append(frame)
+    # Initialiser un écrivain vidéo par FPS cible
+    base_name = os.path.splitext(os.path.basename(input_path))[0]  # Nom de base de la vidéo
+    outputs = []
+    for target_fps in target_fps_list:
+        output_path = os.path.join(output_dir, f"{base_name}_{target_fps}FPS.mp4")
+        outputs.append({
+            "fps": target_fps,
+            "path": output_path,
+            "out": cv2.VideoWriter(output_path, fourcc, target_fps, (width, height)),
+            "written": 0,
+        })
+        print(f"Modification de {original_fps:.2f} FPS à {target_fps} FPS pour la vidéo : {input_path}")
+
+    source_index = 0
+    while cap.grab():
+        # La frame source i est affichée sur [i / fps_source, (i + 1) / fps_source[ :
+        # chaque cible écrit les frames de sortie dont l'instant tombe dans cet intervalle
+        end_time = (source_index + 1) / original_fps
+        repeats = []
+        for output in outputs:
+            # Petite tolérance pour que les rapports entiers ne tombent pas à côté
+            expected = math.ceil(end_time * output["fps"] - 1e-9)
+            repeats.append(expected - output["written"])
+
+        if any(repeats):
+            ret, frame = cap.retrieve()
+            if not ret:
+                break
+            for output, count in zip(outputs, repeats):
+                for _ in range(count):
+                    output["out"].write(frame)
+                output["written"] += count
+
+        source_index += 1
 
     cap.release()
 
-    # Ajuster les FPS
-    total_frames = len(frame_list)
-    frame_interval = int(original_fps / target_fps) if target_fps < original_fps else 1
+    for output in outputs:
+        output["out"].release()
+        print(f"Vidéo enregistrée avec succès à : {output['path']} ({output['written']} frames)")
 
-    new_frame_list = frame_list[::frame_interval]  # Échantillonnage des frames
 
-    for frame in new_frame_list:
-        out.write(frame)
+def change_video_fps(input_path, output_dir, target_fps):
+    """
+    Change les FPS d'une vidéo et enregistre une nouvelle version.
 
-    out.release()
-    print(f"Vidéo enregistrée avec succès à : {output_path}")
+    :param input_path: Chemin de la vidéo d'entrée.
+    :param output_dir: Répertoire de sortie.
+    :param target_fps: Fréquence d'images cible (int).
+    """
+    change_video_fps_multi(input_path, output_dir, [target_fps])
 
 
 # Fonction principale
@@ -69,6 +106,6 @@ if __name__ == "__main__":
     # Liste des FPS cibles
     target_fps_list = [15, 30, 60, 120]
 
-    # Générer des vidéos pour chaque FPS cible
-    for target_fps in target_fps_list:
-        change_video_fps(input_video, output_dir, target_fps)
+    # Générer les vidéos de tous les FPS cibles en une seule lecture de la source
+    os.makedirs(output_dir, exist_ok=True)
+    change_video_fps_multi(input_video, output_dir, target_fps_list)
@@ -1,15 +1,56 @@
 import cv2
 import os
+import sys
+
+# Rendre le paquet commun tracking_bench importable depuis ce répertoire
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tracking_bench.benchmark import test_trackers
+from tracking_bench.buffers import FramePool
+from tracking_bench.display import create_display
+from tracking_bench.evaluation import evaluate_trackers, find_ground_truth, load_ground_truth, save_accuracy_to_file
+from tracking_bench.hybrid import TrackerHybrid_create
+from tracking_bench.manifest import RoiManifest, entry_trackers
+from tracking_bench.parallel import run_grid, print_grid_summary
+from tracking_bench.recovery import with_recovery
+from tracking_bench.robustness import evaluate_robustness, reference_boxes, save_robustness_to_file
+
+# Nombre de processus pour la grille (vidéo × tracker)
+# 1 (par défaut) : exécution séquentielle, mesures non faussées par des essais concurrents ; plus de 1 : débit
+# de la grille, mesures indicatives, et chaque processus tourne sans affichage
+NB_WORKERS = 1
+# Durée maximale d'un couple (vidéo, tracker) en secondes
+JOB_TIMEOUT = 900
+# Mode sans affichage (aucun imshow/waitKey dans la boucle de suivi)
+HEADLESS = False
+# En mode sans affichage, aperçu d'une frame sur N dans un thread séparé (0 : aucun aperçu)
+PREVIEW_EVERY = 0
+# Manifeste des ROI (une entrée par vidéo, indexée par l'empreinte de son contenu)
+ROI_MANIFEST = "roi_manifest.json"
+# Sélection interactive des ROI absentes du manifeste ; False : lot sans intervention (vidéos absentes ignorées)
+SELECTION_INTERACTIVE = True
+# Robustesse temporelle : nombre de points de départ par vidéo, avec réinitialisation après perte (0 : désactivée)
+ROBUSTESSE_SEGMENTS = 0
+# Reprise automatique après une perte (prédiction du mouvement + recherche locale) : la perte n'est
+# retenue que si la cible n'est pas retrouvée
+REPRISE_AUTO = False
 
 # Fonction pour suivre et enregistrer la frame où il y a une perte de suivi ou un arrêt manuel
-def save_loss_frame(video_path, tracker_name, tracker_create, output_dir, manual_roi=None):
+def save_loss_frame(video_path, tracker_name, tracker_create, output_dir, manual_roi=None, headless=False, preview_every=0,
+                    start_frame=0):
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
         print(f"Erreur : Impossible d'ouvrir la vidéo '{video_path}'.")
         return None
 
+    if start_frame > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    # Les frames sont lues dans des tampons réutilisés
+    pool = FramePool()
+
     # Lire le premier cadre
-    ret, frame = cap.read()
+    ret, frame = pool.read(cap)
     if not ret:
         print(f"Erreur : Impossible de lire la vidéo '{video_path}'.")
         cap.release()
@@ -19,16 +60,22 @@ def save_loss_frame(video_path, tracker_name, tracker_create, output_dir, manual
     roi = manual_roi
     tracker = tracker_create()
     tracker.init(frame, roi)
+    pool.release(frame)
 
     total_frames = 0
     loss_frame_path = None
     loss_frame_number = None
     reason = "Fin"  # Par défaut, la raison sera "Fin" si la vidéo se termine normalement
     last_successful_box = None
-    last_valid_frame = None
+    last_valid_frame = None  # Tampon de la dernière frame suivie, conservé sans copie
+    search_frame = None  # Tampon de la frame où la reprise automatique a commencé à chercher la cible
+    display = create_display(headless, preview_every)
+
+    # Le calque d'annotation n'est utile que si les frames sont affichées
+    show = not headless or preview_every > 0
 
     while True:
-        ret, frame = cap.read()
+        ret, frame = pool.read(cap)
         if not ret:
             # Fin de la vidéo, sauvegarder la dernière frame valide avec la boîte si elle existe
             loss_frame_path = os.path.join(output_dir, f"{os.path.splitext(os.path.basename(video_path))[0]}_{tracker_name}.png")
@@ -45,48 +92,78 @@ def save_loss_frame(video_path, tracker_name, tracker_create, output_dir, manual
 
         success, box = tracker.update(frame)
         total_frames += 1
+        searching = not success and (getattr(tracker, "searching", False) or getattr(tracker, "reinitialising", False))
 
         if success:
-            # Dessiner la boîte de suivi
-            x, y, w, h = [int(v) for v in box]
-            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
             last_successful_box = box  # Enregistrer la dernière boîte valide
-            last_valid_frame = frame.copy()  # Enregistrer la dernière frame valide
+            # Garder le tampon de cette frame à la place du précédent, qui retourne à la réserve
+            pool.release(last_valid_frame)
+            last_valid_frame = frame
+            # Cible retrouvée par la reprise automatique : la frame de la perte n'est plus utile
+            pool.release(search_frame)
+            search_frame = None
+        elif searching:
+            # Cible en cours de recherche : garder la frame de la perte au cas où la reprise échoue
+            if search_frame is None:
+                search_frame = frame
         else:
-            # Sauvegarder la frame de perte de suivi
-            loss_frame_path = os.path.join(output_dir, f"{os.path.splitext(os.path.basename(video_path))[0]}_{tracker_name}.png")
-            cv2.imwrite(loss_frame_path, frame)
+            # Perte définitive : frame où la cible a été perdue (début de la recherche, s'il y en a eu une)
             loss_frame_number = total_frames
+            loss_image = frame
+            if search_frame is not None:
+                losses = [event["frame"] for event in getattr(tracker, "events", []) if event["type"] == "loss"]
+                loss_frame_number = losses[-1] if losses else loss_frame_number
+                loss_image = search_frame
+            loss_frame_path = os.path.join(output_dir, f"{os.path.splitext(os.path.basename(video_path))[0]}_{tracker_name}.png")
+            cv2.imwrite(loss_frame_path, loss_image)
             reason = "Perte"
             print(f"Perte de suivi détectée. Frame sauvegardée : {loss_frame_path}")
             break
 
-        # Annoter la vidéo
-        cv2.putText(frame, f"Tracker: {tracker_name}", (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (255, 255, 255), 2)
-        cv2.putText(frame, f"Frames: {total_frames}", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (255, 255, 255), 2)
+        # Annoter un calque séparé : la frame suivie reste intacte
+        overlay = None
+        if show:
+            overlay = pool.copy(frame)
+            if success:
+                x, y, w, h = [int(v) for v in box]
+                cv2.rectangle(overlay, (x, y), (x + w, y + h), (0, 255, 0), 2)
+            else:
+                cv2.putText(overlay, "Recherche de l'objet...", (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (0, 255, 255), 2)
+            cv2.putText(overlay, f"Tracker: {tracker_name}", (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (255, 255, 255), 2)
+            cv2.putText(overlay, f"Frames: {total_frames}", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (255, 255, 255), 2)
 
-        # Afficher la vidéo
-        cv2.imshow(f"Suivi - {tracker_name}", frame)
+            # Afficher la vidéo
+            display.show(f"Suivi - {tracker_name}", overlay)
 
         # Quitter manuellement avec la touche 'q'
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        if display.poll_quit():
             # Sauvegarder la frame où l'utilisateur a arrêté le suivi
             loss_frame_path = os.path.join(output_dir, f"{os.path.splitext(os.path.basename(video_path))[0]}_{tracker_name}.png")
-            cv2.imwrite(loss_frame_path, frame)
+            cv2.imwrite(loss_frame_path, overlay if overlay is not None else frame)
             loss_frame_number = total_frames
             reason = "Manuel"
             print(f"Arrêt manuel détecté. Frame sauvegardée : {loss_frame_path}")
             break
+        pool.release(overlay)
+
+        # Frame non conservée : retour à la réserve
+        if frame is not last_valid_frame and frame is not search_frame:
+            pool.release(frame)
 
     cap.release()
-    cv2.destroyAllWindows()
+    display.close()
+
+    # Nombre de pertes rattrapées par la reprise automatique
+    recoveries = tracker.recovery_stats()["recoveries"] if hasattr(tracker, "recovery_stats") else 0
+    if recoveries:
+        print(f"Reprises automatiques pour '{tracker_name}' : {recoveries}")
 
-    return loss_frame_path, loss_frame_number, reason
+    return loss_frame_path, loss_frame_number, reason, recoveries
 
 # Programme principal
 if __name__ == "__main__":
     current_dir = os.getcwd()
-    video_files = [os.path.join(current_dir, f) for f in os.listdir(current_dir) if f.endswith(('.mp4', '.avi', '.mkv'))]
+    video_files = [os.path.join(current_dir, f) for f in sorted(os.listdir(current_dir)) if f.endswith(('.mp4', '.avi', '.mkv'))]
 
     if not video_files:
         print(f"Aucune vidéo trouvée dans le répertoire '{current_dir}'.")
@@ -108,32 +185,96 @@ if __name__ == "__main__":
         "MEDIANFLOW": cv2.legacy.TrackerMedianFlow_create,
         "MOSSE": cv2.legacy.TrackerMOSSE_create,
         "CSRT": cv2.legacy.TrackerCSRT_create,
+        "HYBRID": TrackerHybrid_create,
     }
 
-    # Traiter chaque vidéo
+    # ROI de chaque vidéo lue dans le manifeste avant de lancer les tests (sélection si absente)
+    manifest = RoiManifest(ROI_MANIFEST)
+    entries = {}
+    for video_file in video_files:
+        print(f"Traitement de la vidéo : {video_file}")
+        entry = manifest.resolve(video_file, interactive=SELECTION_INTERACTIVE)
+        if entry is not None:
+            entries[video_file] = entry
+
+    # Plusieurs processus : pas de fenêtres imshow/waitKey concurrentes, chaque essai tourne sans affichage
+    headless = HEADLESS or NB_WORKERS > 1
+
+    # Grille (vidéo × tracker) dans un ordre déterministe
+    labels = []
+    jobs = []
+    for video_file, entry in entries.items():
+        for tracker_name, tracker_create in entry_trackers(entry, TRACKER_TYPES).items():
+            if REPRISE_AUTO:
+                tracker_create = with_recovery(tracker_create)
+            labels.append((video_file, tracker_name))
+            jobs.append((save_loss_frame, (video_file, tracker_name, tracker_create, output_dir, tuple(entry["roi"]),
+                                           headless, PREVIEW_EVERY, entry["start_frame"])))
+
+    if NB_WORKERS > 1:
+        print(f"Exécution de {len(jobs)} tests sur {NB_WORKERS} processus.")
+        outcomes = run_grid(jobs, workers=NB_WORKERS, timeout=JOB_TIMEOUT)
+        print_grid_summary([f"{os.path.basename(video)} / {name}" for video, name in labels], outcomes)
+    else:
+        outcomes = []
+        for (video_file, tracker_name), (func, args) in zip(labels, jobs):
+            print(f"  Test du tracker : {tracker_name}")
+            outcomes.append({"status": "ok", "result": func(*args)})
+
+    # Écrire un rapport unique pour toute la grille
     with open(results_file, "w") as f:
-        f.write(f"{'Tracker':<15}{'Vidéo':<25}{'Frame de Perte':<15}{'Raison':<10}\n")
-        f.write("=" * 65 + "\n")
-
-        for video_file in video_files:
-            print(f"Traitement de la vidéo : {video_file}")
-
-            # Lire la première frame de la vidéo pour sélectionner la ROI
-            cap = cv2.VideoCapture(video_file)
-            ret, frame = cap.read()
-            if not ret:
-                print(f"Erreur : Impossible de lire la première frame de '{video_file}'.")
-                cap.release()
+        f.write(f"{'Tracker':<15}{'Vidéo':<25}{'Frame de Perte':<15}{'Raison':<10}{'Reprises':<10}\n")
+        f.write("=" * 75 + "\n")
+
+        for (video_file, tracker_name), outcome in zip(labels, outcomes):
+            if outcome["result"] is None:
+                reason = "Délai" if outcome["status"] == "timeout" else "Erreur"
+                f.write(f"{tracker_name:<15}{os.path.basename(video_file):<25}{'-':<15}{reason:<10}\n")
                 continue
 
-            print("Veuillez sélectionner l'objet à suivre pour cette vidéo.")
-            roi = cv2.selectROI("Sélectionner un objet", frame, fromCenter=False, showCrosshair=True)
-            cv2.destroyWindow("Sélectionner un objet")
-            cap.release()
+            loss_frame_path, loss_frame_number, reason, recoveries = outcome["result"]
+            if loss_frame_number is not None:
+                f.write(f"{tracker_name:<15}{os.path.basename(video_file):<25}{loss_frame_number:<15}{reason:<10}"
+                        f"{recoveries:<10}\n")
+
+    # Précision par rapport à la vérité terrain (`<vidéo>.txt` : une boîte x, y, w, h par frame)
+    all_scores = []
+    for video_file in entries:
+        ground_truth_file = find_ground_truth(video_file)
+        if ground_truth_file is None:
+            continue
+
+        print(f"Évaluation de la précision sur : {video_file}")
+        ground_truth = load_ground_truth(ground_truth_file)
+        roi = tuple(int(v) for v in ground_truth[0])
+        results = test_trackers(video_file, TRACKER_TYPES, roi, None, headless=True, record_boxes=True)
+        if results:
+            all_scores.extend(evaluate_trackers(results, ground_truth))
+
+    if all_scores:
+        accuracy_file = os.path.join(output_dir, "accuracy.txt")
+        save_accuracy_to_file(all_scores, accuracy_file)
+        print(f"Scores de précision enregistrés dans : {accuracy_file}")
+
+    # Robustesse temporelle : suivis lancés depuis plusieurs points de chaque vidéo, initialisés sur
+    # la vérité terrain, ou à défaut sur un passage de référence de CSRT depuis la ROI du manifeste
+    if ROBUSTESSE_SEGMENTS > 0:
+        all_robustness = []
+        for video_file, entry in entries.items():
+            print(f"Robustesse temporelle sur : {video_file}")
+            ground_truth_file = find_ground_truth(video_file)
+            if ground_truth_file is not None:
+                init_boxes = load_ground_truth(ground_truth_file)
+            else:
+                init_boxes = reference_boxes(video_file, tuple(entry["roi"]), entry["start_frame"])
+            if init_boxes is None:
+                continue
 
-            for tracker_name, tracker_create in TRACKER_TYPES.items():
-                print(f"  Test du tracker : {tracker_name}")
-                loss_frame_path, loss_frame_number, reason = save_loss_frame(video_file, tracker_name, tracker_create, output_dir, roi)
+            all_robustness.extend(evaluate_robustness(video_file, entry_trackers(entry, TRACKER_TYPES), init_boxes,
+                                                      ROBUSTESSE_SEGMENTS, use_overlap=ground_truth_file is not None,
+                                                      workers=NB_WORKERS, timeout=JOB_TIMEOUT,
+                                                      reference="vérité terrain" if ground_truth_file else "réf. CSRT"))
 
-                if loss_frame_number is not None:
-                    f.write(f"{tracker_name:<15}{os.path.basename(video_file):<25}{loss_frame_number:<15}{reason:<10}\n")
+        robustness_file = os.path.join(output_dir, "robustness.txt")
+        save_robustness_to_file(all_robustness, robustness_file)
+        print(f"Robustesse temporelle enregistrée dans : {robustness_file}")
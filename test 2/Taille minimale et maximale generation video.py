@@ -1,15 +1,53 @@
 import cv2
 import os
+import sys
+
+# Rendre le paquet commun tracking_bench importable depuis ce répertoire
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tracking_bench.benchmark import test_trackers
+from tracking_bench.buffers import FramePool
+from tracking_bench.display import create_display
+from tracking_bench.hybrid import TrackerHybrid_create
+from tracking_bench.manifest import RoiManifest, entry_trackers
+from tracking_bench.parallel import run_grid, print_grid_summary
+from tracking_bench.tracklog import render_tracks, save_track_log
+from tracking_bench.writer import AsyncVideoWriter
+
+# Nombre de processus pour la grille (vidéo × tracker)
+# 1 (par défaut) : exécution séquentielle, mesures non faussées par des essais concurrents ; plus de 1 : débit
+# de la grille, mesures indicatives, et chaque processus tourne sans affichage
+NB_WORKERS = 1
+# Durée maximale d'un couple (vidéo, tracker) en secondes
+JOB_TIMEOUT = 900
+# Mode sans affichage (aucun imshow/waitKey dans la boucle de suivi)
+HEADLESS = False
+# En mode sans affichage, aperçu d'une frame sur N dans un thread séparé (0 : aucun aperçu)
+PREVIEW_EVERY = 0
+# Manifeste des ROI (une entrée par vidéo, indexée par l'empreinte de son contenu)
+ROI_MANIFEST = "roi_manifest.json"
+# Sélection interactive des ROI absentes du manifeste ; False : lot sans intervention (vidéos absentes ignorées)
+SELECTION_INTERACTIVE = True
+# True : une seule vidéo mosaïque par vidéo (tous les trackers côte à côte, un décodage, un encodage)
+# False : une vidéo annotée par tracker
+MOSAIQUE = True
 
 # Fonction pour enregistrer le suivi
-def save_tracking_video(video_path, tracker_name, tracker_create, output_dir, manual_roi=None):
+def save_tracking_video(video_path, tracker_name, tracker_create, output_dir, manual_roi=None, headless=False,
+                        preview_every=0, start_frame=0):
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
         print(f"Erreur : Impossible d'ouvrir la vidéo '{video_path}'.")
         return None
 
+    if start_frame > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    # Les frames sont lues dans des tampons réutilisés, rendus à la réserve après encodage
+    pool = FramePool()
+
     # Lire le premier cadre
-    ret, frame = cap.read()
+    ret, frame = pool.read(cap)
     if not ret:
         print(f"Erreur : Impossible de lire la vidéo '{video_path}'.")
         cap.release()
@@ -19,6 +57,7 @@ def save_tracking_video(video_path, tracker_name, tracker_create, output_dir, ma
     roi = manual_roi
     tracker = tracker_create()
     tracker.init(frame, roi)
+    pool.release(frame)
 
     # Définir le codec et créer l'écrivain vidéo
     fps = cap.get(cv2.CAP_PROP_FPS)
@@ -27,12 +66,13 @@ def save_tracking_video(video_path, tracker_name, tracker_create, output_dir, ma
     output_path = os.path.join(output_dir, f"{os.path.basename(video_path).split('.')[0]}_{tracker_name}.mp4")
 
     fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # Codec pour MP4
-    out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+    out = AsyncVideoWriter(output_path, fourcc, fps, (width, height), pool=pool)  # Encodage sur un thread séparé
 
     print(f"Enregistrement en cours : {output_path}")
+    display = create_display(headless, preview_every)
 
     while True:
-        ret, frame = cap.read()
+        ret, frame = pool.read(cap)
         if not ret:
             break
 
@@ -49,23 +89,41 @@ def save_tracking_video(video_path, tracker_name, tracker_create, output_dir, ma
         out.write(frame)
 
         # Afficher la vidéo en cours de traitement
-        cv2.imshow(f"Suivi - {tracker_name}", frame)
+        display.show(f"Suivi - {tracker_name}", frame)
 
         # Quitter manuellement avec la touche 'q'
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        if display.poll_quit():
             print("Arrêt manuel détecté.")
             break
 
     cap.release()
     out.release()
-    cv2.destroyAllWindows()
+    display.close()
 
     print(f"Vidéo enregistrée : {output_path}")
 
+# Fonction pour enregistrer le suivi de tous les trackers dans une mosaïque
+def save_tracking_mosaic(video_path, trackers, output_dir, manual_roi=None, headless=False, preview_every=0,
+                         start_frame=0):
+    # Suivi sans écriture vidéo : seules les boîtes sont conservées, dans un journal compact
+    results = test_trackers(video_path, trackers, manual_roi, None, headless, preview_every, record_boxes=True,
+                            start_frame=start_frame)
+    if not results:
+        return None
+
+    name = os.path.basename(video_path).split('.')[0]
+    log_path = save_track_log(results, os.path.join(output_dir, f"{name}_tracks.npz"), video_path, start_frame)
+
+    # Rendu de la mosaïque à partir du journal, en relisant la vidéo une seule fois
+    output_path = os.path.join(output_dir, f"{name}_mosaic.mp4")
+    print(f"Enregistrement en cours : {output_path}")
+    render_tracks(log_path, output_path, mosaic=True)
+    print(f"Vidéo enregistrée : {output_path}")
+
 # Programme principal
 if __name__ == "__main__":
     current_dir = os.getcwd()
-    video_files = [os.path.join(current_dir, f) for f in os.listdir(current_dir) if f.endswith(('.mp4', '.avi', '.mkv'))]
+    video_files = [os.path.join(current_dir, f) for f in sorted(os.listdir(current_dir)) if f.endswith(('.mp4', '.avi', '.mkv'))]
 
     if not video_files:
         print(f"Aucune vidéo trouvée dans le répertoire '{current_dir}'.")
@@ -84,25 +142,40 @@ if __name__ == "__main__":
         "MEDIANFLOW": cv2.legacy.TrackerMedianFlow_create,
         "MOSSE": cv2.legacy.TrackerMOSSE_create,
         "CSRT": cv2.legacy.TrackerCSRT_create,
+        "HYBRID": TrackerHybrid_create,
     }
 
-    # Traiter chaque vidéo
+    # ROI de chaque vidéo lue dans le manifeste avant de lancer les enregistrements (sélection si absente)
+    manifest = RoiManifest(ROI_MANIFEST)
+    entries = {}
     for video_file in video_files:
         print(f"Traitement de la vidéo : {video_file}")
-
-        # Lire la première frame de la vidéo pour sélectionner la ROI
-        cap = cv2.VideoCapture(video_file)
-        ret, frame = cap.read()
-        if not ret:
-            print(f"Erreur : Impossible de lire la première frame de '{video_file}'.")
-            cap.release()
+        entry = manifest.resolve(video_file, interactive=SELECTION_INTERACTIVE)
+        if entry is not None:
+            entries[video_file] = entry
+
+    # Plusieurs processus : pas de fenêtres imshow/waitKey concurrentes, chaque essai tourne sans affichage
+    headless = HEADLESS or NB_WORKERS > 1
+
+    # Grille (vidéo × tracker) dans un ordre déterministe
+    labels = []
+    jobs = []
+    for video_file, entry in entries.items():
+        if MOSAIQUE:
+            labels.append(os.path.basename(video_file))
+            jobs.append((save_tracking_mosaic, (video_file, entry_trackers(entry, TRACKER_TYPES), output_dir,
+                                                tuple(entry["roi"]), headless, PREVIEW_EVERY, entry["start_frame"])))
             continue
-
-        print("Veuillez sélectionner l'objet à suivre pour cette vidéo.")
-        roi = cv2.selectROI("Sélectionner un objet", frame, fromCenter=False, showCrosshair=True)
-        cv2.destroyWindow("Sélectionner un objet")
-        cap.release()
-
-        for tracker_name, tracker_create in TRACKER_TYPES.items():
-            print(f"  Test du tracker : {tracker_name}")
-            save_tracking_video(video_file, tracker_name, tracker_create, output_dir, roi)
+        for tracker_name, tracker_create in entry_trackers(entry, TRACKER_TYPES).items():
+            labels.append(f"{os.path.basename(video_file)} / {tracker_name}")
+            jobs.append((save_tracking_video, (video_file, tracker_name, tracker_create, output_dir, tuple(entry["roi"]),
+                                               headless, PREVIEW_EVERY, entry["start_frame"])))
+
+    if NB_WORKERS > 1:
+        print(f"Exécution de {len(jobs)} enregistrements sur {NB_WORKERS} processus.")
+        outcomes = run_grid(jobs, workers=NB_WORKERS, timeout=JOB_TIMEOUT)
+        print_grid_summary(labels, outcomes)
+    else:
+        for label, (func, args) in zip(labels, jobs):
+            print(f"  Test du tracker : {label}")
+            func(*args)
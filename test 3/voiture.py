@@ -1,102 +1,41 @@
 import cv2
-import psutil
-import time
 import os
-
-
-# Fonction pour tester le tracker et collecter les métriques
-def test_tracker(video_path, tracker_name, tracker_create, roi, output_dir):
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        print(f"Erreur : Impossible d'ouvrir la vidéo '{video_path}'.")
-        return None
-
-    # Lire le premier cadre
-    ret, frame = cap.read()
-    if not ret:
-        print(f"Erreur : Impossible de lire le flux vidéo pour '{video_path}'.")
-        cap.release()
-        return None
-
-    # Initialiser le tracker avec la ROI fournie
-    tracker = tracker_create()
-    tracker.init(frame, roi)
-
-    # Préparer l'écrivain vidéo pour sauvegarder la vidéo avec le suivi
-    video_name = os.path.basename(video_path).split('.')[0]
-    output_path = os.path.join(output_dir, f"{video_name}_{tracker_name}.mp4")
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    fps = int(cap.get(cv2.CAP_PROP_FPS))
-    frame_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
-    out = cv2.VideoWriter(output_path, fourcc, fps, frame_size)
-
-    fps_list = []
-    cpu_usage = []
-    total_frames = 0
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        start_time = time.time()
-        success, box = tracker.update(frame)
-        elapsed_time = time.time() - start_time
-        frame_fps = 1 / elapsed_time if elapsed_time > 0 else 0
-        fps_list.append(frame_fps)
-
-        cpu_percent = psutil.cpu_percent(interval=None)
-        cpu_usage.append(cpu_percent)
-
-        if success:
-            x, y, w, h = [int(v) for v in box]
-            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-        else:
-            cv2.putText(frame, "Echec du suivi !", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (0, 0, 255), 2)
-
-        # Ajouter texte sur la vidéo
-        cv2.putText(frame, f"{tracker_name} FPS: {frame_fps:.2f}", (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.75,
-                    (255, 255, 255), 2)
-
-        # Écrire la frame dans la vidéo de sortie
-        out.write(frame)
-
-        # Afficher la vidéo
-        cv2.imshow(f"Suivi - {tracker_name}", frame)
-
-        # Quitter avec 'q'
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
-
-        total_frames += 1
-
-    cap.release()
-    out.release()
-    cv2.destroyAllWindows()
-
-    # Calculer les métriques
-    avg_fps = sum(fps_list) / len(fps_list) if fps_list else 0
-    avg_cpu = sum(cpu_usage) / len(cpu_usage) if cpu_usage else 0
-
-    return {
-        "tracker": tracker_name,
-        "avg_fps": avg_fps,
-        "avg_cpu": avg_cpu,
-        "total_frames": total_frames
-    }
-
-
-# Enregistrer les résultats dans un fichier
-def save_results_to_file(results, output_file):
-    with open(output_file, 'w') as file:
-        # Écrire l'entête du tableau
-        file.write(f"{'Tracker':<15}{'FPS Moyen':<15}{'CPU Moyen (%)':<15}{'Frames Traitées':<15}\n")
-        file.write("=" * 60 + "\n")
-
-        # Écrire chaque résultat
-        for result in results:
-            file.write(
-                f"{result['tracker']:<15}{result['avg_fps']:<15.2f}{result['avg_cpu']:<15.2f}{result['total_frames']:<15}\n")
+import sys
+
+# Rendre le paquet commun tracking_bench importable depuis ce répertoire
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tracking_bench.benchmark import test_tracker, test_trackers, save_results_to_file
+from tracking_bench.framecache import shared_gray
+from tracking_bench.hybrid import TrackerHybrid_create
+from tracking_bench.manifest import RoiManifest, entry_trackers
+from tracking_bench.parallel import run_grid, print_grid_summary
+from tracking_bench.store import append_results
+from tracking_bench.tracklog import save_track_logs
+from tracking_bench.tuner import load_tuned_config, tuned_tracker
+
+# Nombre de processus pour la grille des trackers
+# 1 (par défaut) : exécution séquentielle, chaque vidéo décodée une seule fois pour tous les trackers et
+# mesures non faussées par des essais concurrents ; plus de 1 : débit de la grille, mesures indicatives
+NB_WORKERS = 1
+# Durée maximale du test d'un tracker en secondes
+JOB_TIMEOUT = 900
+# Mode sans affichage (aucun imshow/waitKey dans la boucle de suivi)
+HEADLESS = False
+# En mode sans affichage, aperçu d'une frame sur N dans un thread séparé (0 : aucun aperçu)
+PREVIEW_EVERY = 0
+# Manifeste des ROI (une entrée par vidéo, indexée par l'empreinte de son contenu)
+ROI_MANIFEST = "roi_manifest.json"
+# Sélection interactive de la ROI si la vidéo est absente du manifeste ; False : lot sans intervention
+SELECTION_INTERACTIVE = True
+# Magasin JSONL des résultats : chaque lot y ajoute ses lignes (comparaison : python -m tracking_bench.store compare)
+RESULTS_STORE = os.path.join("tracked_videos", "results.jsonl")
+# True : une vidéo annotée par tracker ; False : seulement le journal de boîtes voitures_tracks.npz,
+# rendu à la demande (python -m tracking_bench.tracklog tracked_videos/voitures_tracks.npz --mosaic)
+VIDEOS_ANNOTEES = False
+# Configuration de l'auto-réglage (python -m tracking_bench.tuner voitures.mp4) : si le fichier existe, seul
+# le tracker retenu est testé, à son échelle
+CONFIG_AUTO = "tuned_config.json"
 
 
 # Programme principal
@@ -112,35 +51,67 @@ if __name__ == "__main__":
         "MIL": cv2.legacy.TrackerMIL_create,
         "KCF": cv2.legacy.TrackerKCF_create,
         "TLD": cv2.legacy.TrackerTLD_create,
-        "MEDIANFLOW": cv2.legacy.TrackerMedianFlow_create,
+        "MEDIANFLOW": shared_gray(cv2.legacy.TrackerMedianFlow_create),  # Niveaux de gris partagés (FrameCache)
         "MOSSE": cv2.legacy.TrackerMOSSE_create,
         "CSRT": cv2.legacy.TrackerCSRT_create,
+        "HYBRID": TrackerHybrid_create,
     }
 
-    # Lire la première frame de la vidéo pour sélectionner la ROI
-    cap = cv2.VideoCapture(video_path)
-    ret, frame = cap.read()
-    if not ret:
-        print(f"Erreur : Impossible de lire la première frame de '{video_path}'.")
-        cap.release()
+    # ROI, frame de départ et trackers lus dans le manifeste (sélection interactive si la vidéo en est absente)
+    entry = RoiManifest(ROI_MANIFEST).resolve(video_path, interactive=SELECTION_INTERACTIVE)
+    if entry is None:
+        print(f"Erreur : Aucune ROI pour '{video_path}'.")
         exit()
 
-    print("Veuillez sélectionner l'objet à suivre.")
-    roi = cv2.selectROI("Sélectionner un objet", frame, fromCenter=False, showCrosshair=True)
-    cv2.destroyWindow("Sélectionner un objet")
-    cap.release()
+    roi = tuple(entry["roi"])
+    start_frame = entry["start_frame"]
+
+    # Configuration retenue par l'auto-réglage : tester directement ce tracker à son échelle
+    config = load_tuned_config(CONFIG_AUTO, video_path)
+    if config is not None:
+        TRACKER_TYPES = dict([tuned_tracker(config, TRACKER_TYPES)])
+        print(f"Configuration de l'auto-réglage : {', '.join(TRACKER_TYPES)}")
+    else:
+        TRACKER_TYPES = entry_trackers(entry, TRACKER_TYPES)
+
+    video_output_dir = output_dir if entry["write_video"] and VIDEOS_ANNOTEES else None
 
     # Résultats globaux
     all_results = []
 
-    # Tester chaque tracker
-    for tracker_name, tracker_create in TRACKER_TYPES.items():
-        print(f"  Test du tracker : {tracker_name}")
-        result = test_tracker(video_path, tracker_name, tracker_create, roi, output_dir)
-        if result:
-            all_results.append(result)
+    failures = []
+    if NB_WORKERS > 1:
+        # Répartir les trackers sur le pool de processus, sans affichage (pas de fenêtres concurrentes)
+        jobs = [(test_tracker, (video_path, tracker_name, tracker_create, roi, video_output_dir, True,
+                                PREVIEW_EVERY, start_frame, True))
+                for tracker_name, tracker_create in TRACKER_TYPES.items()]
+
+        print(f"Exécution de {len(jobs)} tests sur {NB_WORKERS} processus.")
+        outcomes = run_grid(jobs, workers=NB_WORKERS, timeout=JOB_TIMEOUT)
+        print_grid_summary(list(TRACKER_TYPES), outcomes)
+
+        for tracker_name, outcome in zip(TRACKER_TYPES, outcomes):
+            if outcome["result"]:
+                all_results.append(outcome["result"])
+            else:
+                failures.append((video_path, tracker_name, outcome["status"]))
+    else:
+        # Tester tous les trackers en un seul décodage de la vidéo
+        print(f"  Test des trackers : {', '.join(TRACKER_TYPES)}")
+        results = test_trackers(video_path, TRACKER_TYPES, roi, video_output_dir, HEADLESS, PREVIEW_EVERY,
+                                record_boxes=True, start_frame=start_frame)
+        if results:
+            all_results.extend(results)
 
     # Enregistrer les résultats dans un fichier
     output_file = os.path.join(output_dir, "tracker_results.txt")
-    save_results_to_file(all_results, output_file)
+    save_results_to_file(all_results, output_file, failures)
     print(f"Résultats enregistrés dans : {output_file}")
+
+    # Journal compact des boîtes de chaque tracker (une vidéo annotée se rend ensuite à la demande)
+    for track_log in save_track_logs(all_results, {video_path: start_frame}, output_dir):
+        print(f"Journal des boîtes enregistré dans : {track_log}")
+
+    # Ajouter le lot au magasin structuré pour le comparer aux lots précédents
+    run_id = append_results(all_results, RESULTS_STORE, script=os.path.basename(__file__))
+    print(f"Lot {run_id} ajouté à : {RESULTS_STORE}")
@@ -0,0 +1,6 @@
+"""
+Outils communs aux scripts de test des trackers OpenCV.
+
+Les scripts des répertoires `test 1`, `test 2`, `test 3` et `Trackers webcam.py`
+ajoutent la racine du dépôt au `sys.path` pour importer ce paquet.
+"""
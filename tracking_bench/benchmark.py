@@ -0,0 +1,273 @@
+import cv2
+import numpy as np
+import psutil
+import time
+import os
+
+from tracking_bench.buffers import FramePool
+from tracking_bench.capture import open_video, video_name
+from tracking_bench.display import create_display
+from tracking_bench.framecache import FrameCache
+from tracking_bench.timing import ProcessMonitor, StageTimer
+from tracking_bench.writer import AsyncVideoWriter
+
+
+# Tester plusieurs trackers en ne décodant la vidéo qu'une seule fois
+def test_trackers(video_path, trackers, roi, output_dir, headless=False, preview_every=0, record_boxes=False,
+                  start_frame=0):
+    """
+    Teste plusieurs trackers sur une vidéo avec un seul décodage.
+
+    Chaque frame lue est transmise à tous les trackers. Chaque tracker dessine
+    sur sa propre image et écrit sa propre vidéo de sortie, de sorte que les
+    résultats sont identiques à ceux d'un appel de `test_tracker` par tracker.
+
+    Chaque étape est chronométrée séparément (horloge monotone) : décodage et
+    attente clavier sont communs à tous les trackers ; init, update, dessin,
+    encodage et affichage sont propres à chacun. `avg_fps` (moyenne de 1 / durée
+    d'update) et `avg_cpu` (CPU de tout le système) sont conservés pour comparer
+    avec les anciens tableaux ; `throughput_fps` (frames / durée totale du
+    pipeline) et `process_cpu_percent` (CPU de ce processus) sont plus fiables.
+
+    `init_ms` (durée de l'init) et `first_update_ms` (moyenne des 5 premiers
+    updates, souvent plus lents) isolent le coût de démarrage d'un tracker.
+
+    Les frames sont décodées dans les tampons d'une `FramePool` et rendues à la
+    réserve après encodage : `frame_allocations` (à comparer à `total_frames`)
+    mesure le renouvellement de la mémoire d'image. Les prétraitements communs
+    à plusieurs trackers passent par un `FrameCache` (`cache_hits`, `cache_misses`).
+
+    :param video_path: Chemin de la vidéo d'entrée, ou source déjà ouverte (séquence synthétique).
+    :param trackers: Dictionnaire {nom du tracker: fonction de création}.
+    :param roi: ROI initiale (x, y, w, h).
+    :param output_dir: Répertoire de sortie des vidéos annotées (None : aucune vidéo écrite).
+    :param headless: True pour ne faire aucun appel graphique dans la boucle de suivi.
+    :param preview_every: En mode sans affichage, aperçu d'une frame sur N dans un thread séparé.
+    :param record_boxes: True pour ajouter aux résultats les boîtes de chaque frame ("boxes", tableau N×4)
+                         et les succès ("success", tableau N), la frame 0 portant la ROI initiale.
+    :param start_frame: Frame sur laquelle les trackers sont initialisés.
+    :return: Liste des résultats (un dictionnaire par tracker), ou None.
+    """
+    monitor = ProcessMonitor()
+    shared_timer = StageTimer()
+    pool = FramePool()
+    cache = FrameCache()
+
+    cap = open_video(video_path)
+    if not cap.isOpened():
+        print(f"Erreur : Impossible d'ouvrir la vidéo '{video_path}'.")
+        return None
+
+    if start_frame > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    # Lire le premier cadre
+    with shared_timer.stage("decode"):
+        ret, frame = pool.read(cap)
+    if not ret:
+        print(f"Erreur : Impossible de lire le flux vidéo pour '{video_path}'.")
+        cap.release()
+        return None
+
+    # Paramètres communs des vidéos de sortie
+    name = video_name(video_path)
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+    fps = int(cap.get(cv2.CAP_PROP_FPS))
+    frame_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+
+    # Initialiser chaque tracker avec le ROI fourni et son écrivain vidéo
+    runs = []
+    for tracker_name, tracker_create in trackers.items():
+        timer = StageTimer()
+        with timer.stage("init"):
+            tracker = tracker_create()
+            tracker.init(frame, roi)
+
+        out = None
+        if output_dir is not None:
+            output_path = os.path.join(output_dir, f"{name}_{tracker_name}.mp4")
+            out = AsyncVideoWriter(output_path, fourcc, fps, frame_size, pool=pool)
+
+        runs.append({
+            "name": tracker_name,
+            "tracker": tracker,
+            "out": out,
+            "timer": timer,
+            "boxes": [tuple(roi)],
+            "success": [True],
+            "fps_list": [],
+            "cpu_usage": [],
+            "total_frames": 0,
+        })
+
+    pool.release(frame)
+    display = create_display(headless, preview_every)
+
+    # Sans vidéo de sortie ni affichage, les annotations ne servent à rien
+    annotate = output_dir is not None or not headless or preview_every > 0
+
+    stop = False
+    while not stop:
+        decode_start = time.perf_counter_ns()
+        ret, frame = pool.read(cap)
+        shared_timer.add("decode", time.perf_counter_ns() - decode_start)
+        if not ret:
+            break
+
+        # La frame décodée revient à la réserve à la fin de l'itération, sauf si un écrivain la garde
+        frame_kept = False
+
+        # Prétraitements communs (niveaux de gris, image réduite) calculés une fois pour tous les trackers
+        shared_frame = cache.publish(frame, len(runs))
+
+        for index, run in enumerate(runs):
+            timer = run["timer"]
+
+            update_start = time.perf_counter_ns()
+            success, box = run["tracker"].update(shared_frame)
+            update_end = time.perf_counter_ns()
+            cache.release(shared_frame)
+            timer.add("update", update_end - update_start)
+
+            elapsed_time = (update_end - update_start) / 1e9
+            frame_fps = 1 / elapsed_time if elapsed_time > 0 else 0
+            run["fps_list"].append(frame_fps)
+
+            cpu_percent = psutil.cpu_percent(interval=None)
+            run["cpu_usage"].append(cpu_percent)
+
+            if record_boxes:
+                run["boxes"].append(tuple(box) if success else (0, 0, 0, 0))
+                run["success"].append(bool(success))
+
+            if not annotate:
+                continue
+
+            # Les trackers suivants ont besoin de la frame intacte : seul le dernier dessine dessus
+            canvas = frame if index == len(runs) - 1 else pool.copy(frame)
+
+            if success:
+                x, y, w, h = [int(v) for v in box]
+                cv2.rectangle(canvas, (x, y), (x + w, y + h), (0, 255, 0), 2)
+            else:
+                cv2.putText(canvas, "Echec du suivi !", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.75, (0, 0, 255), 2)
+
+            # Ajouter texte sur la vidéo
+            cv2.putText(canvas, f"{run['name']} FPS: {frame_fps:.2f}", (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.75,
+                        (255, 255, 255), 2)
+            draw_end = time.perf_counter_ns()
+            timer.add("draw", draw_end - update_end)
+
+            # Écrire la frame dans la vidéo de sortie (encodage sur le thread de l'écrivain)
+            if run["out"] is not None:
+                run["out"].write(canvas)  # Rendu à la réserve par l'écrivain après encodage
+                frame_kept = frame_kept or canvas is frame
+            encode_end = time.perf_counter_ns()
+            timer.add("encode", encode_end - draw_end)
+
+            # Afficher la vidéo
+            display.show(f"Suivi - {run['name']}", canvas)
+            timer.add("display", time.perf_counter_ns() - encode_end)
+
+            if run["out"] is None and canvas is not frame:
+                pool.release(canvas)
+
+        if not frame_kept:
+            pool.release(frame)
+
+        # Quitter avec 'q'
+        with shared_timer.stage("waitkey"):
+            stop = display.poll_quit()
+        if stop:
+            continue
+
+        for run in runs:
+            run["total_frames"] += 1
+
+    cap.release()
+    for run in runs:
+        if run["out"] is not None:
+            run["out"].release()  # Vider les files d'encodage et fermer les écrivains vidéo
+    display.close()
+
+    resources = monitor.summary()
+    frame_memory = pool.stats()
+    cache_stats = cache.stats()
+    shared_latency = shared_timer.summary()
+    shared_time = shared_timer.total("decode") + shared_timer.total("waitkey")
+
+    # Calculer les métriques de chaque tracker
+    results = []
+    for run in runs:
+        fps_list = run["fps_list"]
+        cpu_usage = run["cpu_usage"]
+        timer = run["timer"]
+
+        # Durée du pipeline vue par ce tracker : étapes communes + ses propres étapes (hors init)
+        pipeline_time = shared_time + sum(timer.total(stage) for stage in ("update", "draw", "encode", "display"))
+        update_time = timer.total("update")
+
+        results.append({
+            "video": name,
+            "tracker": run["name"],
+            "avg_fps": sum(fps_list) / len(fps_list) if fps_list else 0,
+            "avg_cpu": sum(cpu_usage) / len(cpu_usage) if cpu_usage else 0,
+            "total_frames": run["total_frames"],
+            "throughput_fps": run["total_frames"] / pipeline_time if pipeline_time > 0 else 0,
+            "update_fps": len(fps_list) / update_time if update_time > 0 else 0,
+            "init_ms": timer.total("init") * 1000,
+            "first_update_ms": float(np.mean(timer.samples["update"][:5])) / 1e6 if timer.samples["update"] else 0.0,
+            "latency": {**shared_latency, **timer.summary()},
+            "encode_blocked_s": run["out"].blocked_time if run["out"] is not None else 0.0,
+            **resources,
+            **frame_memory,
+            **cache_stats,
+        })
+        if record_boxes:
+            results[-1]["boxes"] = np.array(run["boxes"], dtype=np.float64)
+            results[-1]["success"] = np.array(run["success"], dtype=bool)
+
+    return results
+
+
+# Fonction pour tester le tracker et collecter les métriques
+def test_tracker(video_path, tracker_name, tracker_create, roi, output_dir, headless=False, preview_every=0,
+                 start_frame=0, record_boxes=False):
+    results = test_trackers(video_path, {tracker_name: tracker_create}, roi, output_dir, headless, preview_every,
+                            record_boxes=record_boxes, start_frame=start_frame)
+    return results[0] if results else None
+
+
+# Enregistrer les résultats dans un fichier
+def save_results_to_file(results, output_file, failures=None):
+    """
+    Écrit le tableau des résultats, groupé par vidéo si plusieurs vidéos sont présentes.
+
+    :param results: Liste des dictionnaires retournés par `test_tracker`.
+    :param output_file: Chemin du fichier texte.
+    :param failures: Liste optionnelle de tuples (vidéo, tracker, raison) des tâches échouées.
+    """
+    videos = {result.get("video") for result in results}
+
+    with open(output_file, 'w') as file:
+        # Écrire l'entête du tableau
+        file.write(f"{'Tracker':<15}{'FPS Moyen':<15}{'CPU Moyen (%)':<15}{'Frames Traitées':<17}"
+                   f"{'Débit (FPS)':<15}{'Update p95 (ms)':<16}\n")
+        file.write("=" * 93 + "\n")
+
+        # Écrire chaque résultat
+        current_video = None
+        for result in results:
+            if len(videos) > 1 and result.get("video") != current_video:
+                current_video = result.get("video")
+                file.write(f"-------{current_video}\n")
+            file.write(
+                f"{result['tracker']:<15}{result['avg_fps']:<15.2f}{result['avg_cpu']:<15.2f}{result['total_frames']:<17}"
+                f"{result['throughput_fps']:<15.2f}{result['latency']['update']['p95_ms']:<16.2f}\n")
+
+        # Lister les tâches qui n'ont pas abouti
+        if failures:
+            file.write("\nÉchecs\n")
+            file.write("=" * 93 + "\n")
+            for video, tracker_name, reason in failures:
+                file.write(f"{tracker_name:<15}{video:<30}{reason}\n")
@@ -0,0 +1,112 @@
+import threading
+import weakref
+
+import cv2
+import numpy as np
+
+
+class FramePool:
+    """
+    Réserve de tampons d'image réutilisables.
+
+    `read(cap)` décode directement dans un tampon libre (`cap.read(tampon)`)
+    au lieu de laisser OpenCV allouer un nouveau tableau à chaque frame, et
+    `acquire()` fournit les images de travail (calque d'annotation, copie pour
+    un autre tracker). Un tampon revient dans la réserve avec `release()`,
+    y compris depuis un autre thread (écrivain vidéo) : une fois la réserve
+    remplie, la boucle de suivi ne fait plus aucune allocation d'image.
+
+    Seuls les tampons créés par la réserve y reviennent : `release()` ignore
+    les autres tableaux (frames d'une source préchargée ou synthétique), qui
+    seraient sinon écrasés par un décodage suivant.
+
+    Les compteurs `allocations` et `reuses` mesurent le renouvellement de la
+    mémoire : sans réserve, chaque frame décodée ou copiée est une allocation.
+    """
+
+    def __init__(self):
+        self.free = {}
+        self.owned = weakref.WeakValueDictionary()  # id → tampon créé par la réserve
+        self.lock = threading.Lock()
+        self.allocations = 0
+        self.allocated_bytes = 0
+        self.reuses = 0
+
+    def acquire(self, shape, dtype=np.uint8):
+        """
+        :return: Tampon de forme `shape` (contenu indéfini), alloué seulement si la réserve est vide.
+        """
+        key = (tuple(shape), np.dtype(dtype))
+        with self.lock:
+            buffers = self.free.get(key)
+            if buffers:
+                self.reuses += 1
+                return buffers.pop()
+            self.allocations += 1
+            self.allocated_bytes += int(np.prod(shape)) * key[1].itemsize
+            buffer = np.empty(shape, dtype=dtype)
+            self.owned[id(buffer)] = buffer
+        return buffer
+
+    def release(self, buffer):
+        """
+        Rend un tampon à la réserve. Il ne doit plus être utilisé par l'appelant.
+
+        Un tableau qui ne vient pas de la réserve est ignoré.
+        """
+        if buffer is None:
+            return
+        with self.lock:
+            if self.owned.get(id(buffer)) is not buffer:
+                return
+            self.free.setdefault((buffer.shape, buffer.dtype), []).append(buffer)
+
+    def read(self, cap, shape=None):
+        """
+        Lit la frame suivante dans un tampon de la réserve.
+
+        :param cap: `cv2.VideoCapture` ou source possédant une méthode `read()`.
+        :param shape: Forme des frames (par défaut : déduite des propriétés de la source).
+        :return: Tuple (ret, frame) comme `cv2.VideoCapture.read()` ; la frame est à rendre avec `release()`.
+        """
+        if not isinstance(cap, cv2.VideoCapture):
+            # Les autres sources fournissent leurs propres tableaux
+            ret, frame = cap.read()
+            if ret:
+                with self.lock:
+                    self.allocations += 1
+                    self.allocated_bytes += frame.nbytes
+            return ret, frame
+
+        if shape is None:
+            shape = (int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+        buffer = self.acquire(shape)
+        ret, frame = cap.read(buffer)
+        if not ret:
+            self.release(buffer)
+            return False, None
+        if frame is not buffer:
+            # Format inattendu : OpenCV a dû allouer sa propre image
+            self.release(buffer)
+            with self.lock:
+                self.allocations += 1
+                self.allocated_bytes += frame.nbytes
+        return True, frame
+
+    def copy(self, frame):
+        """
+        :return: Copie de `frame` dans un tampon de la réserve.
+        """
+        buffer = self.acquire(frame.shape, frame.dtype)
+        np.copyto(buffer, frame)
+        return buffer
+
+    def stats(self):
+        """
+        :return: Dictionnaire des allocations (nombre et Mo) et des réutilisations de tampons.
+        """
+        return {
+            "frame_allocations": self.allocations,
+            "frame_allocated_mb": self.allocated_bytes / (1024 * 1024),
+            "frame_reuses": self.reuses,
+        }
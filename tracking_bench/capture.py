@@ -0,0 +1,255 @@
+import collections
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+def open_video(source):
+    """
+    Ouvre une source vidéo : chemin, index de caméra, ou objet déjà ouvert
+    possédant une méthode `read()` (séquence synthétique, relecture cadencée).
+
+    :return: Objet utilisable comme `cv2.VideoCapture`.
+    """
+    return source if hasattr(source, "read") else cv2.VideoCapture(source)
+
+
+def video_name(source):
+    """
+    :return: Nom court de la source, utilisé pour nommer les fichiers de sortie.
+    """
+    if hasattr(source, "read"):
+        return getattr(source, "name", type(source).__name__)
+    return os.path.basename(str(source)).split('.')[0]
+
+
+class ReplayCapture:
+    """
+    Relecture d'une vidéo ou d'une séquence synthétique au rythme d'une caméra.
+
+    La frame i est « capturée » à l'instant t0 + i / fps (plus une gigue
+    gaussienne éventuelle), t0 étant l'instant de la première lecture. `read()`
+    attend l'arrivée de la frame suivante comme le pilote d'une caméra ; si
+    l'appelant est en retard, les frames arrivées entre-temps sont perdues,
+    comme une caméra dont le tampon est écrasé, et comptées dans
+    `frames_dropped`. `frame_timestamp` donne l'instant nominal de capture de
+    la dernière frame rendue.
+
+    S'utilise comme `cv2.VideoCapture` et peut donc remplacer `cv2.VideoCapture(0)`,
+    y compris derrière `ThreadedCapture`.
+    """
+
+    def __init__(self, source, fps=None, jitter_ms=0.0, seed=0, preload=False):
+        """
+        :param source: Chemin de vidéo ou objet possédant une méthode `read()` (séquence synthétique).
+        :param fps: Fréquence de relecture (par défaut : fréquence nominale de la source).
+        :param jitter_ms: Écart-type de la gigue des instants de capture, en millisecondes.
+        :param seed: Graine de la gigue.
+        :param preload: True pour décoder toute la source en mémoire avant la relecture, afin que le
+                        coût du décodage ne s'ajoute pas à celui du suivi (comme une vraie caméra).
+        """
+        self.cap = open_video(source)
+        self.name = video_name(source)
+        self.fps = float(fps or self.cap.get(cv2.CAP_PROP_FPS) or 30)
+        self.period = 1.0 / self.fps
+        self.jitter = jitter_ms / 1000
+        self.seed = seed
+
+        self.frames = None
+        if preload:
+            self.frames = []
+            while True:
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                self.frames.append(frame)
+
+        self.start_time = None
+        self.base_index = 0
+        self.index = 0
+        self.frame_timestamp = None
+        self.frames_dropped = 0
+
+    def restart(self):
+        """Repart de l'instant présent au prochain `read()` sans perdre la position (après une pause)."""
+        self.start_time = None
+        self.base_index = self.index
+
+    # Instant de capture de la frame `index` (gigue bornée à une demi-période pour garder l'ordre)
+    def _due(self, index):
+        offset = 0.0
+        if self.jitter > 0:
+            offset = np.random.default_rng([self.seed, index]).normal(0, self.jitter)
+            offset = float(np.clip(offset, -self.period / 2, self.period / 2))
+        return self.start_time + (index - self.base_index) * self.period + offset
+
+    def _next(self):
+        if self.frames is not None:
+            if self.index >= len(self.frames):
+                return False, None
+            return True, self.frames[self.index]
+        return self.cap.read()
+
+    def _skip(self):
+        if self.frames is not None:
+            return self.index < len(self.frames)
+        return self.cap.grab()
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def read(self):
+        now = time.perf_counter()
+        if self.start_time is None:
+            self.start_time = now
+            self.base_index = self.index
+
+        # Les frames dont la suivante est déjà arrivée ont été écrasées
+        while self._due(self.index + 1) <= now:
+            if not self._skip():
+                return False, None
+            self.index += 1
+            self.frames_dropped += 1
+
+        due = self._due(self.index)
+        if due > now:
+            time.sleep(due - now)
+
+        ret, frame = self._next()
+        if not ret:
+            return False, None
+        self.frame_timestamp = due
+        self.index += 1
+        return True, frame
+
+    def get(self, prop_id):
+        if prop_id == cv2.CAP_PROP_FPS:
+            return self.fps
+        return self.cap.get(prop_id)
+
+    def release(self):
+        self.frames = None
+        self.cap.release()
+
+
+class ThreadedCapture:
+    """
+    Capture vidéo sur un thread d'arrière-plan avec la politique « garder la plus récente ».
+
+    Le thread lit la source en continu et place les frames dans un tampon
+    circulaire borné. `read()` rend toujours la frame la plus récente et jette
+    les plus anciennes : quand le tracker est plus lent que la caméra, il
+    travaille sur l'image actuelle au lieu de rattraper un retard qui s'accumule
+    dans le tampon du pilote. Les frames jetées sont comptées, et le délai entre
+    la capture et l'affichage est mesuré avec `record_display()`.
+
+    S'utilise comme `cv2.VideoCapture` : `isOpened()`, `read()`, `get()`, `release()`.
+    """
+
+    def __init__(self, source, buffer_size=2):
+        """
+        :param source: Index de caméra, chemin de vidéo, ou objet possédant une méthode `read()`.
+        :param buffer_size: Nombre maximal de frames conservées dans le tampon circulaire.
+        """
+        self.cap = open_video(source)
+        if isinstance(self.cap, cv2.VideoCapture):
+            # Limiter le tampon du pilote quand le backend le permet
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        self.buffer = collections.deque(maxlen=buffer_size)
+        self.condition = threading.Condition()
+        self.stopped = False
+        self.thread = threading.Thread(target=self._reader, daemon=True)
+
+        self.frame_timestamp = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.condition:
+            self.frames_captured = 0
+            self.frames_delivered = 0
+            self.frames_dropped = 0
+            self.latencies = []
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def get(self, prop_id):
+        return self.cap.get(prop_id)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    # Boucle de lecture du thread de capture
+    def _reader(self):
+        while not self.stopped:
+            ret, frame = self.cap.read()
+            timestamp = time.perf_counter()
+
+            with self.condition:
+                if not ret:
+                    self.stopped = True
+                    self.condition.notify_all()
+                    break
+
+                # Le tampon plein perd sa frame la plus ancienne
+                if len(self.buffer) == self.buffer.maxlen:
+                    self.frames_dropped += 1
+                self.buffer.append((frame, timestamp))
+                self.frames_captured += 1
+                self.condition.notify_all()
+
+    def read(self, timeout=None):
+        """
+        Rend la frame la plus récente et jette celles qui attendaient dans le tampon.
+
+        Bloque jusqu'à l'arrivée d'une nouvelle frame si le tampon est vide.
+
+        :param timeout: Attente maximale en secondes (None : pas de limite).
+        :return: Tuple (ret, frame) comme `cv2.VideoCapture.read()`.
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.buffer or self.stopped, timeout)
+            if not self.buffer:
+                return False, None
+
+            frame, self.frame_timestamp = self.buffer.pop()
+            self.frames_dropped += len(self.buffer)
+            self.buffer.clear()
+            self.frames_delivered += 1
+
+        return True, frame
+
+    def record_display(self):
+        """
+        Enregistre le délai capture → affichage de la dernière frame rendue par `read()`.
+
+        :return: Délai en millisecondes.
+        """
+        latency = (time.perf_counter() - self.frame_timestamp) * 1000
+        self.latencies.append(latency)
+        return latency
+
+    def stats(self):
+        """
+        :return: Dictionnaire des compteurs de frames et des délais capture → affichage (ms).
+        """
+        latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+        return {
+            "captured": self.frames_captured,
+            "delivered": self.frames_delivered,
+            "dropped": self.frames_dropped,
+            "latency_p50_ms": float(np.percentile(latencies, 50)),
+            "latency_p95_ms": float(np.percentile(latencies, 95)),
+            "latency_max_ms": float(latencies.max()),
+        }
+
+    def release(self):
+        self.stopped = True
+        if self.thread.is_alive():
+            self.thread.join()
+        self.cap.release()
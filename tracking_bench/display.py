@@ -0,0 +1,107 @@
+import threading
+
+import cv2
+
+
+class InlineDisplay:
+    """Affichage classique : `cv2.imshow` et `cv2.waitKey(1)` à chaque frame."""
+
+    def show(self, window_name, frame):
+        cv2.imshow(window_name, frame)
+
+    # Quitter avec 'q'
+    def poll_quit(self):
+        return cv2.waitKey(1) & 0xFF == ord('q')
+
+    def close(self):
+        cv2.destroyAllWindows()
+
+
+class NullDisplay:
+    """Mode sans affichage : aucun appel à l'interface graphique."""
+
+    def show(self, window_name, frame):
+        pass
+
+    def poll_quit(self):
+        return False
+
+    def close(self):
+        pass
+
+
+class PreviewWindow:
+    """
+    Aperçu limité pour le mode sans affichage.
+
+    Seule une frame sur `every` est copiée et transmise à un thread séparé qui
+    se charge de `cv2.imshow` et `cv2.waitKey`. La boucle de suivi ne fait
+    aucun appel graphique, et les mesures ne portent que sur le suivi. La
+    touche 'q' dans la fenêtre d'aperçu demande l'arrêt.
+    """
+
+    def __init__(self, every=10):
+        """
+        :param every: Afficher une frame sur `every` (par fenêtre).
+        """
+        self.every = max(1, every)
+        self.counters = {}
+        self.pending = {}
+        self.condition = threading.Condition()
+        self.closed = False
+        self.stop_requested = False
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def show(self, window_name, frame):
+        count = self.counters.get(window_name, 0)
+        self.counters[window_name] = count + 1
+        if count % self.every:
+            return
+
+        with self.condition:
+            # Seule la dernière frame de chaque fenêtre est gardée
+            self.pending[window_name] = frame.copy()
+            self.condition.notify()
+
+    def poll_quit(self):
+        return self.stop_requested
+
+    # Boucle du thread d'affichage
+    def _loop(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending or self.closed, 0.05)
+                if self.closed:
+                    break
+                items = list(self.pending.items())
+                self.pending.clear()
+
+            for window_name, frame in items:
+                cv2.imshow(window_name, frame)
+            if self.counters and cv2.waitKey(1) & 0xFF == ord('q'):
+                self.stop_requested = True
+
+        cv2.destroyAllWindows()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
+
+
+def create_display(headless=False, preview_every=0):
+    """
+    Choisit l'affichage des boucles de suivi.
+
+    :param headless: True pour n'effectuer aucun appel graphique dans la boucle.
+    :param preview_every: En mode sans affichage, montrer une frame sur N dans un
+                          thread séparé (0 : aucun aperçu).
+    :return: Objet possédant les méthodes `show()`, `poll_quit()` et `close()`.
+    """
+    if not headless:
+        return InlineDisplay()
+    if preview_every:
+        return PreviewWindow(preview_every)
+    return NullDisplay()
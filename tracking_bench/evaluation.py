@@ -0,0 +1,159 @@
+import os
+import re
+
+import numpy as np
+
+# Seuils des courbes OTB : recouvrement (IoU) et erreur du centre en pixels
+SUCCESS_THRESHOLDS = np.linspace(0, 1, 21)
+PRECISION_THRESHOLDS = np.arange(0, 51)
+
+
+def load_ground_truth(path):
+    """
+    Charge les boîtes de vérité terrain, une ligne par frame : x, y, w, h.
+
+    Les séparateurs virgule, tabulation et espace sont acceptés (format OTB).
+    Une ligne "NaN" ou une boîte de taille nulle marque une frame sans cible.
+
+    :param path: Chemin du fichier texte.
+    :return: Tableau N×4 de flottants.
+    """
+    with open(path) as file:
+        rows = [re.split(r"[,\s]+", line.strip()) for line in file if line.strip()]
+    return np.array([[float(v) for v in row[:4]] for row in rows], dtype=np.float64)
+
+
+def find_ground_truth(video_path):
+    """
+    :return: Chemin du fichier de vérité terrain de la vidéo (`<vidéo>.txt` ou
+             `<vidéo>_gt.txt`), ou None s'il n'existe pas.
+    """
+    base = os.path.splitext(video_path)[0]
+    for path in (f"{base}.txt", f"{base}_gt.txt"):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def iou(boxes_a, boxes_b):
+    """
+    Recouvrement (intersection sur union) de boîtes (x, y, w, h), calculé en bloc.
+
+    :param boxes_a: Tableau (..., 4).
+    :param boxes_b: Tableau (..., 4) de même forme (ou diffusable).
+    :return: Tableau (...) des IoU, 0 pour les boîtes vides.
+    """
+    boxes_a, boxes_b = np.asarray(boxes_a, dtype=np.float64), np.asarray(boxes_b, dtype=np.float64)
+    x0 = np.maximum(boxes_a[..., 0], boxes_b[..., 0])
+    y0 = np.maximum(boxes_a[..., 1], boxes_b[..., 1])
+    x1 = np.minimum(boxes_a[..., 0] + boxes_a[..., 2], boxes_b[..., 0] + boxes_b[..., 2])
+    y1 = np.minimum(boxes_a[..., 1] + boxes_a[..., 3], boxes_b[..., 1] + boxes_b[..., 3])
+    intersection = np.clip(x1 - x0, 0, None) * np.clip(y1 - y0, 0, None)
+    union = boxes_a[..., 2] * boxes_a[..., 3] + boxes_b[..., 2] * boxes_b[..., 3] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(union), where=union > 0)
+
+
+def centre_error(boxes_a, boxes_b):
+    """
+    Distance entre les centres de boîtes (x, y, w, h), calculée en bloc.
+
+    :return: Tableau (...) des distances en pixels.
+    """
+    boxes_a, boxes_b = np.asarray(boxes_a, dtype=np.float64), np.asarray(boxes_b, dtype=np.float64)
+    delta = (boxes_a[..., :2] + boxes_a[..., 2:] / 2) - (boxes_b[..., :2] + boxes_b[..., 2:] / 2)
+    return np.hypot(delta[..., 0], delta[..., 1])
+
+
+def success_curve(ious, thresholds=SUCCESS_THRESHOLDS):
+    """
+    Courbe de succès OTB : part des frames dont l'IoU dépasse chaque seuil.
+
+    :param ious: Tableau (..., N) des IoU par frame.
+    :return: Tableau (..., len(thresholds)).
+    """
+    return (np.asarray(ious)[..., None, :] > thresholds[:, None]).mean(axis=-1)
+
+
+def precision_curve(errors, thresholds=PRECISION_THRESHOLDS):
+    """
+    Courbe de précision OTB : part des frames dont l'erreur du centre est sous chaque seuil.
+
+    :param errors: Tableau (..., N) des erreurs du centre en pixels.
+    :return: Tableau (..., len(thresholds)).
+    """
+    return (np.asarray(errors)[..., None, :] <= thresholds[:, None]).mean(axis=-1)
+
+
+def evaluate(boxes, success, ground_truth):
+    """
+    Évalue des boîtes prédites par rapport à la vérité terrain.
+
+    Les trackers peuvent être évalués ensemble en empilant leurs boîtes sur un
+    premier axe : tous les calculs sont faits en bloc par NumPy. Une frame en
+    échec compte comme une IoU nulle et une erreur infinie ; les frames sans
+    cible dans la vérité terrain sont ignorées.
+
+    :param boxes: Tableau (..., N, 4) des boîtes prédites, la frame 0 portant la ROI initiale.
+    :param success: Tableau (..., N) des succès du tracker.
+    :param ground_truth: Tableau (M, 4) de la vérité terrain.
+    :return: Dictionnaire des IoU et erreurs par frame, des courbes, de l'AUC, de la
+             précision à 20 pixels et de l'IoU moyenne.
+    """
+    boxes, success = np.asarray(boxes, dtype=np.float64), np.asarray(success, dtype=bool)
+    frames = min(boxes.shape[-2], len(ground_truth))
+    boxes, success, ground_truth = boxes[..., :frames, :], success[..., :frames], ground_truth[:frames]
+
+    valid = np.isfinite(ground_truth).all(axis=1) & (ground_truth[:, 2] > 0) & (ground_truth[:, 3] > 0)
+    boxes, success, ground_truth = boxes[..., valid, :], success[..., valid], ground_truth[valid]
+
+    ious = np.where(success, iou(boxes, ground_truth), 0.0)
+    errors = np.where(success, centre_error(boxes, ground_truth), np.inf)
+    success_rates = success_curve(ious)
+    precision_rates = precision_curve(errors)
+
+    return {
+        "frames": int(valid.sum()),
+        "iou": ious,
+        "centre_error": errors,
+        "success_curve": success_rates,
+        "precision_curve": precision_rates,
+        "auc": success_rates.mean(axis=-1),
+        "precision_20": precision_rates[..., 20],
+        "mean_iou": ious.mean(axis=-1),
+    }
+
+
+def evaluate_trackers(results, ground_truth):
+    """
+    Évalue tous les trackers d'un appel à `test_trackers(..., record_boxes=True)` en un seul bloc.
+
+    :param results: Liste des résultats contenant "boxes" et "success".
+    :param ground_truth: Tableau (M, 4) de la vérité terrain.
+    :return: Liste de dictionnaires {"tracker", "auc", "precision_20", "mean_iou", "frames"}.
+    """
+    frames = min(min(len(result["boxes"]) for result in results), len(ground_truth))
+    boxes = np.stack([result["boxes"][:frames] for result in results])
+    success = np.stack([result["success"][:frames] for result in results])
+    scores = evaluate(boxes, success, ground_truth)
+
+    return [
+        {
+            "tracker": result["tracker"],
+            "video": result.get("video"),
+            "auc": float(scores["auc"][index]),
+            "precision_20": float(scores["precision_20"][index]),
+            "mean_iou": float(scores["mean_iou"][index]),
+            "frames": scores["frames"],
+        }
+        for index, result in enumerate(results)
+    ]
+
+
+# Enregistrer les scores de précision dans un fichier
+def save_accuracy_to_file(scores, output_file):
+    with open(output_file, 'w') as file:
+        file.write(f"{'Tracker':<15}{'Vidéo':<25}{'AUC':<10}{'Précision@20':<15}{'IoU Moyenne':<15}{'Frames':<10}\n")
+        file.write("=" * 90 + "\n")
+        for score in scores:
+            file.write(f"{score['tracker']:<15}{score['video'] or '':<25}{score['auc']:<10.3f}"
+                       f"{score['precision_20']:<15.3f}{score['mean_iou']:<15.3f}{score['frames']:<10}\n")
@@ -0,0 +1,166 @@
+import functools
+import threading
+
+import cv2
+import numpy as np
+
+
+def _gray(frame):
+    return frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+
+def _resize(frame, scale):
+    return cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+
+# Représentations partagées : nom → fonction (frame, *paramètres)
+BUILDERS = {
+    "gray": _gray,
+    "resize": _resize,
+}
+
+
+class CachedFrame(np.ndarray):
+    """
+    Vue d'une frame publiée dans un `FrameCache` (aucune copie).
+
+    Se passe aux trackers comme un tableau NumPy ordinaire ; `shared()` y
+    retrouve le cache de la frame. Les sous-tableaux (découpes) ne sont plus
+    rattachés au cache.
+    """
+
+    def __array_finalize__(self, obj):
+        self.cache = None
+        self.token = None
+
+
+class FrameCache:
+    """
+    Cache des prétraitements d'une frame communs à plusieurs trackers.
+
+    `publish(frame, consumers)` rend une vue de la frame rattachée au cache.
+    Chaque représentation (niveaux de gris, image réduite) est calculée au plus
+    une fois par frame par le premier tracker qui la demande avec `shared()`,
+    puis servie aux suivants. Chaque consommateur appelle `release()` une fois
+    la frame traitée ; quand tous l'ont fait, les représentations de la frame
+    sont libérées. Le cache est sûr entre threads
+    (`MultiObjectTracker`).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.next_token = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def publish(self, frame, consumers):
+        """
+        :param frame: Frame décodée.
+        :param consumers: Nombre de consommateurs qui appelleront `release()`.
+        :return: Vue `CachedFrame` de la frame (non rattachée au cache s'il n'y a aucun consommateur).
+        """
+        view = frame.view(CachedFrame)
+        if consumers <= 0:
+            return view  # Personne ne libérerait l'entrée : pas d'entrée
+        with self.lock:
+            view.cache = self
+            view.token = self.next_token
+            self.next_token += 1
+            self.entries[view.token] = {"refs": consumers, "values": {}, "lock": threading.Lock()}
+        return view
+
+    def get(self, frame, key):
+        """
+        :param frame: Vue publiée par `publish()`.
+        :param key: Tuple (nom de la représentation, *paramètres).
+        :return: Représentation, calculée si elle n'est pas encore en cache.
+        """
+        with self.lock:
+            entry = self.entries.get(frame.token)
+        if entry is None:
+            # Frame déjà libérée par tous ses consommateurs : calcul direct
+            return BUILDERS[key[0]](frame, *key[1:])
+
+        # Un seul calcul par représentation, même si plusieurs threads la demandent en même temps
+        with entry["lock"]:
+            if key in entry["values"]:
+                value = entry["values"][key]
+                hit = True
+            else:
+                value = entry["values"][key] = BUILDERS[key[0]](frame, *key[1:])
+                hit = False
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return value
+
+    def release(self, frame):
+        """
+        Signale qu'un consommateur a fini avec la frame ; le dernier libère ses représentations.
+        """
+        with self.lock:
+            entry = self.entries.get(frame.token)
+            if entry is None:
+                return
+            entry["refs"] -= 1
+            if entry["refs"] <= 0:
+                del self.entries[frame.token]
+                self.evictions += 1
+
+    def stats(self):
+        """
+        :return: Dictionnaire des succès et échecs du cache et du nombre de frames libérées.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+            "cache_hit_rate": self.hits / lookups if lookups else 0.0,
+            "cache_evictions": self.evictions,
+        }
+
+
+def shared(frame, name, *params):
+    """
+    Représentation `name` de la frame, partagée si la frame a été publiée dans un `FrameCache`.
+
+    :param frame: Frame (vue `CachedFrame` ou tableau ordinaire).
+    :param name: "gray" ou "resize" (paramètre : échelle).
+    :return: Représentation calculée ou lue dans le cache.
+    """
+    cache = getattr(frame, "cache", None)
+    if cache is None:
+        return BUILDERS[name](frame, *params)
+    return cache.get(frame, (name, *params))
+
+
+class SharedGrayTracker:
+    """
+    Alimente un tracker OpenCV avec l'image en niveaux de gris partagée.
+
+    Réservé aux trackers qui convertissent eux-mêmes la frame en niveaux de
+    gris avec le même résultat (MEDIANFLOW : boîtes identiques) : la
+    conversion est faite une fois par frame pour tous ces trackers.
+
+    S'utilise comme un tracker OpenCV : `init(frame, roi)` et `update(frame)`.
+    """
+
+    def __init__(self, tracker_create):
+        self.tracker = tracker_create()
+
+    def init(self, frame, roi):
+        return self.tracker.init(shared(frame, "gray"), roi)
+
+    def update(self, frame):
+        return self.tracker.update(shared(frame, "gray"))
+
+
+def shared_gray(tracker_create):
+    """
+    :return: Fonction de création d'un `SharedGrayTracker` (sérialisable pour `run_grid`).
+    """
+    return functools.partial(SharedGrayTracker, tracker_create)
@@ -0,0 +1,211 @@
+import cv2
+import numpy as np
+
+from tracking_bench.framecache import shared
+
+# Trackers rapides utilisables en premier niveau de la cascade
+FAST_TRACKERS = {
+    "KCF": cv2.legacy.TrackerKCF_create,
+    "MOSSE": cv2.legacy.TrackerMOSSE_create,
+}
+
+
+# Extraire la zone d'une boîte, réduite à une petite imagette en niveaux de gris
+def box_patch(frame, box, size=(16, 16)):
+    if getattr(frame, "cache", None) is not None:
+        # Frame publiée dans un `FrameCache` : découpe dans l'image en niveaux de gris partagée
+        frame = shared(frame, "gray")
+    x, y, w, h = [int(round(v)) for v in box]
+    frame_h, frame_w = frame.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + w, frame_w), min(y + h, frame_h)
+    if x1 - x0 < 2 or y1 - y0 < 2:
+        return None
+
+    patch = cv2.resize(frame[y0:y1, x0:x1], size, interpolation=cv2.INTER_AREA)
+    if patch.ndim == 3:
+        patch = cv2.cvtColor(patch, cv2.COLOR_BGR2GRAY)
+    return patch.astype(np.float32)
+
+
+# Corrélation normalisée entre le modèle d'apparence et une imagette (-1 à 1)
+def patch_confidence(template, patch):
+    if patch is None:
+        return 0.0
+    return float(cv2.matchTemplate(patch, template, cv2.TM_CCOEFF_NORMED)[0, 0])
+
+
+# Fenêtre de recherche autour d'une boîte, limitée à l'image : (x, y, largeur, hauteur)
+def search_window(frame_shape, box, margin=1.5):
+    x, y, w, h = box
+    frame_h, frame_w = frame_shape[:2]
+    x0 = int(max(x - margin * w, 0))
+    y0 = int(max(y - margin * h, 0))
+    x1 = int(min(x + (1 + margin) * w, frame_w))
+    y1 = int(min(y + (1 + margin) * h, frame_h))
+    return x0, y0, x1 - x0, y1 - y0
+
+
+class HybridTracker:
+    """
+    Cascade rapide / précis : MOSSE ou KCF par défaut, CSRT seulement en cas de doute.
+
+    À chaque frame, le tracker rapide propose une boîte et sa fiabilité est
+    vérifiée par une corrélation normalisée entre l'imagette de la boîte et un
+    modèle d'apparence (16×16 en niveaux de gris, quelques microsecondes).
+    Quand la confiance baisse, CSRT est initialisé sur la dernière zone fiable
+    et relancé sur la zone courante ; si sa boîte est confirmée, le tracker
+    rapide est réinitialisé dessus. Sinon CSRT prend le relais sur l'image
+    entière pendant au plus `accurate_frames` frames, pendant lesquelles le
+    tracker rapide reste mis à jour et reprend la main dès que sa boîte est de
+    nouveau fiable ; au-delà, le tracker rapide continue seul. CSRT n'est
+    sollicité qu'une fois par perte, et `update` renvoie False tant que la
+    confiance reste basse.
+
+    S'utilise comme un tracker OpenCV : `init(frame, roi)` et `update(frame)`.
+    """
+
+    def __init__(self, fast="KCF", confidence_threshold=0.5, template_rate=0.05, recovery_frames=5,
+                 accurate_frames=30):
+        """
+        :param fast: Tracker rapide ("KCF" ou "MOSSE").
+        :param confidence_threshold: Corrélation minimale pour accepter une boîte.
+        :param template_rate: Vitesse de mise à jour du modèle d'apparence.
+        :param recovery_frames: Frames fiables de CSRT avant de revenir au tracker rapide.
+        :param accurate_frames: Frames maximales de CSRT sans boîte fiable avant de l'abandonner.
+        """
+        self.fast_create = FAST_TRACKERS[fast]
+        self.confidence_threshold = confidence_threshold
+        self.template_rate = template_rate
+        self.recovery_frames = recovery_frames
+        self.accurate_frames = accurate_frames
+        self.stats = {"fast": 0, "rescued": 0, "accurate": 0, "lost": 0}
+
+    def init(self, frame, roi):
+        # Une ROI trop petite ou hors de l'image ne donne pas de modèle d'apparence : refusée
+        self.box = tuple(roi)
+        self.template = box_patch(frame, roi)
+        if self.template is None:
+            return False
+
+        self.fast = self.fast_create()
+        self.fast.init(frame, roi)
+        self.accurate = None
+        self.accurate_streak = 0
+        self.accurate_count = 0
+        self.lost_count = 0
+        self._remember(frame, roi)
+        return True
+
+    # Garder une copie de la zone autour de la dernière boîte fiable (petite, pas toute l'image)
+    def _remember(self, frame, box):
+        x, y, w, h = search_window(frame.shape, box)
+        self.last_window = (x, y, w, h)
+        self.last_crop = frame[y:y + h, x:x + w].copy()
+        self.last_box = box
+
+    def _accept(self, frame, box, patch):
+        self.box = tuple(box)
+        self.template += self.template_rate * (patch - self.template)
+        self.lost_count = 0
+        self._remember(frame, box)
+
+    # Relancer CSRT entre la dernière zone fiable et la même zone de l'image courante
+    def _rescue(self, frame):
+        wx, wy, ww, wh = self.last_window
+        if ww < 2 or wh < 2 or self.last_crop.size == 0:
+            return None
+        crop = frame[wy:wy + wh, wx:wx + ww]
+        if crop.shape[:2] != self.last_crop.shape[:2]:
+            return None
+
+        # Boîte fiable ramenée dans la fenêtre (elle peut déborder de l'image)
+        x, y, w, h = self.last_box
+        x0, y0 = max(int(x) - wx, 0), max(int(y) - wy, 0)
+        x1, y1 = min(int(x + w) - wx, ww), min(int(y + h) - wy, wh)
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+
+        csrt = cv2.legacy.TrackerCSRT_create()
+        csrt.init(self.last_crop, (x0, y0, x1 - x0, y1 - y0))
+        success, box = csrt.update(crop)
+        if not success:
+            return None
+        return box[0] + wx, box[1] + wy, box[2], box[3]
+
+    # Replacer le tracker rapide sur une boîte
+    def _restart_fast(self, frame, box):
+        self.fast = self.fast_create()
+        self.fast.init(frame, tuple(int(v) for v in box))
+
+    def update(self, frame):
+        if self.template is None:
+            return False, self.box
+
+        if self.accurate is None:
+            success, box = self.fast.update(frame)
+            patch = box_patch(frame, box) if success else None
+            if patch is not None and patch_confidence(self.template, patch) >= self.confidence_threshold:
+                self.stats["fast"] += 1
+                self._accept(frame, box, patch)
+                return True, self.box
+
+            # Cible déjà perdue et CSRT déjà essayé : seul le tracker rapide continue de chercher
+            if self.lost_count > 0:
+                self.lost_count += 1
+                return False, self.box
+
+            # Confiance insuffisante : vérification par CSRT sur la zone locale
+            box = self._rescue(frame)
+            patch = box_patch(frame, box) if box is not None else None
+            if patch is not None and patch_confidence(self.template, patch) >= self.confidence_threshold:
+                self.stats["rescued"] += 1
+                self._restart_fast(frame, box)
+                self._accept(frame, box, patch)
+                return True, self.box
+
+            # Échec local : CSRT prend le relais sur l'image entière depuis la dernière boîte fiable
+            self.accurate = cv2.legacy.TrackerCSRT_create()
+            self.accurate.init(frame, tuple(int(v) for v in self.last_box))
+            self.accurate_streak = 0
+            self.accurate_count = 0
+            self.lost_count = 1
+            self.stats["lost"] += 1
+            return False, self.box
+
+        # Le tracker rapide, toujours mis à jour, reprend la main dès que sa boîte est de nouveau fiable
+        success, box = self.fast.update(frame)
+        patch = box_patch(frame, box) if success else None
+        if patch is not None and patch_confidence(self.template, patch) >= self.confidence_threshold:
+            self.stats["fast"] += 1
+            self.accurate = None
+            self._accept(frame, box, patch)
+            return True, self.box
+
+        self.stats["accurate"] += 1
+        self.accurate_count += 1
+        success, box = self.accurate.update(frame)
+        patch = box_patch(frame, box) if success else None
+        if patch is None or patch_confidence(self.template, patch) < self.confidence_threshold:
+            self.accurate_streak = 0
+            self.lost_count += 1
+            if self.accurate_count >= self.accurate_frames:
+                self.accurate = None  # CSRT ne retrouve pas la cible : le tracker rapide continue seul
+            return False, self.box
+
+        # Confiance retrouvée : retour au tracker rapide après quelques frames fiables
+        self._accept(frame, box, patch)
+        self.accurate_streak += 1
+        if self.accurate_streak >= self.recovery_frames:
+            self._restart_fast(frame, box)
+            self.accurate = None
+        return True, self.box
+
+
+# Fonctions de création, à enregistrer dans TRACKER_TYPES comme les trackers OpenCV
+def TrackerHybrid_create():
+    return HybridTracker("KCF")
+
+
+def TrackerHybridMOSSE_create():
+    return HybridTracker("MOSSE")
@@ -0,0 +1,152 @@
+import functools
+
+import numpy as np
+
+from tracking_bench.benchmark import test_trackers
+from tracking_bench.evaluation import centre_error, iou
+from tracking_bench.hybrid import box_patch, patch_confidence
+
+
+class KeyframeTracker:
+    """
+    Suivi par images clés pour les sources à haute fréquence (120 FPS).
+
+    Le tracker n'est mis à jour qu'une frame sur `interval` ; entre deux images
+    clés, la boîte est extrapolée à vitesse constante à partir des deux
+    dernières images clés. Une vérification de dérive peu coûteuse (corrélation
+    16×16 avec le modèle d'apparence) force une mise à jour immédiate si la
+    boîte prédite ne ressemble plus à la cible. En mode adaptatif, l'intervalle
+    augmente quand la cible bouge peu et diminue quand elle bouge beaucoup.
+
+    S'utilise comme un tracker OpenCV : `init(frame, roi)` et `update(frame)`.
+    """
+
+    def __init__(self, tracker_create, interval=3, adaptive=True, min_interval=1, max_interval=8,
+                 motion_threshold=0.1, drift_threshold=0.5):
+        """
+        :param tracker_create: Fonction de création du tracker OpenCV.
+        :param interval: Intervalle initial (ou fixe) entre deux mises à jour du tracker.
+        :param adaptive: True pour adapter l'intervalle au déplacement de la cible.
+        :param min_interval: Intervalle minimal en mode adaptatif.
+        :param max_interval: Intervalle maximal en mode adaptatif.
+        :param motion_threshold: Déplacement par intervalle, en fraction de la taille de la boîte,
+                                 au-delà duquel l'intervalle est réduit (et en deçà de la moitié
+                                 duquel il est augmenté).
+        :param drift_threshold: Corrélation minimale de la boîte prédite avec le modèle d'apparence.
+        """
+        self.tracker_create = tracker_create
+        self.interval = interval
+        self.adaptive = adaptive
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.motion_threshold = motion_threshold
+        self.drift_threshold = drift_threshold
+        self.stats = {"frames": 0, "updates": 0, "forced": 0}
+
+    def init(self, frame, roi):
+        self.frame_index = 0
+        self.key_index = 0
+        self.key_box = np.array(roi, dtype=np.float64)
+        self.velocity = np.zeros(4)
+
+        # Une ROI trop petite ou hors de l'image ne donne pas de modèle d'apparence : refusée
+        self.template = box_patch(frame, roi)
+        if self.template is None:
+            return False
+        self.tracker = self.tracker_create()
+        return self.tracker.init(frame, roi)
+
+    def _keyframe(self, frame):
+        self.stats["updates"] += 1
+        success, box = self.tracker.update(frame)
+        if not success:
+            return False, box
+
+        box = np.array(box, dtype=np.float64)
+        elapsed = self.frame_index - self.key_index
+        self.velocity = (box - self.key_box) / elapsed
+
+        # Adapter l'intervalle au déplacement de la cible sur un intervalle
+        if self.adaptive:
+            size = max(min(box[2], box[3]), 1.0)
+            motion = np.hypot(self.velocity[0], self.velocity[1]) * self.interval / size
+            if motion > self.motion_threshold:
+                self.interval = max(self.min_interval, self.interval // 2)
+            elif motion < self.motion_threshold / 2:
+                self.interval = min(self.max_interval, self.interval + 1)
+
+        patch = box_patch(frame, box)
+        if patch is not None:
+            self.template += 0.05 * (patch - self.template)
+
+        self.key_index = self.frame_index
+        self.key_box = box
+        return True, tuple(box)
+
+    def update(self, frame):
+        if self.template is None:
+            return False, tuple(self.key_box)
+
+        self.frame_index += 1
+        self.stats["frames"] += 1
+
+        elapsed = self.frame_index - self.key_index
+        if elapsed >= self.interval:
+            return self._keyframe(frame)
+
+        # Frame intermédiaire : extrapolation à vitesse constante et contrôle de dérive
+        predicted = self.key_box + self.velocity * elapsed
+        if patch_confidence(self.template, box_patch(frame, predicted)) < self.drift_threshold:
+            self.stats["forced"] += 1
+            return self._keyframe(frame)
+        return True, tuple(predicted)
+
+
+def keyframe(tracker_create, **options):
+    """
+    Fonction de création d'un `KeyframeTracker`, à enregistrer dans TRACKER_TYPES.
+
+    :param tracker_create: Fonction de création du tracker OpenCV.
+    :param options: Options de `KeyframeTracker` (interval, adaptive, ...).
+    :return: Fonction sans argument (sérialisable pour `run_grid`).
+    """
+    return functools.partial(KeyframeTracker, tracker_create, **options)
+
+
+def measure_keyframe_gain(video_path, tracker_name, tracker_create, roi, **options):
+    """
+    Compare le suivi à chaque frame et le suivi par images clés sur un seul décodage.
+
+    :param video_path: Chemin de la vidéo.
+    :param tracker_name: Nom du tracker (pour l'affichage).
+    :param tracker_create: Fonction de création du tracker OpenCV.
+    :param roi: ROI initiale (x, y, w, h).
+    :param options: Options de `KeyframeTracker`.
+    :return: Dictionnaire avec le gain de débit et l'écart des boîtes par rapport au
+             suivi à chaque frame (IoU moyenne, erreur moyenne du centre en pixels), ou None.
+    """
+    keyframe_name = f"{tracker_name}_CLES"
+    results = test_trackers(video_path, {tracker_name: tracker_create, keyframe_name: keyframe(tracker_create, **options)},
+                            roi, None, headless=True, record_boxes=True)
+    if not results:
+        return None
+
+    full, reduced = results
+    gain = reduced["update_fps"] / full["update_fps"] if full["update_fps"] > 0 else 0
+
+    # Écart mesuré sur les frames où les deux modes ont une boîte
+    both = full["success"] & reduced["success"]
+    full_boxes, reduced_boxes = full["boxes"][both], reduced["boxes"][both]
+    mean_iou = float(iou(full_boxes, reduced_boxes).mean()) if both.any() else 0.0
+    mean_error = float(centre_error(full_boxes, reduced_boxes).mean()) if both.any() else 0.0
+
+    print(f"{tracker_name} : gain de débit x{gain:.2f} par images clés, IoU moyenne {mean_iou:.3f}, "
+          f"erreur du centre {mean_error:.1f} px")
+    return {
+        "tracker": tracker_name,
+        "full_update_fps": full["update_fps"],
+        "keyframe_update_fps": reduced["update_fps"],
+        "gain": gain,
+        "mean_iou": mean_iou,
+        "mean_centre_error": mean_error,
+    }
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import cv2
+
+# Valeurs des champs facultatifs d'une entrée (manifeste édité à la main)
+ENTRY_DEFAULTS = {"start_frame": 0, "trackers": None, "write_video": True}
+
+
+def video_hash(video_path, chunk_size=1 << 20):
+    """
+    Empreinte SHA-256 du contenu de la vidéo.
+
+    L'empreinte ne dépend ni du nom ni de l'emplacement du fichier : une vidéo
+    renommée ou copiée sur un autre poste garde son entrée dans le manifeste.
+
+    :param video_path: Chemin de la vidéo.
+    :param chunk_size: Taille des blocs lus, en octets.
+    :return: Empreinte hexadécimale.
+    """
+    digest = hashlib.sha256()
+    with open(video_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def select_roi(video_path, start_frame=0):
+    """
+    Demande la ROI à l'utilisateur sur la frame de départ de la vidéo.
+
+    :return: ROI (x, y, w, h), ou None si la frame ne peut pas être lue ou si la sélection est vide.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if start_frame > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    ret, frame = cap.read()
+    cap.release()
+    if not ret:
+        print(f"Erreur : Impossible de lire la frame {start_frame} de '{video_path}'.")
+        return None
+
+    print(f"Veuillez sélectionner l'objet à suivre dans '{os.path.basename(video_path)}'.")
+    roi = cv2.selectROI("Sélectionner un objet", frame, fromCenter=False, showCrosshair=True)
+    cv2.destroyWindow("Sélectionner un objet")
+    if roi[2] == 0 or roi[3] == 0:
+        return None
+    return tuple(int(v) for v in roi)
+
+
+class RoiManifest:
+    """
+    Manifeste des ROI d'un lot de vidéos, enregistré en JSON.
+
+    Chaque entrée est indexée par l'empreinte du contenu de la vidéo et porte
+    la ROI, la frame de départ, la liste des trackers à tester (None : tous)
+    et l'option d'écriture de la vidéo annotée. Les scripts lisent leurs ROI
+    dans le manifeste : la sélection interactive n'a lieu que pour les vidéos
+    sans entrée, et le choix y est aussitôt enregistré. Une fois le manifeste
+    complet, un lot tourne sans intervention, y compris sans écran. Seule la
+    ROI est obligatoire : les champs absents d'une entrée écrite à la main
+    prennent les valeurs de `ENTRY_DEFAULTS`.
+
+    Exemple d'entrée :
+        "3f2a...": {"video": "rue_15FPS.mp4", "roi": [412, 230, 64, 48],
+                    "start_frame": 0, "trackers": ["KCF", "CSRT"], "write_video": true}
+    """
+
+    def __init__(self, path):
+        """
+        :param path: Chemin du fichier JSON (créé à la première sélection s'il n'existe pas).
+        """
+        self.path = path
+        self.entries = self._read()
+        self.hashes = {}
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding="utf-8") as file:
+            return json.load(file)
+
+    def save(self):
+        # Relire le fichier pour ne pas écraser les entrées ajoutées entre-temps par un autre poste,
+        # puis remplacer le fichier d'un bloc
+        entries = self._read()
+        entries.update(self.entries)
+        self.entries = entries
+
+        # Fichier temporaire propre à cet écrivain : deux postes qui enregistrent en même temps ne
+        # s'écrasent pas le fichier intermédiaire
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=directory, prefix=".roi_manifest_",
+                                         suffix=".tmp", delete=False) as file:
+            json.dump(self.entries, file, indent=2, ensure_ascii=False)
+        os.replace(file.name, self.path)
+
+    def key(self, video_path):
+        """
+        :return: Empreinte de la vidéo (calculée une seule fois par chemin).
+        """
+        if video_path not in self.hashes:
+            self.hashes[video_path] = video_hash(video_path)
+        return self.hashes[video_path]
+
+    def get(self, video_path):
+        """
+        :return: Entrée de la vidéo complétée par les valeurs par défaut des champs absents, ou None si
+                 elle n'est pas dans le manifeste ou n'a pas de ROI.
+        """
+        entry = self.entries.get(self.key(video_path))
+        if entry is None or not entry.get("roi"):
+            return None
+        return {**ENTRY_DEFAULTS, **entry}
+
+    def set(self, video_path, roi, start_frame=0, trackers=None, write_video=True):
+        """
+        Ajoute ou remplace l'entrée d'une vidéo et enregistre le manifeste.
+
+        :return: Entrée enregistrée.
+        """
+        entry = {
+            "video": os.path.basename(video_path),
+            "roi": [int(v) for v in roi],
+            "start_frame": int(start_frame),
+            "trackers": list(trackers) if trackers is not None else None,
+            "write_video": bool(write_video),
+        }
+        self.entries[self.key(video_path)] = entry
+        self.save()
+        return entry
+
+    def resolve(self, video_path, interactive=True):
+        """
+        Entrée de la vidéo, avec sélection interactive de la ROI si elle est absente.
+
+        :param video_path: Chemin de la vidéo.
+        :param interactive: False pour ne jamais ouvrir de fenêtre (lot sans écran) :
+                            une vidéo sans entrée est alors ignorée.
+        :return: Entrée de la vidéo, ou None.
+        """
+        entry = self.get(video_path)
+        if entry is not None:
+            return entry
+
+        if not interactive:
+            print(f"Aucune ROI dans le manifeste pour '{video_path}' : vidéo ignorée.")
+            return None
+
+        roi = select_roi(video_path)
+        if roi is None:
+            return None
+        return self.set(video_path, roi)
+
+
+def entry_trackers(entry, trackers):
+    """
+    :param entry: Entrée du manifeste.
+    :param trackers: Dictionnaire {nom du tracker: fonction de création} du script.
+    :return: Trackers retenus par l'entrée (tous si l'entrée n'en précise pas).
+    """
+    if entry.get("trackers") is None:
+        return trackers
+    return {name: trackers[name] for name in entry["trackers"] if name in trackers}
@@ -0,0 +1,145 @@
+import concurrent.futures
+import os
+import time
+
+import numpy as np
+
+from tracking_bench.framecache import FrameCache
+
+
+class MultiObjectTracker:
+    """
+    Suivi de plusieurs cibles, avec une instance de tracker par cible.
+
+    Les appels `update` des différentes cibles sont répartis sur un pool de
+    threads : les fonctions OpenCV libèrent le GIL, donc 10 à 20 cibles se
+    répartissent sur les cœurs au lieu de multiplier la latence de la frame.
+    Chaque cible garde son propre état de succès et d'échec.
+
+    Avec une `TrackerPool`, les instances sont préparées à l'avance et
+    `reinit()` réinitialise une cible en arrière-plan : la cible est ignorée
+    pendant l'init au lieu de figer la boucle.
+    """
+
+    def __init__(self, tracker_create, workers=None, pool=None):
+        """
+        :param tracker_create: Fonction de création du tracker (une instance par cible).
+        :param workers: Nombre de threads du pool (par défaut : nombre de cœurs).
+        :param pool: `TrackerPool` fournissant les trackers initialisés (None : création directe).
+        """
+        self.tracker_create = tracker_create
+        self.pool = pool
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers or os.cpu_count())
+        self.objects = []
+        self.frame_times = []
+        self.cache = FrameCache()
+        self.update_sums = []
+
+    def add(self, frame, roi):
+        if self.pool is not None:
+            tracker = self.pool.init(frame, roi)
+        else:
+            tracker = self.tracker_create()
+            tracker.init(frame, roi)
+        self.objects.append({
+            "tracker": tracker,
+            "pending": None,  # Init en cours en arrière-plan (Future)
+            "box": roi,
+            "success": True,
+            "lost_frames": 0,  # Nombre de frames consécutives en échec
+            "failures": 0,  # Nombre total de frames en échec
+            "update_ms": 0.0,
+        })
+
+    def reinit(self, index, frame, roi):
+        """
+        Réinitialise la cible `index` sur une nouvelle ROI (après une perte).
+
+        Avec une `TrackerPool`, l'init se fait en arrière-plan et la cible est
+        reprise à la première frame qui suit la fin de l'init.
+        """
+        obj = self.objects[index]
+        obj["box"] = roi
+        if self.pool is not None:
+            obj["pending"] = self.pool.init_async(frame, roi)
+        else:
+            obj["tracker"] = self.tracker_create()
+            obj["tracker"].init(frame, roi)
+
+    # Mettre à jour une cible (exécuté dans le pool de threads)
+    def _update_object(self, obj, frame):
+        try:
+            self._update_tracker(obj, frame)
+        finally:
+            self.cache.release(frame)
+
+    @staticmethod
+    def _update_tracker(obj, frame):
+        if obj["pending"] is not None:
+            if not obj["pending"].done():
+                # Init en arrière-plan pas encore terminée : la cible attend
+                obj["update_ms"] = 0.0
+                obj["success"] = False
+                return
+            tracker = obj["pending"].result()
+            obj["pending"] = None
+            if tracker is not None:
+                obj["tracker"] = tracker
+                obj["lost_frames"] = 0
+
+        start_time = time.perf_counter()
+        success, box = obj["tracker"].update(frame)
+        obj["update_ms"] = (time.perf_counter() - start_time) * 1000
+
+        obj["success"] = success
+        if success:
+            obj["box"] = box
+            obj["lost_frames"] = 0
+        elif getattr(obj["tracker"], "reinitialising", False):
+            return  # Réinitialisation propre au tracker (reprise automatique) : la cible attend, sans échec
+        else:
+            obj["lost_frames"] += 1
+            obj["failures"] += 1
+
+    def update(self, frame):
+        """
+        Met à jour toutes les cibles en parallèle sur la même frame.
+
+        :param frame: Frame courante (lue seulement par les trackers).
+        :return: Liste de tuples (succès, boîte), dans l'ordre d'ajout des cibles.
+        """
+        start_time = time.perf_counter()
+        shared_frame = self.cache.publish(frame, len(self.objects))
+        futures = [self.executor.submit(self._update_object, obj, shared_frame) for obj in self.objects]
+        for future in futures:
+            future.result()
+        self.frame_times.append((time.perf_counter() - start_time) * 1000)
+        self.update_sums.append(sum(obj["update_ms"] for obj in self.objects))
+
+        return [(obj["success"], obj["box"]) for obj in self.objects]
+
+    def budget_report(self, budget_ms):
+        """
+        Bilan du budget de temps par frame.
+
+        :param budget_ms: Budget d'une frame en millisecondes (1000 / FPS de la caméra).
+        :return: Dictionnaire avec la durée de la dernière frame, ses percentiles, le
+                 nombre de frames hors budget et le gain du parallélisme (somme des
+                 updates / durée réelle).
+        """
+        if not self.frame_times:
+            return {"frames": 0, "last_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "over_budget": 0, "speedup": 0.0}
+
+        frame_times = np.array(self.frame_times)
+        return {
+            "frames": len(frame_times),
+            "budget_ms": budget_ms,
+            "last_ms": float(frame_times[-1]),
+            "p50_ms": float(np.percentile(frame_times, 50)),
+            "p95_ms": float(np.percentile(frame_times, 95)),
+            "over_budget": int((frame_times > budget_ms).sum()),
+            "speedup": float(sum(self.update_sums) / frame_times.sum()) if frame_times.sum() > 0 else 0.0,
+        }
+
+    def close(self):
+        self.executor.shutdown()
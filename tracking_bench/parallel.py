@@ -0,0 +1,99 @@
+import multiprocessing
+import multiprocessing.connection
+import os
+import time
+import traceback
+
+
+# Exécuter une tâche dans le processus enfant et renvoyer son résultat par le tube
+def _run_job(conn, func, args):
+    try:
+        conn.send(("ok", func(*args)))
+    except BaseException:
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def run_grid(jobs, workers=None, timeout=None):
+    """
+    Exécute une grille de tâches (vidéo × tracker) dans un pool de processus.
+
+    Chaque tâche tourne dans son propre processus : un tracker qui plante ou se
+    bloque (TLD) est arrêté au bout de `timeout` secondes sans affecter les
+    autres tâches. Les résultats sont rendus dans l'ordre de `jobs`, quel que
+    soit l'ordre dans lequel les tâches se terminent.
+
+    :param jobs: Liste de tuples (fonction, arguments). La fonction doit être définie
+                 au niveau d'un module pour pouvoir être transmise au processus.
+    :param workers: Nombre de processus simultanés (par défaut : nombre de cœurs).
+    :param timeout: Durée maximale d'une tâche en secondes (None : pas de limite).
+    :return: Liste de dictionnaires {"status", "result", "error", "elapsed"} dans l'ordre
+             des tâches, avec "status" parmi "ok", "error" et "timeout".
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    outcomes = [None] * len(jobs)
+    pending = list(range(len(jobs)))
+    pending.reverse()
+    running = {}
+
+    while pending or running:
+        # Démarrer de nouvelles tâches tant qu'il reste des processus libres
+        while pending and len(running) < workers:
+            index = pending.pop()
+            func, args = jobs[index]
+            parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_run_job, args=(child_conn, func, args), daemon=True)
+            process.start()
+            child_conn.close()
+            running[index] = (process, parent_conn, time.monotonic())
+
+        # Attendre qu'une tâche se termine (ou vérifier les délais régulièrement)
+        connections = {conn: index for index, (_, conn, _) in running.items()}
+        ready = multiprocessing.connection.wait(list(connections), timeout=0.5)
+
+        for conn in ready:
+            index = connections[conn]
+            process, _, start = running.pop(index)
+            try:
+                status, payload = conn.recv()
+            except EOFError:
+                # Le processus est mort sans rien renvoyer (plantage natif d'OpenCV)
+                process.join()
+                status, payload = "error", f"Processus terminé avec le code {process.exitcode}"
+            conn.close()
+            process.join()
+
+            outcomes[index] = {
+                "status": status,
+                "result": payload if status == "ok" else None,
+                "error": payload if status != "ok" else None,
+                "elapsed": time.monotonic() - start,
+            }
+
+        # Arrêter les tâches qui ont dépassé le délai
+        if timeout is not None:
+            now = time.monotonic()
+            for index, (process, conn, start) in list(running.items()):
+                if now - start > timeout:
+                    process.terminate()
+                    process.join()
+                    conn.close()
+                    del running[index]
+                    outcomes[index] = {
+                        "status": "timeout",
+                        "result": None,
+                        "error": f"Délai de {timeout} s dépassé",
+                        "elapsed": now - start,
+                    }
+
+    return outcomes
+
+
+# Afficher un résumé des tâches de la grille
+def print_grid_summary(labels, outcomes):
+    for label, outcome in zip(labels, outcomes):
+        status = {"ok": "OK", "error": "ERREUR", "timeout": "DÉLAI DÉPASSÉ"}[outcome["status"]]
+        print(f"  {label:<45}{status:<15}{outcome['elapsed']:.1f} s")
+        if outcome["status"] == "error":
+            print(outcome["error"])
@@ -0,0 +1,120 @@
+import time
+
+import cv2
+import numpy as np
+
+from tracking_bench.capture import ReplayCapture, ThreadedCapture, video_name
+
+# Part maximale de frames perdues ou hors délai pour considérer qu'un tracker tient le temps réel
+REALTIME_TOLERANCE = 0.01
+
+
+def run_realtime(source, tracker_name, tracker_create, roi, fps, jitter_ms=1.0, preload=False):
+    """
+    Rejoue la source au rythme d'une caméra et mesure si le tracker suit la cadence.
+
+    La source est lue par `ReplayCapture` derrière `ThreadedCapture`, exactement
+    comme la webcam de `Trackers webcam.py` : le tracker reçoit toujours la frame
+    la plus récente et celles qu'il n'a pas eu le temps de traiter sont perdues.
+    L'horloge de relecture démarre après l'init du tracker.
+
+    :param source: Chemin de la vidéo ou séquence synthétique.
+    :param tracker_name: Nom du tracker.
+    :param tracker_create: Fonction de création du tracker.
+    :param roi: ROI initiale (x, y, w, h).
+    :param fps: Fréquence de relecture (30, 120, ...).
+    :param jitter_ms: Gigue des instants de capture, en millisecondes.
+    :param preload: True pour décoder la source en mémoire avant la relecture (à réserver aux clips
+                    courts : un clip 1080p de quelques secondes à 120 FPS occupe plusieurs Go). Par
+                    défaut, le thread de capture décode au fil de la relecture, comme une vraie caméra.
+    :return: Dictionnaire des frames émises, traitées et perdues, des dépassements de délai
+             (update plus long que 1 / fps) et du délai capture → résultat (p50/p95/max en ms),
+             ou None si la source ne peut pas être lue.
+    """
+    if hasattr(source, "set"):
+        source.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    replay = ReplayCapture(source, fps, jitter_ms=jitter_ms, preload=preload)
+    ret, frame = replay.read()
+    if not ret:
+        print(f"Erreur : Impossible de lire la source '{video_name(source)}'.")
+        replay.release()
+        return None
+
+    tracker = tracker_create()
+    tracker.init(frame, roi)
+    replay.restart()
+
+    capture = ThreadedCapture(replay).start()
+    period = 1.0 / fps
+    deadline_misses = 0
+    update_times = []
+
+    while True:
+        ret, frame = capture.read()
+        if not ret:
+            break
+
+        start = time.perf_counter()
+        tracker.update(frame)
+        elapsed = time.perf_counter() - start
+        capture.record_display()
+
+        update_times.append(elapsed * 1000)
+        if elapsed > period:
+            deadline_misses += 1
+
+    capture.release()
+    stats = capture.stats()
+
+    # Frames perdues : écrasées dans le tampon de capture ou jamais lues par le thread de capture
+    emitted = stats["captured"] + replay.frames_dropped
+    dropped = stats["dropped"] + replay.frames_dropped
+    processed = stats["delivered"]
+    drop_ratio = dropped / emitted if emitted else 0.0
+    miss_ratio = deadline_misses / processed if processed else 0.0
+
+    return {
+        "video": video_name(source),
+        "tracker": tracker_name,
+        "fps": fps,
+        "emitted": emitted,
+        "processed": processed,
+        "dropped": dropped,
+        "drop_ratio": drop_ratio,
+        "deadline_misses": deadline_misses,
+        "miss_ratio": miss_ratio,
+        "update_p95_ms": float(np.percentile(update_times, 95)) if update_times else 0.0,
+        "latency_p50_ms": stats["latency_p50_ms"],
+        "latency_p95_ms": stats["latency_p95_ms"],
+        "latency_max_ms": stats["latency_max_ms"],
+        "realtime": drop_ratio <= REALTIME_TOLERANCE and miss_ratio <= REALTIME_TOLERANCE,
+    }
+
+
+def run_realtime_grid(source, trackers, roi, rates=(30, 120), jitter_ms=1.0, preload=False):
+    """
+    Teste chaque tracker à chaque fréquence de relecture, l'un après l'autre pour
+    que les mesures ne se concurrencent pas.
+
+    :return: Liste des résultats de `run_realtime`.
+    """
+    results = []
+    for fps in rates:
+        for tracker_name, tracker_create in trackers.items():
+            print(f"Relecture à {fps} FPS : {tracker_name}")
+            result = run_realtime(source, tracker_name, tracker_create, roi, fps, jitter_ms, preload)
+            if result is not None:
+                results.append(result)
+    return results
+
+
+# Enregistrer le bilan temps réel dans un fichier
+def save_realtime_to_file(results, output_file):
+    with open(output_file, 'w') as file:
+        file.write(f"{'Tracker':<15}{'Vidéo':<20}{'FPS':<6}{'Traitées':<10}{'Perdues':<10}{'Hors délai':<12}"
+                   f"{'Update p95 (ms)':<17}{'Délai p95 (ms)':<16}{'Temps réel':<10}\n")
+        file.write("=" * 116 + "\n")
+        for result in results:
+            file.write(f"{result['tracker']:<15}{result['video']:<20}{result['fps']:<6}{result['processed']:<10}"
+                       f"{result['dropped']:<10}{result['deadline_misses']:<12}{result['update_p95_ms']:<17.2f}"
+                       f"{result['latency_p95_ms']:<16.2f}{'oui' if result['realtime'] else 'non':<10}\n")
@@ -0,0 +1,235 @@
+import functools
+import time
+
+import cv2
+import numpy as np
+
+from tracking_bench.hybrid import search_window
+
+
+class BoxKalman:
+    """
+    Filtre de Kalman à vitesse constante sur le centre et la taille d'une boîte.
+
+    État : (cx, cy, w, h, vx, vy). La taille est supposée à peu près constante
+    d'une frame à l'autre, le centre suit une vitesse estimée.
+    """
+
+    def __init__(self, box, process_noise=1e-2, measurement_noise=1e-1):
+        self.filter = cv2.KalmanFilter(6, 4)
+        self.filter.transitionMatrix = np.eye(6, dtype=np.float32)
+        self.filter.transitionMatrix[0, 4] = 1.0
+        self.filter.transitionMatrix[1, 5] = 1.0
+        self.filter.measurementMatrix = np.eye(4, 6, dtype=np.float32)
+        self.filter.processNoiseCov = np.eye(6, dtype=np.float32) * process_noise
+        self.filter.measurementNoiseCov = np.eye(4, dtype=np.float32) * measurement_noise
+        self.filter.errorCovPost = np.eye(6, dtype=np.float32)
+        self.filter.statePost = np.array([*self._measure(box), 0, 0], dtype=np.float32).reshape(6, 1)
+
+    @staticmethod
+    def _measure(box):
+        x, y, w, h = box
+        return x + w / 2, y + h / 2, w, h
+
+    @staticmethod
+    def _box(state):
+        cx, cy, w, h = [float(v) for v in state[:4, 0]]
+        return cx - w / 2, cy - h / 2, w, h
+
+    def predict(self):
+        """
+        :return: Boîte prédite pour la frame courante (x, y, w, h).
+        """
+        return self._box(self.filter.predict())
+
+    def correct(self, box):
+        """
+        Corrige l'état avec la boîte mesurée sur la frame courante.
+        """
+        self.filter.correct(np.array(self._measure(box), dtype=np.float32).reshape(4, 1))
+
+
+def _gray_crop(frame, window):
+    x, y, w, h = window
+    crop = frame[y:y + h, x:x + w]
+    return crop if crop.ndim == 2 else cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+
+
+class RecoveringTracker:
+    """
+    Reprise automatique d'une cible perdue, guidée par la prédiction de son mouvement.
+
+    Tant que le tracker suit la cible, un filtre de Kalman (`BoxKalman`) apprend
+    sa vitesse et un modèle d'apparence (imagette en niveaux de gris de la
+    dernière boîte fiable) est rafraîchi régulièrement. Quand `update` échoue,
+    la cible est cherchée par `cv2.matchTemplate` dans une petite fenêtre
+    autour de la position prédite, élargie à chaque frame perdue ; dès que la
+    corrélation dépasse le seuil, un nouveau tracker est initialisé sur la
+    boîte trouvée. Au-delà de `max_lost` frames, la recherche s'arrête.
+
+    Avec une `TrackerPool` du tracker suivi, les instances sont préparées à
+    l'avance et chaque (ré)initialisation passe par `init_async` : la boucle
+    de suivi ne se fige pas pendant l'init de CSRT ou TLD. Tant que le tracker
+    n'est pas prêt, `update` renvoie False avec la boîte prédite par le filtre
+    de Kalman et `reinitialising` vaut True : la prédiction n'est pas comptée
+    comme un suivi réussi.
+
+    Les pertes et les reprises sont conservées dans `events` (frame, boîte,
+    durée de recherche et d'init vue par la boucle) et résumées par
+    `recovery_stats()`.
+
+    S'utilise comme un tracker OpenCV : `init(frame, roi)` et `update(frame)`.
+    """
+
+    def __init__(self, tracker_create, match_threshold=0.8, search_margin=1.0, max_margin=4.0, max_lost=30,
+                 template_every=10, pool=None):
+        """
+        :param tracker_create: Fonction de création du tracker suivi.
+        :param match_threshold: Corrélation normalisée minimale pour accepter une reprise.
+        :param search_margin: Marge de la fenêtre de recherche autour de la boîte prédite (en tailles de
+                              boîte), multipliée par le nombre de frames perdues.
+        :param max_margin: Marge maximale de la fenêtre de recherche.
+        :param max_lost: Nombre de frames perdues après lequel la recherche s'arrête.
+        :param template_every: Rafraîchissement du modèle d'apparence toutes les N frames suivies.
+        :param pool: `TrackerPool` du tracker suivi pour les inits en arrière-plan (None : init sur le
+                     thread appelant). Une réserve n'est pas sérialisable : sans objet pour `run_grid`.
+        """
+        self.tracker_create = tracker_create
+        self.match_threshold = match_threshold
+        self.search_margin = search_margin
+        self.max_margin = max_margin
+        self.max_lost = max_lost
+        self.template_every = template_every
+        self.pool = pool
+        self.events = []
+
+    def init(self, frame, roi):
+        ok = self._start(frame, roi)
+        self.kalman = BoxKalman(roi)
+        self.box = tuple(roi)
+        self.frame_index = 0
+        self.tracked_frames = 0
+        self.lost_frames = 0
+        self.template = None
+        self._remember(frame, roi)
+        return ok
+
+    @property
+    def searching(self):
+        """
+        True tant que la cible est perdue et encore recherchée.
+        """
+        return 0 < self.lost_frames <= self.max_lost
+
+    @property
+    def reinitialising(self):
+        """
+        True tant qu'une init en arrière-plan (`pool`) n'est pas terminée.
+        """
+        return self.pending is not None and not self.pending.done()
+
+    # Initialiser le tracker suivi : en arrière-plan avec une réserve (le tracker est repris par `update`)
+    def _start(self, frame, box):
+        box = tuple(int(v) for v in box)
+        if self.pool is not None:
+            self.tracker = None
+            self.pending = self.pool.init_async(frame, box)
+            return True
+        self.pending = None
+        self.tracker = self.tracker_create()
+        return self.tracker.init(frame, box)
+
+    # Conserver l'apparence de la boîte fiable, limitée à l'image
+    def _remember(self, frame, box):
+        x, y, w, h = [int(round(v)) for v in box]
+        frame_h, frame_w = frame.shape[:2]
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, frame_w), min(y + h, frame_h)
+        if x1 - x0 >= 4 and y1 - y0 >= 4:
+            self.template = _gray_crop(frame, (x0, y0, x1 - x0, y1 - y0)).copy()
+
+    # Chercher le modèle d'apparence dans la fenêtre prédite : (boîte, corrélation) ou (None, corrélation)
+    def _search(self, frame, predicted):
+        margin = min(self.search_margin * self.lost_frames, self.max_margin)
+        window = search_window(frame.shape, predicted, margin)
+        template_h, template_w = self.template.shape
+        if window[2] < template_w or window[3] < template_h:
+            return None, 0.0
+
+        scores = cv2.matchTemplate(_gray_crop(frame, window), self.template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (x, y) = cv2.minMaxLoc(scores)
+        if score < self.match_threshold:
+            return None, score
+        return (window[0] + x, window[1] + y, template_w, template_h), score
+
+    def update(self, frame):
+        self.frame_index += 1
+        predicted = self.kalman.predict()
+
+        if self.pending is not None:
+            if not self.pending.done():
+                # Init en arrière-plan pas encore terminée : boîte prédite, mais pas de suivi réussi
+                self.box = predicted
+                return False, self.box
+            self.tracker = self.pending.result()
+            self.pending = None
+            if self.tracker is None:
+                # Init refusée : la cible est cherchée comme après une perte
+                self.events.append({"type": "loss", "frame": self.frame_index, "box": self.box})
+
+        if self.lost_frames == 0 and self.tracker is not None:
+            success, box = self.tracker.update(frame)
+            if success:
+                self.kalman.correct(box)
+                self.box = tuple(box)
+                self.tracked_frames += 1
+                if self.tracked_frames % self.template_every == 0:
+                    self._remember(frame, box)
+                return True, self.box
+            self.events.append({"type": "loss", "frame": self.frame_index, "box": self.box})
+
+        self.lost_frames += 1
+        if self.lost_frames > self.max_lost or self.template is None:
+            return False, self.box
+
+        start = time.perf_counter()
+        box, score = self._search(frame, predicted)
+        search_ms = (time.perf_counter() - start) * 1000
+        if box is None:
+            return False, self.box
+
+        # Cible retrouvée : un tracker OpenCV initialisé ne se réinitialise pas, nouvelle instance
+        start = time.perf_counter()
+        self._start(frame, box)
+        reinit_ms = (time.perf_counter() - start) * 1000
+
+        self.events.append({"type": "recovery", "frame": self.frame_index, "box": box, "score": score,
+                            "lost_frames": self.lost_frames, "search_ms": search_ms, "reinit_ms": reinit_ms})
+        self.kalman.correct(box)
+        self.box = box
+        self.lost_frames = 0
+        return True, self.box
+
+    def recovery_stats(self):
+        """
+        :return: Dictionnaire du nombre de pertes et de reprises, des frames perdues avant reprise et des
+                 durées moyennes de recherche et de réinitialisation (ms).
+        """
+        losses = [event for event in self.events if event["type"] == "loss"]
+        recoveries = [event for event in self.events if event["type"] == "recovery"]
+        return {
+            "losses": len(losses),
+            "recoveries": len(recoveries),
+            "recovery_rate": len(recoveries) / len(losses) if losses else 0.0,
+            "mean_lost_frames": float(np.mean([event["lost_frames"] for event in recoveries])) if recoveries else 0.0,
+            "mean_search_ms": float(np.mean([event["search_ms"] for event in recoveries])) if recoveries else 0.0,
+            "mean_reinit_ms": float(np.mean([event["reinit_ms"] for event in recoveries])) if recoveries else 0.0,
+        }
+
+
+def with_recovery(tracker_create, **kwargs):
+    """
+    :param kwargs: Paramètres de `RecoveringTracker`.
+    :return: Fonction de création d'un `RecoveringTracker` (sérialisable pour `run_grid`).
+    """
+    return functools.partial(RecoveringTracker, tracker_create, **kwargs)
@@ -0,0 +1,184 @@
+import cv2
+import numpy as np
+
+from tracking_bench.benchmark import test_trackers
+from tracking_bench.capture import video_name
+from tracking_bench.evaluation import iou
+from tracking_bench.parallel import run_grid
+
+# Frames sautées après une perte avant la réinitialisation (protocole VOT)
+REINIT_DELAY = 5
+
+
+def segment_starts(frame_count, segments):
+    """
+    :return: Frames de départ de `segments` segments de même longueur couvrant la vidéo.
+    """
+    segments = max(1, min(segments, frame_count))
+    return [int(start) for start in np.linspace(0, frame_count, segments, endpoint=False)]
+
+
+def _valid_box(box):
+    return box is not None and np.isfinite(box).all() and box[2] > 0 and box[3] > 0
+
+
+def track_segment(video_path, tracker_create, start, end, init_boxes, use_overlap=True, reinit_delay=REINIT_DELAY):
+    """
+    Suit la cible de la frame `start` à la frame `end` (exclue) avec réinitialisation après perte.
+
+    Le segment est lu par saut direct à sa frame de départ, indépendamment des
+    autres segments. Le tracker est initialisé sur la boîte de référence de la
+    frame de départ ; après chaque perte (échec du tracker ou, si
+    `use_overlap`, recouvrement nul avec la référence), il est réinitialisé
+    `reinit_delay` frames plus tard sur la boîte de référence de cette frame.
+
+    :param video_path: Chemin de la vidéo.
+    :param tracker_create: Fonction de création du tracker.
+    :param start: Première frame du segment.
+    :param end: Frame de fin du segment (exclue).
+    :param init_boxes: Tableau N×4 des boîtes de référence (vérité terrain ou suivi antérieur).
+    :param use_overlap: True pour compter aussi comme perte une boîte sans recouvrement avec la référence.
+    :param reinit_delay: Frames sautées après une perte avant la réinitialisation.
+    :return: Dictionnaire {"start", "frames", "failures", "first_failure", "ious"} ; "first_failure"
+             est le nombre de frames suivies avant la première perte (None s'il n'y en a pas).
+    """
+    cap = cv2.VideoCapture(video_path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+
+    tracker = None
+    resume_at = start
+    frames = 0
+    failures = 0
+    first_failure = None
+    ious = []
+
+    for index in range(start, end):
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        reference = init_boxes[index] if index < len(init_boxes) else None
+        if tracker is None:
+            # (Ré)initialiser dès que le délai est écoulé et que la référence contient la cible
+            if index >= resume_at and _valid_box(reference):
+                tracker = tracker_create()
+                tracker.init(frame, tuple(int(v) for v in reference))
+            continue
+
+        success, box = tracker.update(frame)
+        frames += 1
+        overlap = float(iou(box, reference)) if success and _valid_box(reference) else None
+        lost = not success or (use_overlap and overlap == 0.0)
+
+        if lost:
+            failures += 1
+            if first_failure is None:
+                first_failure = frames
+            tracker = None
+            resume_at = index + reinit_delay
+        elif overlap is not None:
+            ious.append(overlap)
+
+    cap.release()
+    return {"start": start, "frames": frames, "failures": failures, "first_failure": first_failure, "ious": ious}
+
+
+def reference_boxes(video_path, roi, start_frame=0, tracker_create=cv2.legacy.TrackerCSRT_create):
+    """
+    Boîtes de référence obtenues par un passage complet d'un tracker précis (CSRT
+    par défaut), pour les vidéos sans vérité terrain.
+
+    :param start_frame: Frame sur laquelle la ROI a été choisie.
+    :return: Tableau N×4 indexé par frame, des NaN avant `start_frame` et sur les frames
+             où la référence a perdu la cible.
+    """
+    results = test_trackers(video_path, {"REFERENCE": tracker_create}, roi, None, headless=True, record_boxes=True,
+                            start_frame=start_frame)
+    if not results:
+        return None
+    boxes = results[0]["boxes"].copy()
+    boxes[~results[0]["success"]] = np.nan
+    return np.concatenate([np.full((start_frame, 4), np.nan), boxes])
+
+
+def evaluate_robustness(video_path, trackers, init_boxes, segments=8, use_overlap=True, workers=None, timeout=None,
+                        reference="vérité terrain"):
+    """
+    Robustesse temporelle : suivis indépendants lancés depuis plusieurs points de la vidéo.
+
+    Une perte précoce ne masque plus le reste de la séquence : chaque segment
+    est suivi séparément avec réinitialisation après perte, et les couples
+    (tracker, segment) sont répartis sur le pool de processus.
+
+    :param video_path: Chemin de la vidéo.
+    :param trackers: Dictionnaire {nom du tracker: fonction de création}.
+    :param init_boxes: Tableau N×4 des boîtes de référence : vérité terrain (`load_ground_truth`)
+                       ou suivi antérieur (`reference_boxes`).
+    :param segments: Nombre de points de départ.
+    :param use_overlap: True pour compter comme perte une boîte sans recouvrement avec la référence.
+    :param workers: Nombre de processus (par défaut : nombre de cœurs).
+    :param timeout: Durée maximale d'un segment en secondes.
+    :param reference: Origine des boîtes de référence, reportée avec l'IoU ("vérité terrain", ou
+                      "réf. CSRT" pour un passage de `reference_boxes` : l'IoU mesure alors l'accord
+                      avec CSRT, pas la précision).
+    :return: Liste de dictionnaires par tracker : pertes totales, pertes pour 100 frames, part des
+             segments avec au moins une perte, frames moyennes avant la première perte, IoU moyenne
+             hors pertes et origine de la référence, et détail par segment.
+    """
+    cap = cv2.VideoCapture(video_path)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    frame_count = min(frame_count, len(init_boxes))
+
+    starts = segment_starts(frame_count, segments)
+    ends = starts[1:] + [frame_count]
+
+    labels = []
+    jobs = []
+    for tracker_name, tracker_create in trackers.items():
+        for start, end in zip(starts, ends):
+            labels.append(tracker_name)
+            jobs.append((track_segment, (video_path, tracker_create, start, end, init_boxes, use_overlap)))
+
+    outcomes = run_grid(jobs, workers=workers, timeout=timeout)
+
+    summaries = []
+    for tracker_name in trackers:
+        runs = [outcome["result"] for label, outcome in zip(labels, outcomes) if label == tracker_name]
+        done = [run for run in runs if run is not None]
+        frames = sum(run["frames"] for run in done)
+        failures = sum(run["failures"] for run in done)
+        first_failures = [run["first_failure"] for run in done if run["first_failure"] is not None]
+        ious = [value for run in done for value in run["ious"]]
+
+        summaries.append({
+            "video": video_name(video_path),
+            "tracker": tracker_name,
+            "segments": len(runs),
+            "segments_failed": len(first_failures),
+            "segments_error": len(runs) - len(done),
+            "failure_rate": len(first_failures) / len(done) if done else 0.0,
+            "failures": failures,
+            "failures_per_100": 100 * failures / frames if frames else 0.0,
+            "mean_frames_to_failure": float(np.mean(first_failures)) if first_failures else None,
+            "mean_iou": float(np.mean(ious)) if ious else 0.0,
+            "reference": reference,
+            "frames": frames,
+            "per_segment": [(run["start"], run["frames"], run["failures"]) if run else None for run in runs],
+        })
+    return summaries
+
+
+# Enregistrer les résultats de robustesse dans un fichier
+def save_robustness_to_file(summaries, output_file):
+    with open(output_file, 'w') as file:
+        file.write(f"{'Tracker':<15}{'Vidéo':<25}{'Segments perdus':<17}{'Pertes':<10}{'Pertes/100 fr':<15}"
+                   f"{'Frames avant perte':<20}{'IoU Moyenne':<12}{'Référence':<16}\n")
+        file.write("=" * 130 + "\n")
+        for summary in summaries:
+            to_failure = summary["mean_frames_to_failure"]
+            to_failure = f"{to_failure:.1f}" if to_failure is not None else "-"
+            segments = f"{summary['segments_failed']}/{summary['segments']}"
+            file.write(f"{summary['tracker']:<15}{summary['video']:<25}{segments:<17}{summary['failures']:<10}"
+                       f"{summary['failures_per_100']:<15.2f}{to_failure:<20}{summary['mean_iou']:<12.3f}"
+                       f"{summary.get('reference', 'vérité terrain'):<16}\n")
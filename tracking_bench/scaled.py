@@ -0,0 +1,166 @@
+import functools
+
+import cv2
+
+from tracking_bench.benchmark import test_trackers
+from tracking_bench.framecache import shared
+from tracking_bench.hybrid import search_window
+
+
+def auto_scale(image_shape, roi, min_target=48, max_side=640):
+    """
+    Choisit l'échelle de suivi d'après la taille de l'image et de la ROI.
+
+    L'image est réduite pour que son plus grand côté ne dépasse pas `max_side`,
+    sans que le plus petit côté de la cible descende sous `min_target` pixels :
+    les petites cibles (`small_face_test`) restent donc à pleine résolution.
+
+    :param image_shape: Forme de l'image (hauteur, largeur, ...).
+    :param roi: ROI (x, y, w, h) en pixels de cette image.
+    :param min_target: Taille minimale de la cible après réduction, en pixels.
+    :param max_side: Taille visée du plus grand côté de l'image.
+    :return: Facteur d'échelle, au plus 1.
+    """
+    scale = min(1.0, max_side / max(image_shape[:2]))
+    target_side = min(roi[2], roi[3])
+    if target_side * scale < min_target:
+        scale = min(1.0, min_target / max(target_side, 1))
+    return scale
+
+
+class ScaledTracker:
+    """
+    Suivi sur une image réduite et/ou recadrée autour de la cible.
+
+    Le coût de CSRT et TLD croît avec la taille de l'image : le tracker reçoit
+    une version réduite de la frame (mode échelle) ou seulement une fenêtre
+    autour de la dernière boîte (mode recadrage), et les boîtes sont ramenées
+    dans les coordonnées de l'image d'origine. En mode recadrage, la fenêtre
+    reste fixe tant que la cible ne s'approche pas de son bord, puis elle est
+    recentrée et le tracker réinitialisé, pour que le tracker voie toujours le
+    même repère d'une frame à l'autre.
+
+    S'utilise comme un tracker OpenCV : `init(frame, roi)` et `update(frame)`.
+    """
+
+    def __init__(self, tracker_create, scale="auto", crop=False, margin=2.0, min_target=48, max_side=640):
+        """
+        :param tracker_create: Fonction de création du tracker OpenCV à utiliser.
+        :param scale: Facteur d'échelle fixe, ou "auto" pour le déduire de la ROI.
+        :param crop: True pour ne suivre que dans une fenêtre autour de la cible.
+        :param margin: Marge de la fenêtre de recadrage, en tailles de boîte de chaque côté.
+        :param min_target: Taille minimale de la cible après réduction (mode "auto").
+        :param max_side: Plus grand côté visé pour l'image suivie (mode "auto").
+        """
+        self.tracker_create = tracker_create
+        self.scale_option = scale
+        self.crop = crop
+        self.margin = margin
+        self.min_target = min_target
+        self.max_side = max_side
+        self.reinits = 0
+
+    # Image donnée au tracker : fenêtre éventuelle puis réduction
+    def _prepare(self, frame):
+        if not self.crop and self.scale < 1.0:
+            # Image entière réduite : partagée avec les autres trackers à la même échelle
+            return shared(frame, "resize", self.scale)
+
+        x, y, w, h = self.window
+        image = frame[y:y + h, x:x + w]
+        if self.scale < 1.0:
+            image = cv2.resize(image, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        return image
+
+    def _to_tracker(self, box):
+        x, y, w, h = box
+        return (int((x - self.window[0]) * self.scale), int((y - self.window[1]) * self.scale),
+                max(1, int(w * self.scale)), max(1, int(h * self.scale)))
+
+    def _to_frame(self, box):
+        x, y, w, h = box
+        return (x / self.scale + self.window[0], y / self.scale + self.window[1], w / self.scale, h / self.scale)
+
+    def _start(self, frame, box):
+        self.frame_size = (frame.shape[1], frame.shape[0])
+        self.box = tuple(box)
+        if self.crop:
+            self.window = search_window(frame.shape, box, self.margin)
+        else:
+            self.window = (0, 0, frame.shape[1], frame.shape[0])
+
+        window_shape = (self.window[3], self.window[2])
+        if self.scale_option == "auto":
+            self.scale = auto_scale(window_shape, box, self.min_target, self.max_side)
+        else:
+            self.scale = float(self.scale_option)
+
+        self.tracker = self.tracker_create()
+        return self.tracker.init(self._prepare(frame), self._to_tracker(box))
+
+    def init(self, frame, roi):
+        return self._start(frame, roi)
+
+    # La cible s'approche-t-elle d'un bord de la fenêtre de recadrage que le recentrage peut déplacer ?
+    # Un bord confondu avec celui de l'image ne bouge pas : la cible peut s'en approcher sans recentrage
+    def _near_border(self, box):
+        x, y, w, h = box
+        wx, wy, ww, wh = self.window
+        frame_w, frame_h = self.frame_size
+        guard_x, guard_y = 0.5 * w, 0.5 * h
+        return ((wx > 0 and x - wx < guard_x) or (wy > 0 and y - wy < guard_y) or
+                (wx + ww < frame_w and wx + ww - (x + w) < guard_x) or
+                (wy + wh < frame_h and wy + wh - (y + h) < guard_y))
+
+    def update(self, frame):
+        success, box = self.tracker.update(self._prepare(frame))
+        if not success:
+            return False, self.box  # Dernière boîte connue, dans les coordonnées de l'image
+
+        box = self._to_frame(box)
+        self.box = box
+        if self.crop and self._near_border(box):
+            # Recentrer la fenêtre sur la cible
+            self._start(frame, tuple(int(v) for v in box))
+            self.reinits += 1
+        return True, box
+
+
+def scaled(tracker_create, **options):
+    """
+    Fonction de création d'un `ScaledTracker`, à enregistrer dans TRACKER_TYPES.
+
+    :param tracker_create: Fonction de création du tracker OpenCV.
+    :param options: Options de `ScaledTracker` (scale, crop, margin, ...).
+    :return: Fonction sans argument (sérialisable pour `run_grid`).
+    """
+    return functools.partial(ScaledTracker, tracker_create, **options)
+
+
+def measure_speedup(video_path, tracker_name, tracker_create, roi, **options):
+    """
+    Compare le suivi pleine résolution et le suivi réduit/recadré sur un seul décodage.
+
+    :param video_path: Chemin de la vidéo.
+    :param tracker_name: Nom du tracker (pour l'affichage).
+    :param tracker_create: Fonction de création du tracker OpenCV.
+    :param roi: ROI initiale (x, y, w, h).
+    :param options: Options de `ScaledTracker`.
+    :return: Dictionnaire avec les FPS d'update des deux modes et le gain, ou None.
+    """
+    reduced_name = f"{tracker_name}_REDUIT"
+    results = test_trackers(video_path, {tracker_name: tracker_create, reduced_name: scaled(tracker_create, **options)},
+                            roi, None, headless=True)
+    if not results:
+        return None
+
+    full, reduced = results
+    speedup = reduced["update_fps"] / full["update_fps"] if full["update_fps"] > 0 else 0
+    print(f"{tracker_name} : {full['update_fps']:.1f} FPS en pleine résolution, "
+          f"{reduced['update_fps']:.1f} FPS en mode réduit (gain x{speedup:.2f})")
+    return {
+        "tracker": tracker_name,
+        "full_update_fps": full["update_fps"],
+        "reduced_update_fps": reduced["update_fps"],
+        "speedup": speedup,
+    }
@@ -0,0 +1,186 @@
+import os
+
+import cv2
+import numpy as np
+import psutil
+
+from tracking_bench.benchmark import test_trackers
+from tracking_bench.capture import video_name
+from tracking_bench.parallel import run_grid
+
+# Efficacité parallèle minimale (gain / nombre de cœurs) pour qu'un cœur de plus vaille la peine
+SCALING_EFFICIENCY = 0.6
+
+
+def available_cores():
+    """
+    :return: Liste des cœurs sur lesquels ce processus peut tourner.
+    """
+    try:
+        return sorted(psutil.Process().cpu_affinity())
+    except (AttributeError, psutil.Error):
+        return list(range(os.cpu_count() or 1))  # Placement non géré (macOS)
+
+
+def pin_cores(cores):
+    """
+    Place le processus courant sur les cœurs donnés.
+
+    :return: True si le placement a été appliqué.
+    """
+    try:
+        psutil.Process().cpu_affinity(list(cores))
+        return True
+    except (AttributeError, ValueError, psutil.Error):
+        return False
+
+
+def default_core_counts(cores=None):
+    """
+    :return: Nombres de cœurs balayés : 1, 2, 4, ... jusqu'au nombre de cœurs disponibles inclus.
+    """
+    total = len(cores or available_cores())
+    counts = []
+    count = 1
+    while count < total:
+        counts.append(count)
+        count *= 2
+    counts.append(total)
+    return counts
+
+
+def _scaling_job(video_path, tracker_name, tracker_create, roi, threads, cores, start_frame=0):
+    # Exécuté dans un processus dédié (`run_grid`) : placement et threads ne débordent pas sur les autres essais
+    pinned = pin_cores(cores) if cores is not None else False
+    cv2.setNumThreads(threads)
+    results = test_trackers(video_path, {tracker_name: tracker_create}, roi, None, headless=True,
+                            start_frame=start_frame)
+    if not results:
+        return None
+    return {**results[0], "threads": cv2.getNumThreads(), "pinned": pinned}
+
+
+def _row(tracker_name, mode, cores, threads, results):
+    update = [result["latency"]["update"] for result in results]
+    return {
+        "tracker": tracker_name,
+        "mode": mode,
+        "cores": cores,
+        "threads": threads,
+        "instances": len(results),
+        "update_fps": sum(result["update_fps"] for result in results),
+        "throughput_fps": sum(result["throughput_fps"] for result in results),
+        "update_p50_ms": float(np.mean([stats["p50_ms"] for stats in update])),
+        "update_p95_ms": float(max(stats["p95_ms"] for stats in update)),
+        "cpu_percent": sum(result["process_cpu_percent"] for result in results),
+        "pinned": all(result["pinned"] for result in results),
+    }
+
+
+def scaling_study(video_path, trackers, roi, core_counts=None, start_frame=0, instances=True, timeout=None):
+    """
+    Étude de la montée en charge des trackers avec le nombre de cœurs.
+
+    Pour chaque nombre de cœurs n, chaque tracker est relancé seul dans un
+    processus placé sur n cœurs avec `cv2.setNumThreads(n)` (mode "threads") ;
+    si `instances`, n processus mono-thread, chacun placé sur un cœur, suivent
+    la même vidéo côte à côte (mode "instances", débits additionnés). Les
+    essais passent l'un après l'autre pour ne pas se concurrencer.
+
+    Le gain est le débit d'update rapporté à celui d'un seul thread sur un seul
+    cœur, et l'efficacité parallèle le gain divisé par n : un tracker dont
+    l'efficacité en mode "threads" s'effondre gagne à tourner en mono-thread,
+    en plusieurs instances.
+
+    :param video_path: Chemin de la vidéo.
+    :param trackers: Dictionnaire {nom du tracker: fonction de création}.
+    :param roi: ROI initiale (x, y, w, h).
+    :param core_counts: Nombres de cœurs balayés (par défaut : 1, 2, 4, ... jusqu'à tous les cœurs).
+    :param start_frame: Frame sur laquelle les trackers sont initialisés.
+    :param instances: True pour mesurer aussi les instances mono-thread côte à côte.
+    :param timeout: Durée maximale d'un essai en secondes.
+    :return: Liste des lignes de l'étude (une par tracker, mode et nombre de cœurs).
+    """
+    cores = available_cores()
+    core_counts = [count for count in (core_counts or default_core_counts(cores)) if count <= len(cores)]
+    rows = []
+
+    for count in core_counts:
+        core_set = cores[:count]
+        print(f"Étude sur {count} cœur(s) : {core_set}")
+
+        # Un processus par tracker, `count` threads OpenCV placés sur `count` cœurs
+        jobs = [(_scaling_job, (video_path, tracker_name, tracker_create, roi, count, core_set, start_frame))
+                for tracker_name, tracker_create in trackers.items()]
+        outcomes = run_grid(jobs, workers=1, timeout=timeout)
+        for tracker_name, outcome in zip(trackers, outcomes):
+            if outcome["result"]:
+                rows.append(_row(tracker_name, "threads", count, count, [outcome["result"]]))
+
+        if not instances or count == 1:
+            continue
+
+        # `count` instances mono-thread côte à côte, une par cœur
+        for tracker_name, tracker_create in trackers.items():
+            jobs = [(_scaling_job, (video_path, tracker_name, tracker_create, roi, 1, [core], start_frame))
+                    for core in core_set]
+            results = [outcome["result"] for outcome in run_grid(jobs, workers=count, timeout=timeout)
+                       if outcome["result"]]
+            if len(results) == count:
+                rows.append(_row(tracker_name, "instances", count, 1, results))
+
+    # Gain et efficacité par rapport à un thread sur un cœur
+    baselines = {row["tracker"]: row["update_fps"] for row in rows if row["mode"] == "threads" and row["cores"] == 1}
+    for row in rows:
+        baseline = baselines.get(row["tracker"])
+        row["video"] = video_name(video_path)
+        row["speedup"] = row["update_fps"] / baseline if baseline else 0.0
+        row["efficiency"] = row["speedup"] / row["cores"]
+    return rows
+
+
+def recommend(rows):
+    """
+    :param rows: Lignes de `scaling_study`.
+    :return: Dictionnaire {tracker: conseil} : nombre de threads utile par instance et mode à privilégier
+             sur tous les cœurs.
+    """
+    advice = {}
+    for tracker_name in dict.fromkeys(row["tracker"] for row in rows):
+        threads = [row for row in rows if row["tracker"] == tracker_name and row["mode"] == "threads"]
+        side_by_side = [row for row in rows if row["tracker"] == tracker_name and row["mode"] == "instances"]
+
+        # Plus grand nombre de threads qui garde une efficacité suffisante
+        useful = max((row["threads"] for row in threads if row["efficiency"] >= SCALING_EFFICIENCY), default=1)
+        widest = max(threads, key=lambda row: row["cores"], default=None)
+        widest_instances = max(side_by_side, key=lambda row: row["cores"], default=None)
+
+        if (widest_instances is not None and widest is not None
+                and widest_instances["update_fps"] > widest["update_fps"]):
+            advice[tracker_name] = (f"{useful} thread(s) par instance ; sur {widest_instances['cores']} cœurs, "
+                                    f"{widest_instances['cores']} instances mono-thread "
+                                    f"(x{widest_instances['speedup']:.2f} contre x{widest['speedup']:.2f})")
+        elif widest is not None and widest["cores"] > 1:
+            advice[tracker_name] = (f"{useful} thread(s) par instance ; une instance sur {widest['cores']} cœurs "
+                                    f"(x{widest['speedup']:.2f}, efficacité {widest['efficiency']:.2f})")
+        else:
+            advice[tracker_name] = "1 thread (un seul cœur étudié)"
+    return advice
+
+
+# Enregistrer l'étude de montée en charge dans un fichier
+def save_scaling_to_file(rows, output_file):
+    with open(output_file, 'w') as file:
+        file.write(f"{'Tracker':<15}{'Mode':<11}{'Cœurs':<7}{'Threads':<9}{'Update (FPS)':<14}{'Débit (FPS)':<13}"
+                   f"{'p50 (ms)':<10}{'p95 (ms)':<10}{'CPU (%)':<9}{'Gain':<7}{'Efficacité':<10}\n")
+        file.write("=" * 115 + "\n")
+        for row in rows:
+            file.write(f"{row['tracker']:<15}{row['mode']:<11}{row['cores']:<7}{row['threads']:<9}"
+                       f"{row['update_fps']:<14.1f}{row['throughput_fps']:<13.1f}{row['update_p50_ms']:<10.2f}"
+                       f"{row['update_p95_ms']:<10.2f}{row['cpu_percent']:<9.0f}{row['speedup']:<7.2f}"
+                       f"{row['efficiency']:<10.2f}\n")
+
+        file.write("\nConseils\n")
+        file.write("=" * 115 + "\n")
+        for tracker_name, advice in recommend(rows).items():
+            file.write(f"{tracker_name:<15}{advice}\n")
@@ -0,0 +1,288 @@
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import sys
+import uuid
+
+import cv2
+
+# Métriques scalaires conservées pour chaque couple (vidéo, tracker)
+METRICS = ("avg_fps", "avg_cpu", "total_frames", "throughput_fps", "update_fps", "init_ms", "first_update_ms", "encode_blocked_s",
+           "cpu_time_s", "process_cpu_percent", "wall_time_s", "peak_rss_mb", "frame_allocations", "frame_allocated_mb",
+           "frame_reuses")
+
+
+def cpu_model():
+    """
+    :return: Nom du modèle de processeur (chaîne vide s'il est inconnu).
+    """
+    if os.path.exists("/proc/cpuinfo"):
+        with open("/proc/cpuinfo") as file:
+            for line in file:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    return platform.processor()
+
+
+def environment():
+    """
+    :return: Dictionnaire décrivant la machine et la version d'OpenCV du test.
+    """
+    return {
+        "opencv_version": cv2.__version__,
+        "cpu_model": cpu_model(),
+        "cpu_count": os.cpu_count(),
+        "threads": cv2.getNumThreads(),
+        "platform": platform.platform(),
+        "python_version": platform.python_version(),
+    }
+
+
+def result_record(result, run_id, timestamp, env):
+    """
+    Ligne du magasin pour un résultat de `test_trackers` : métriques scalaires et
+    statistiques de latence à plat (`update_mean_ms`, `update_p95_ms`, ...).
+    """
+    record = {"run_id": run_id, "timestamp": timestamp, "video": result.get("video"), "tracker": result["tracker"],
+              **env}
+    for metric in METRICS:
+        if metric in result:
+            record[metric] = result[metric]
+    for stage, stats in result.get("latency", {}).items():
+        for key, value in stats.items():
+            record[f"{stage}_{key}"] = value
+    return record
+
+
+def append_results(results, path, run_id=None, **extra):
+    """
+    Ajoute les résultats d'un lot à la fin du magasin JSONL (une ligne par couple vidéo × tracker).
+
+    Le fichier n'est jamais réécrit : chaque lot ajoute ses lignes avec son
+    identifiant, l'horodatage et la description de la machine, ce qui permet
+    de comparer les lots entre eux (`python -m tracking_bench.store compare`).
+
+    :param results: Liste des dictionnaires retournés par `test_trackers`.
+    :param path: Chemin du fichier JSONL.
+    :param run_id: Identifiant du lot (par défaut : horodatage suivi d'un suffixe aléatoire, distinct pour
+                   deux lots lancés dans la même seconde).
+    :param extra: Champs supplémentaires ajoutés à chaque ligne (nom du script, remarque, ...).
+    :return: Identifiant du lot.
+    """
+    now = datetime.datetime.now().astimezone()
+    run_id = run_id or f"{now:%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+    env = environment()
+
+    with open(path, "a", encoding="utf-8") as file:
+        for result in results:
+            record = result_record(result, run_id, now.isoformat(timespec="seconds"), env)
+            record.update(extra)
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return run_id
+
+
+def load_records(path):
+    """
+    :return: Liste des lignes du magasin JSONL.
+    """
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def run_ids(records):
+    """
+    :return: Identifiants des lots dans l'ordre d'apparition.
+    """
+    return list(dict.fromkeys(record["run_id"] for record in records))
+
+
+# Fonction bêta incomplète régularisée (fraction continue de Lentz)
+def _incomplete_beta(a, b, x):
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    if x > (a + 1) / (a + b + 2):
+        return 1.0 - _incomplete_beta(b, a, 1 - x)
+
+    log_front = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1 - x)
+    front = math.exp(log_front) / a
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    fraction = d
+    for m in range(1, 200):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            fraction *= c * d
+        if abs(c * d - 1.0) < 1e-12:
+            break
+    return front * fraction
+
+
+def welch_test(mean_a, std_a, count_a, mean_b, std_b, count_b):
+    """
+    Test t de Welch (variances inégales) à partir des moyennes, écarts-types et effectifs.
+
+    :return: Tuple (t, degrés de liberté, p-valeur bilatérale) ; p-valeur 1 si le test est impossible.
+    """
+    if count_a < 2 or count_b < 2:
+        return 0.0, 0.0, 1.0
+    var_a, var_b = std_a ** 2 / count_a, std_b ** 2 / count_b
+    if var_a + var_b == 0:
+        return 0.0, 0.0, 1.0 if mean_a == mean_b else 0.0
+
+    t = (mean_b - mean_a) / math.sqrt(var_a + var_b)
+    df = (var_a + var_b) ** 2 / (var_a ** 2 / (count_a - 1) + var_b ** 2 / (count_b - 1))
+    p_value = _incomplete_beta(df / 2, 0.5, df / (df + t * t))
+    return t, df, p_value
+
+
+def _moments(values):
+    count = len(values)
+    mean = sum(values) / count
+    std = math.sqrt(sum((v - mean) ** 2 for v in values) / (count - 1)) if count > 1 else 0.0
+    return mean, std, count
+
+
+# Moyenne, écart-type et effectif de la latence d'update, regroupés sur les répétitions d'un lot
+def _pooled_latency(records):
+    count = sum(record["update_count"] for record in records)
+    if count == 0:
+        return 0.0, 0.0, 0
+    mean = sum(record["update_count"] * record["update_mean_ms"] for record in records) / count
+    squares = sum((record["update_count"] - 1) * record["update_std_ms"] ** 2 +
+                  record["update_count"] * record["update_mean_ms"] ** 2 for record in records)
+    variance = (squares - count * mean ** 2) / (count - 1) if count > 1 else 0.0
+    return mean, math.sqrt(max(variance, 0.0)), count
+
+
+def compare_runs(records, baseline, candidate, alpha=0.01, min_change=0.05):
+    """
+    Compare deux lots du magasin couple par couple (vidéo, tracker).
+
+    Quand chaque lot contient au moins deux répétitions du couple, la latence
+    moyenne d'update et le débit du pipeline sont comparés répétition par
+    répétition (test de Welch), ce qui tient compte des écarts d'un lancement à
+    l'autre. Sinon, seule la latence d'update est testée, frame par frame à
+    partir des moyennes, écarts-types et effectifs enregistrés : ce test est
+    plus sensible et peut signaler un simple écart de charge de la machine.
+    Le débit n'a alors qu'une mesure par lot : son écart est rapporté à titre
+    indicatif (p-valeur NaN), sans test ni verdict de régression.
+    Un écart n'est signalé que s'il est significatif (p < `alpha`) et qu'il
+    dépasse `min_change` en valeur relative.
+
+    :param records: Lignes du magasin.
+    :param baseline: Identifiant du lot de référence.
+    :param candidate: Identifiant du lot à comparer.
+    :return: Liste de dictionnaires, un par couple et par métrique, avec "regression" à True
+             pour les dégradations significatives.
+    """
+    groups = {}
+    for record in records:
+        if record["run_id"] in (baseline, candidate) and "update_count" in record:
+            groups.setdefault((record["video"], record["tracker"]), {}).setdefault(record["run_id"], []).append(record)
+
+    comparisons = []
+    for (video, tracker), runs in groups.items():
+        if baseline not in runs or candidate not in runs:
+            continue
+
+        if len(runs[baseline]) > 1 and len(runs[candidate]) > 1:
+            # Répétitions disponibles : la variabilité d'un lot à l'autre entre dans le test
+            tests = [(metric, _moments([r[key] for r in runs[baseline]]), _moments([r[key] for r in runs[candidate]]),
+                      higher_is_worse)
+                     for metric, key, higher_is_worse in (("update_ms", "update_mean_ms", True),
+                                                          ("throughput_fps", "throughput_fps", False))]
+        else:
+            tests = [("update_ms", _pooled_latency(runs[baseline]), _pooled_latency(runs[candidate]), True)]
+            if all("throughput_fps" in r for r in runs[baseline] + runs[candidate]):
+                # Une seule mesure de débit par lot : écart indicatif, pas de test possible
+                tests.append(("throughput_fps", _moments([r["throughput_fps"] for r in runs[baseline]]),
+                              _moments([r["throughput_fps"] for r in runs[candidate]]), False))
+
+        for metric, before, after, higher_is_worse in tests:
+            if before[2] < 2 or after[2] < 2:
+                p_value = math.nan
+            else:
+                t, df, p_value = welch_test(*before, *after)
+            change = (after[0] - before[0]) / before[0] if before[0] else 0.0
+            worse = change > 0 if higher_is_worse else change < 0
+            significant = p_value < alpha and abs(change) >= min_change
+            comparisons.append({
+                "video": video,
+                "tracker": tracker,
+                "metric": metric,
+                "baseline": before[0],
+                "candidate": after[0],
+                "change": change,
+                "p_value": p_value,
+                "significant": significant,
+                "regression": significant and worse,
+            })
+    return comparisons
+
+
+def print_comparison(comparisons, baseline, candidate):
+    print(f"Comparaison {baseline} -> {candidate}")
+    print(f"{'Tracker':<15}{'Vidéo':<25}{'Métrique':<16}{'Référence':<12}{'Candidat':<12}{'Écart':<10}"
+          f"{'p':<10}{'Verdict':<12}")
+    print("=" * 112)
+    for row in comparisons:
+        if math.isnan(row["p_value"]):
+            verdict = "indicatif"
+        else:
+            verdict = "RÉGRESSION" if row["regression"] else ("gain" if row["significant"] else "-")
+        print(f"{row['tracker']:<15}{row['video'] or '':<25}{row['metric']:<16}{row['baseline']:<12.3f}"
+              f"{row['candidate']:<12.3f}{row['change']:<+10.1%}{row['p_value']:<10.2g}{verdict:<12}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tracking_bench.store",
+                                     description="Magasin de résultats JSONL des tests de trackers.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="Lister les lots du magasin.")
+    list_parser.add_argument("path")
+
+    compare_parser = commands.add_parser("compare", help="Signaler les régressions significatives entre deux lots.")
+    compare_parser.add_argument("path")
+    compare_parser.add_argument("baseline", nargs="?", help="Lot de référence (par défaut : l'avant-dernier).")
+    compare_parser.add_argument("candidate", nargs="?", help="Lot comparé (par défaut : le dernier).")
+    compare_parser.add_argument("--alpha", type=float, default=0.01, help="Seuil de signification.")
+    compare_parser.add_argument("--min-change", type=float, default=0.05, help="Écart relatif minimal signalé.")
+
+    args = parser.parse_args(argv)
+    records = load_records(args.path)
+    runs = run_ids(records)
+
+    if args.command == "list":
+        for run_id in runs:
+            rows = [record for record in records if record["run_id"] == run_id]
+            first = rows[0]
+            print(f"{run_id:<24}{first['timestamp']:<28}OpenCV {first['opencv_version']:<10}"
+                  f"{first['threads']:>3} threads  {len(rows):>4} lignes  {first['cpu_model']}")
+        return 0
+
+    baseline = args.baseline or (runs[-2] if len(runs) > 1 else None)
+    candidate = args.candidate or (runs[-1] if runs else None)
+    if baseline is None or candidate is None:
+        print("Erreur : il faut au moins deux lots pour comparer.")
+        return 2
+
+    comparisons = compare_runs(records, baseline, candidate, args.alpha, args.min_change)
+    print_comparison(comparisons, baseline, candidate)
+    regressions = sum(row["regression"] for row in comparisons)
+    print(f"{regressions} régression(s) significative(s).")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+import concurrent.futures
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from tracking_bench.buffers import FramePool
+from tracking_bench.capture import ReplayCapture, ThreadedCapture, video_name
+from tracking_bench.display import NullDisplay
+from tracking_bench.realtime import REALTIME_TOLERANCE
+from tracking_bench.writer import AsyncVideoWriter
+
+
+def open_stream(source, fps=None, jitter_ms=1.0):
+    """
+    Ouvre un flux derrière une `ThreadedCapture` (non démarrée).
+
+    :param source: Index de caméra, ou chemin d'une vidéo rejouée au rythme d'une caméra.
+    :param fps: Fréquence de relecture d'une vidéo (None : fréquence du fichier).
+    :param jitter_ms: Gigue des instants de capture d'une vidéo rejouée, en millisecondes.
+    :return: `ThreadedCapture` à démarrer avec `start()`.
+    """
+    if isinstance(source, int):
+        return ThreadedCapture(source)
+    return ThreadedCapture(ReplayCapture(source, fps, jitter_ms=jitter_ms))
+
+
+class MultiStreamRunner:
+    """
+    Suivi simultané de plusieurs flux (caméras ou vidéos rejouées) dans un seul processus.
+
+    Chaque flux a son thread de capture (`ThreadedCapture`, politique « garder
+    la plus récente ») et son thread de pilotage : lecture → suivi → sortie
+    (vidéo annotée, aperçu). Les updates de tous les flux passent par un pool
+    de threads commun dont la taille fixe le nombre de cœurs consommés. Chaque
+    flux n'a jamais plus d'un update en file : la file du pool, servie dans
+    l'ordre d'arrivée, alterne donc entre les flux (tourniquet) et un tracker
+    lent ne peut pas affamer les autres ; il perd ses propres frames.
+
+    Le bilan par flux (`reports()`) donne le débit, les frames perdues, le
+    délai capture → sortie, la durée des updates et l'attente dans le pool.
+    """
+
+    def __init__(self, workers=None, display=None, output_dir=None):
+        """
+        :param workers: Nombre de threads du pool de suivi commun (par défaut : nombre de cœurs).
+        :param display: Affichage partagé (`PreviewWindow` conseillé ; None : aucun).
+        :param output_dir: Répertoire des vidéos annotées de chaque flux (None : aucune vidéo écrite).
+        """
+        self.workers = workers or os.cpu_count()
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers)
+        self.display = display or NullDisplay()
+        self.output_dir = output_dir
+        self.streams = []
+        self.stop_event = threading.Event()
+        self.elapsed = 0.0
+
+    def add(self, source, tracker_name, tracker_create, roi=None, fps=None, jitter_ms=1.0, name=None):
+        """
+        Ouvre un flux et initialise son tracker sur la première frame.
+
+        :param source: Index de caméra ou chemin de vidéo.
+        :param tracker_name: Nom du tracker (rapport).
+        :param tracker_create: Fonction de création du tracker.
+        :param roi: ROI initiale (x, y, w, h) ; None : sélection interactive sur la première frame.
+        :param fps: Fréquence de relecture d'une vidéo (None : fréquence du fichier).
+        :param jitter_ms: Gigue des instants de capture d'une vidéo rejouée.
+        :param name: Nom du flux (par défaut : numéro et nom de la source).
+        :return: True si le flux a été ajouté.
+        """
+        name = name or f"{len(self.streams) + 1}-{video_name(source) if not isinstance(source, int) else source}"
+        capture = open_stream(source, fps, jitter_ms)
+        if not capture.isOpened():
+            print(f"Erreur : Impossible d'ouvrir le flux '{source}'.")
+            return False
+
+        # Première frame lue directement : le thread de capture ne démarre qu'avec `run()`
+        ret, frame = capture.cap.read()
+        if not ret:
+            print(f"Erreur : Impossible de lire le flux '{source}'.")
+            capture.release()
+            return False
+
+        if roi is None:
+            roi = cv2.selectROI(f"Sélectionnez l'objet - {name}", frame, fromCenter=False, showCrosshair=True)
+            cv2.destroyWindow(f"Sélectionnez l'objet - {name}")
+            if roi[2] == 0 or roi[3] == 0:
+                capture.release()
+                return False
+
+        tracker = tracker_create()
+        start = time.perf_counter()
+        tracker.init(frame, tuple(int(v) for v in roi))
+        init_ms = (time.perf_counter() - start) * 1000
+
+        pool = FramePool()
+        out = None
+        if self.output_dir is not None:
+            frame_size = (frame.shape[1], frame.shape[0])
+            output_path = os.path.join(self.output_dir, f"{name}_{tracker_name}.mp4")
+            out = AsyncVideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), capture.get(cv2.CAP_PROP_FPS) or 30,
+                                   frame_size, pool=pool)
+
+        self.streams.append({
+            "name": name,
+            "source": source,
+            "tracker_name": tracker_name,
+            "tracker": tracker,
+            "capture": capture,
+            "pool": pool,
+            "out": out,
+            "init_ms": init_ms,
+            "update_ms": [],
+            "wait_ms": [],
+            "failures": 0,
+            "errors": 0,
+            "replay_dropped": 0,
+        })
+        return True
+
+    # Update d'un flux (exécuté dans le pool commun)
+    @staticmethod
+    def _track(stream, frame, submitted):
+        start = time.perf_counter()
+        success, box = stream["tracker"].update(frame)
+        end = time.perf_counter()
+        return success, box, (start - submitted) * 1000, (end - start) * 1000
+
+    # Boucle de pilotage d'un flux : lecture → suivi (pool commun) → sortie
+    def _run_stream(self, stream, deadline):
+        capture = stream["capture"]
+        pool = stream["pool"]
+        try:
+            while not self.stop_event.is_set() and (deadline is None or time.perf_counter() < deadline):
+                ret, frame = capture.read(timeout=0.5)
+                if not ret:
+                    if capture.stopped:
+                        break  # Fin de la source
+                    continue
+
+                try:
+                    success, box, wait_ms, update_ms = self.executor.submit(self._track, stream, frame,
+                                                                            time.perf_counter()).result()
+                except Exception as error:
+                    # Exception du tracker : frame comptée en erreur et en échec, le flux continue
+                    stream["errors"] += 1
+                    if stream["errors"] == 1:
+                        print(f"Erreur dans le flux '{stream['name']}' ({stream['tracker_name']}) : {error!r}")
+                    success, box = False, None
+                else:
+                    stream["wait_ms"].append(wait_ms)
+                    stream["update_ms"].append(update_ms)
+                if not success:
+                    stream["failures"] += 1
+
+                # Sortie sur une copie : la frame d'une vidéo rejouée peut être partagée
+                if stream["out"] is not None or not isinstance(self.display, NullDisplay):
+                    canvas = pool.copy(frame)
+                    if success:
+                        x, y, w, h = [int(v) for v in box]
+                        cv2.rectangle(canvas, (x, y), (x + w, y + h), (0, 255, 0), 2)
+                    else:
+                        cv2.putText(canvas, "Echec du suivi !", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.75,
+                                    (0, 0, 255), 2)
+                    cv2.putText(canvas, f"{stream['name']} - {stream['tracker_name']}", (10, 20),
+                                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+                    self.display.show(f"Flux {stream['name']}", canvas)
+                    if stream["out"] is not None:
+                        stream["out"].write(canvas)  # Rendu à la réserve après encodage
+                    else:
+                        pool.release(canvas)
+                capture.record_display()
+
+                if self.display.poll_quit():
+                    self.stop_event.set()
+        except Exception as error:
+            # Erreur hors du tracker (sortie, capture) : le flux s'arrête, les autres continuent
+            stream["errors"] += 1
+            print(f"Flux '{stream['name']}' arrêté sur une erreur : {error!r}")
+        finally:
+            # Capture et écrivain libérés même si la boucle s'arrête sur une erreur
+            capture.release()
+            if stream["out"] is not None:
+                stream["out"].release()
+
+    def run(self, duration=None):
+        """
+        Démarre tous les flux et attend leur fin (fin des vidéos, durée écoulée ou 'q' dans l'aperçu).
+
+        :param duration: Durée maximale en secondes (None : jusqu'à la fin des sources).
+        :return: Liste des bilans par flux (`reports()`).
+        """
+        for stream in self.streams:
+            replay = stream["capture"].cap
+            if isinstance(replay, ReplayCapture):
+                # L'horloge de relecture repart après la sélection des ROI et les inits
+                replay.restart()
+                stream["replay_dropped"] = replay.frames_dropped
+            stream["capture"].start()
+
+        start = time.perf_counter()
+        deadline = start + duration if duration else None
+        threads = [threading.Thread(target=self._run_stream, args=(stream, deadline), daemon=True)
+                   for stream in self.streams]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.perf_counter() - start
+
+        self.executor.shutdown()
+        self.display.close()
+        return self.reports()
+
+    def reports(self):
+        """
+        :return: Liste d'un dictionnaire par flux : frames émises, traitées et perdues, débit (FPS),
+                 délai capture → sortie (p50/p95 ms), durée des updates et attente dans le pool
+                 (p50/p95 ms), frames en échec, exceptions du flux et tenue du temps réel.
+        """
+        reports = []
+        for stream in self.streams:
+            capture = stream["capture"]
+            stats = capture.stats()
+            replay_dropped = 0
+            if isinstance(capture.cap, ReplayCapture):
+                replay_dropped = capture.cap.frames_dropped - stream["replay_dropped"]
+
+            emitted = stats["captured"] + replay_dropped
+            dropped = stats["dropped"] + replay_dropped
+            update_ms = np.array(stream["update_ms"]) if stream["update_ms"] else np.zeros(1)
+            wait_ms = np.array(stream["wait_ms"]) if stream["wait_ms"] else np.zeros(1)
+            drop_ratio = dropped / emitted if emitted else 0.0
+
+            reports.append({
+                "stream": stream["name"],
+                "tracker": stream["tracker_name"],
+                "emitted": emitted,
+                "processed": stats["delivered"],
+                "dropped": dropped,
+                "drop_ratio": drop_ratio,
+                "fps": stats["delivered"] / self.elapsed if self.elapsed > 0 else 0.0,
+                "latency_p50_ms": stats["latency_p50_ms"],
+                "latency_p95_ms": stats["latency_p95_ms"],
+                "update_p50_ms": float(np.percentile(update_ms, 50)),
+                "update_p95_ms": float(np.percentile(update_ms, 95)),
+                "wait_p95_ms": float(np.percentile(wait_ms, 95)),
+                "init_ms": stream["init_ms"],
+                "failures": stream["failures"],
+                "errors": stream["errors"],
+                "realtime": drop_ratio <= REALTIME_TOLERANCE,
+            })
+        return reports
+
+
+# Enregistrer le bilan des flux dans un fichier
+def save_streams_to_file(reports, output_file, workers=None, elapsed=None):
+    with open(output_file, 'w') as file:
+        if workers is not None and elapsed is not None:
+            total_fps = sum(report["fps"] for report in reports)
+            file.write(f"{len(reports)} flux, {workers} threads de suivi, {elapsed:.1f} s, "
+                       f"débit total {total_fps:.1f} FPS\n\n")
+        file.write(f"{'Flux':<20}{'Tracker':<12}{'FPS':<8}{'Traitées':<10}{'Perdues':<10}{'Délai p95 (ms)':<16}"
+                   f"{'Update p95 (ms)':<17}{'Attente p95 (ms)':<18}{'Échecs':<8}{'Erreurs':<9}{'Temps réel':<10}\n")
+        file.write("=" * 138 + "\n")
+        for report in reports:
+            file.write(f"{report['stream']:<20}{report['tracker']:<12}{report['fps']:<8.1f}{report['processed']:<10}"
+                       f"{report['dropped']:<10}{report['latency_p95_ms']:<16.2f}{report['update_p95_ms']:<17.2f}"
+                       f"{report['wait_p95_ms']:<18.2f}{report['failures']:<8}{report['errors']:<9}"
+                       f"{'oui' if report['realtime'] else 'non':<10}\n")
@@ -0,0 +1,212 @@
+import cv2
+import numpy as np
+
+from tracking_bench.benchmark import test_trackers
+from tracking_bench.evaluation import evaluate_trackers
+
+
+# Texture lisse et déterministe (bruit flouté et étiré sur toute la plage 0-255)
+def _smooth_texture(rng, height, width, sigma):
+    texture = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    texture = cv2.GaussianBlur(texture, (0, 0), sigma)
+    return cv2.normalize(texture, None, 0, 255, cv2.NORM_MINMAX)
+
+
+class SyntheticSequence:
+    """
+    Séquence synthétique déterministe avec vérité terrain exacte.
+
+    Une cible texturée se déplace sur un fond fixe avec une vitesse et une
+    accélération données (rebond sur les bords), peut changer d'échelle, être
+    masquée par un obstacle pendant un intervalle de frames et recevoir du
+    bruit gaussien. Les frames sont générées à la demande, sans fichier
+    vidéo : pour une même graine, la frame i est toujours identique, même
+    après un saut avec `set(cv2.CAP_PROP_POS_FRAMES, i)`.
+
+    S'utilise comme `cv2.VideoCapture` (`read`, `grab`, `retrieve`, `get`,
+    `set`, `release`) et peut donc être passée directement à `test_trackers`.
+    `ground_truth` contient la boîte (x, y, w, h) rendue à chaque frame.
+    """
+
+    def __init__(self, name="synthetic", width=640, height=480, frames=300, fps=30, target_size=(60, 60),
+                 start=None, velocity=(3.0, 1.5), acceleration=(0.0, 0.0), scale_rate=0.0, occlusion=None,
+                 noise=0.0, seed=0):
+        """
+        :param name: Nom de la séquence (nom des fichiers de sortie).
+        :param width: Largeur des frames.
+        :param height: Hauteur des frames.
+        :param frames: Nombre de frames.
+        :param fps: Fréquence d'images annoncée par `get(cv2.CAP_PROP_FPS)`.
+        :param target_size: Taille initiale de la cible (largeur, hauteur), limitée à celle de l'image.
+        :param start: Position initiale (x, y) du coin de la cible (par défaut : à gauche, centrée).
+        :param velocity: Vitesse initiale (vx, vy) en pixels par frame.
+        :param acceleration: Accélération (ax, ay) en pixels par frame².
+        :param scale_rate: Variation relative de taille par frame (0.002 : +0.2 % par frame).
+        :param occlusion: Intervalle (début, fin) des frames où un obstacle masque la cible, ramené aux
+                          frames de la séquence.
+        :param noise: Écart-type du bruit gaussien ajouté à chaque frame.
+        :param seed: Graine de génération.
+        """
+        if width < 4 or height < 4 or frames < 1:
+            raise ValueError(f"Séquence invalide : {width}×{height}, {frames} frames.")
+        if min(target_size) <= 0:
+            raise ValueError(f"Taille de cible invalide : {target_size}.")
+        target_size = (min(target_size[0], width), min(target_size[1], height))
+        if occlusion is not None:
+            if occlusion[0] >= occlusion[1]:
+                raise ValueError(f"Intervalle d'occlusion invalide : {occlusion}.")
+            # Intervalle limité à la séquence ; vide s'il commence après la dernière frame
+            occlusion = (max(int(occlusion[0]), 0), min(int(occlusion[1]), frames))
+            if occlusion[0] >= occlusion[1]:
+                occlusion = None
+
+        self.name = name
+        self.width = width
+        self.height = height
+        self.frame_count = frames
+        self.fps = fps
+        self.occlusion = occlusion
+        self.noise = noise
+        self.seed = seed
+
+        rng = np.random.default_rng(seed)
+        self.background = _smooth_texture(rng, height, width, 6)
+        self.target = _smooth_texture(rng, 128, 128, 6)
+
+        # Banque de champs de bruit tirés une fois : la frame i reçoit le champ i modulo la taille de la banque
+        self.noise_bank = None
+        if noise > 0:
+            self.noise_bank = np.round(rng.normal(0, noise, (8, height, width, 3))).astype(np.int16)
+
+        self.ground_truth = self._trajectory(target_size, start, velocity, acceleration, scale_rate)
+        self.position = 0
+        self.current = None
+        self.opened = True
+
+    # Boîtes entières de la cible à chaque frame (cinématique avec rebond sur les bords)
+    def _trajectory(self, target_size, start, velocity, acceleration, scale_rate):
+        base_w, base_h = target_size
+        x, y = start if start is not None else (10.0, (self.height - base_h) / 2)
+        vx, vy = velocity
+        ax, ay = acceleration
+
+        boxes = np.zeros((self.frame_count, 4), dtype=np.float64)
+        for index in range(self.frame_count):
+            scale = float(np.clip((1 + scale_rate) ** index, 0.25, 4.0))
+            w = min(max(4, int(round(base_w * scale))), self.width)
+            h = min(max(4, int(round(base_h * scale))), self.height)
+
+            # Rebond sur les bords de l'image
+            if x < 0 or x + w > self.width:
+                vx, ax = -vx, -ax
+                x = float(np.clip(x, 0, self.width - w))
+            if y < 0 or y + h > self.height:
+                vy, ay = -vy, -ay
+                y = float(np.clip(y, 0, self.height - h))
+
+            boxes[index] = (int(round(x)), int(round(y)), w, h)
+            x, y = x + vx, y + vy
+            vx, vy = vx + ax, vy + ay
+
+        return boxes
+
+    def render(self, index):
+        """
+        :return: Frame `index` de la séquence (BGR, uint8).
+        """
+        frame = self.background.copy()
+        x, y, w, h = self.ground_truth[index].astype(int)
+        frame[y:y + h, x:x + w] = cv2.resize(self.target, (w, h), interpolation=cv2.INTER_AREA)
+
+        # Obstacle vertical fixe, centré sur la cible au milieu de l'intervalle d'occlusion
+        if self.occlusion is not None and self.occlusion[0] <= index < self.occlusion[1]:
+            middle = self.ground_truth[(self.occlusion[0] + self.occlusion[1]) // 2]
+            x0 = int(middle[0] - middle[2] * 0.25)
+            x1 = int(middle[0] + middle[2] * 1.25)
+            frame[:, max(x0, 0):max(x1, 0)] = (90, 90, 90)
+
+        if self.noise_bank is not None:
+            frame = cv2.add(frame, self.noise_bank[index % len(self.noise_bank)], dtype=cv2.CV_8U)
+        return frame
+
+    def isOpened(self):
+        return self.opened
+
+    def grab(self):
+        if not self.opened or self.position >= self.frame_count:
+            return False
+        self.current = self.position
+        self.position += 1
+        return True
+
+    def retrieve(self):
+        if self.current is None:
+            return False, None
+        return True, self.render(self.current)
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def get(self, prop_id):
+        return {
+            cv2.CAP_PROP_FPS: float(self.fps),
+            cv2.CAP_PROP_FRAME_WIDTH: float(self.width),
+            cv2.CAP_PROP_FRAME_HEIGHT: float(self.height),
+            cv2.CAP_PROP_FRAME_COUNT: float(self.frame_count),
+            cv2.CAP_PROP_POS_FRAMES: float(self.position),
+        }.get(prop_id, 0.0)
+
+    def set(self, prop_id, value):
+        if prop_id == cv2.CAP_PROP_POS_FRAMES:
+            self.position = int(np.clip(value, 0, self.frame_count))
+            return True
+        return False
+
+    def release(self):
+        # Remettre la séquence au début pour pouvoir la relire
+        self.position = 0
+        self.current = None
+
+    @property
+    def roi(self):
+        """ROI initiale (x, y, w, h) à donner aux trackers."""
+        return tuple(int(v) for v in self.ground_truth[0])
+
+
+# Séquences types reproduisant les vidéos des tests 2 et 3
+def small_face(seed=0, fps=30):
+    return SyntheticSequence("small_face_synth", frames=300, fps=fps, target_size=(18, 22), velocity=(1.5, 0.4),
+                             noise=4.0, seed=seed)
+
+
+def big_face(seed=0, fps=30):
+    return SyntheticSequence("big_face_synth", frames=140, fps=fps, target_size=(180, 220), velocity=(2.0, 0.5),
+                             scale_rate=0.002, noise=4.0, seed=seed)
+
+
+def cars(seed=0, fps=30):
+    return SyntheticSequence("cars_synth", frames=300, fps=fps, target_size=(90, 50), velocity=(1.0, 0.2),
+                             acceleration=(0.08, 0.0), occlusion=(150, 165), noise=2.0, seed=seed)
+
+
+def run_synthetic_corpus(trackers, sequences=None):
+    """
+    Mesure vitesse et précision des trackers sur le corpus synthétique, sans fichier vidéo.
+
+    :param trackers: Dictionnaire {nom du tracker: fonction de création}.
+    :param sequences: Liste de `SyntheticSequence` (par défaut : petit visage, grand visage, voitures).
+    :return: Liste des résultats de `test_trackers`, complétés par les scores de précision.
+    """
+    if sequences is None:
+        sequences = [small_face(), big_face(), cars()]
+
+    all_results = []
+    for sequence in sequences:
+        print(f"Séquence synthétique : {sequence.name}")
+        results = test_trackers(sequence, trackers, sequence.roi, None, headless=True, record_boxes=True)
+        for result, score in zip(results, evaluate_trackers(results, sequence.ground_truth)):
+            result.update(auc=score["auc"], precision_20=score["precision_20"], mean_iou=score["mean_iou"])
+        all_results.extend(results)
+    return all_results
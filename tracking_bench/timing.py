@@ -0,0 +1,109 @@
+import collections
+import contextlib
+import sys
+import time
+
+import numpy as np
+import psutil
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class StageTimer:
+    """
+    Chronométrage par étape (décodage, init, update, dessin, encodage, affichage).
+
+    Les durées sont mesurées avec `time.perf_counter_ns`, horloge monotone de
+    haute résolution, et conservées pour calculer les percentiles.
+    """
+
+    def __init__(self):
+        self.samples = collections.defaultdict(list)
+
+    def add(self, stage, elapsed_ns):
+        self.samples[stage].append(elapsed_ns)
+
+    @contextlib.contextmanager
+    def stage(self, stage):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.samples[stage].append(time.perf_counter_ns() - start)
+
+    def total(self, stage):
+        """
+        :return: Durée cumulée de l'étape en secondes.
+        """
+        return sum(self.samples.get(stage, ())) / 1e9
+
+    def summary(self):
+        """
+        :return: Dictionnaire {étape: statistiques en millisecondes}.
+        """
+        return {stage: summarize_latencies(samples) for stage, samples in self.samples.items()}
+
+
+def summarize_latencies(samples_ns):
+    """
+    Statistiques d'une série de durées.
+
+    :param samples_ns: Durées en nanosecondes.
+    :return: Dictionnaire avec le nombre de mesures, la moyenne, l'écart-type,
+             p50/p95/p99 et le maximum en millisecondes, et le total en secondes.
+    """
+    values = np.asarray(samples_ns, dtype=np.float64) / 1e6
+    if values.size == 0:
+        return {"count": 0, "mean_ms": 0.0, "std_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0,
+                "max_ms": 0.0, "total_s": 0.0}
+
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": int(values.size),
+        "mean_ms": float(values.mean()),
+        "std_ms": float(values.std(ddof=1)) if values.size > 1 else 0.0,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(values.max()),
+        "total_s": float(values.sum() / 1e3),
+    }
+
+
+class ProcessMonitor:
+    """
+    Ressources consommées par ce processus uniquement (et non par tout le système).
+
+    Le temps CPU (utilisateur + système) est mesuré entre la création du
+    moniteur et l'appel à `summary()`. Le pic de mémoire résidente est celui du
+    processus depuis son démarrage : il est exact quand chaque test tourne dans
+    son propre processus (`run_grid`).
+    """
+
+    def __init__(self):
+        self.process = psutil.Process()
+        self.start_cpu = self.process.cpu_times()
+        self.start_wall = time.perf_counter()
+
+    def peak_rss_mb(self):
+        memory = self.process.memory_info()
+        peak = getattr(memory, "peak_wset", None)  # Windows
+        if peak is None and resource is not None:
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            if sys.platform != "darwin":
+                peak *= 1024  # Ko sous Linux, octets sous macOS
+        return max(peak or 0, memory.rss) / (1024 * 1024)
+
+    def summary(self):
+        cpu = self.process.cpu_times()
+        cpu_time = (cpu.user - self.start_cpu.user) + (cpu.system - self.start_cpu.system)
+        wall_time = time.perf_counter() - self.start_wall
+        return {
+            "cpu_time_s": cpu_time,
+            "process_cpu_percent": 100 * cpu_time / wall_time if wall_time > 0 else 0,
+            "wall_time_s": wall_time,
+            "peak_rss_mb": self.peak_rss_mb(),
+        }
@@ -0,0 +1,187 @@
+import argparse
+import math
+import os
+import sys
+
+import cv2
+import numpy as np
+
+from tracking_bench.buffers import FramePool
+from tracking_bench.capture import video_name
+from tracking_bench.writer import AsyncVideoWriter
+
+# Couleurs des boîtes des différents trackers (BGR)
+COLORS = [(0, 255, 0), (255, 128, 0), (0, 128, 255), (255, 0, 255), (0, 255, 255), (255, 255, 0), (128, 0, 255),
+          (255, 255, 255)]
+
+# Largeur maximale d'une mosaïque en pixels
+MOSAIC_MAX_WIDTH = 1920
+
+
+def save_track_log(results, output_path, video_path, start_frame=0):
+    """
+    Enregistre les boîtes de tous les trackers d'une vidéo dans un journal .npz compressé.
+
+    Le journal remplace les vidéos annotées d'un tracker chacune : quelques
+    kilo-octets par tracker au lieu d'un encodage mp4 complet. Les vidéos
+    annotées sont produites plus tard, à la demande, avec `render_tracks`.
+
+    :param results: Résultats de `test_trackers(..., record_boxes=True)` pour cette vidéo.
+    :param output_path: Chemin du fichier .npz.
+    :param video_path: Chemin de la vidéo source (pour le rendu).
+    :param start_frame: Frame de la vidéo correspondant à la première boîte.
+    :return: Chemin du journal.
+    """
+    frames = min(len(result["boxes"]) for result in results)
+    np.savez_compressed(
+        output_path,
+        trackers=np.array([result["tracker"] for result in results]),
+        boxes=np.stack([result["boxes"][:frames] for result in results], axis=1).astype(np.float32),
+        success=np.stack([result["success"][:frames] for result in results], axis=1),
+        video_path=np.array(os.path.abspath(video_path)),
+        start_frame=np.array(start_frame),
+    )
+    return output_path
+
+
+def save_track_logs(results, videos, output_dir):
+    """
+    Enregistre un journal `<vidéo>_tracks.npz` par vidéo à partir des résultats d'un lot.
+
+    :param results: Résultats de plusieurs vidéos, avec leurs boîtes ("boxes", "success").
+    :param videos: Dictionnaire {chemin de la vidéo: frame de départ}.
+    :param output_dir: Répertoire des journaux.
+    :return: Liste des chemins des journaux écrits.
+    """
+    paths = []
+    for video_path, start_frame in videos.items():
+        name = video_name(video_path)
+        video_results = [result for result in results if result.get("video") == name and "boxes" in result]
+        if video_results:
+            paths.append(save_track_log(video_results, os.path.join(output_dir, f"{name}_tracks.npz"), video_path,
+                                        start_frame))
+    return paths
+
+
+def load_track_log(path):
+    """
+    :return: Dictionnaire {"trackers", "boxes" (T×N×4), "success" (T×N), "video_path", "start_frame"}.
+    """
+    with np.load(path) as data:
+        return {
+            "trackers": [str(name) for name in data["trackers"]],
+            "boxes": data["boxes"],
+            "success": data["success"],
+            "video_path": str(data["video_path"]),
+            "start_frame": int(data["start_frame"]),
+        }
+
+
+def _draw_box(image, box, color, scale=1.0):
+    x, y, w, h = [int(v * scale) for v in box]
+    cv2.rectangle(image, (x, y), (x + w, y + h), color, 2)
+
+
+def render_tracks(log, output_path, video_path=None, trackers=None, mosaic=False, columns=None):
+    """
+    Produit une vidéo annotée à partir d'un journal de boîtes, en un seul décodage de la source.
+
+    Sans mosaïque, les boîtes de tous les trackers sont dessinées sur la même
+    image avec une couleur par tracker. En mosaïque, chaque tracker a sa case
+    (image réduite à la même échelle), côte à côte.
+
+    :param log: Journal (chemin .npz ou dictionnaire de `load_track_log`).
+    :param output_path: Chemin de la vidéo de sortie.
+    :param video_path: Vidéo source (par défaut : celle enregistrée dans le journal).
+    :param trackers: Noms des trackers à dessiner (par défaut : tous).
+    :param mosaic: True pour une mosaïque d'une case par tracker.
+    :param columns: Nombre de colonnes de la mosaïque (par défaut : racine du nombre de trackers).
+    :return: Nombre de frames écrites, ou None si la source ne peut pas être lue.
+    """
+    if isinstance(log, str):
+        log = load_track_log(log)
+    video_path = video_path or log["video_path"]
+    names = trackers or log["trackers"]
+    columns_index = [log["trackers"].index(name) for name in names]
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"Erreur : Impossible d'ouvrir la vidéo '{video_path}'.")
+        return None
+    if log["start_frame"] > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, log["start_frame"])
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    width, height = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    if mosaic:
+        columns = columns or math.ceil(math.sqrt(len(names)))
+        rows = math.ceil(len(names) / columns)
+        scale = min(1.0, MOSAIC_MAX_WIDTH / (columns * width))
+        tile_w, tile_h = int(width * scale), int(height * scale)
+        output_size = (columns * tile_w, rows * tile_h)
+    else:
+        scale = 1.0
+        output_size = (width, height)
+
+    pool = FramePool()
+    out = AsyncVideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'), fps, output_size, pool=pool)
+
+    written = 0
+    for boxes, success in zip(log["boxes"], log["success"]):
+        ret, frame = pool.read(cap)
+        if not ret:
+            break
+
+        if mosaic:
+            canvas = pool.acquire((output_size[1], output_size[0], 3))
+            canvas[:] = 0
+            small = cv2.resize(frame, (tile_w, tile_h), interpolation=cv2.INTER_AREA) if scale < 1.0 else frame
+            for tile, (name, column) in enumerate(zip(names, columns_index)):
+                x0, y0 = (tile % columns) * tile_w, (tile // columns) * tile_h
+                view = canvas[y0:y0 + tile_h, x0:x0 + tile_w]
+                view[:] = small
+                if success[column]:
+                    _draw_box(view, boxes[column], COLORS[tile % len(COLORS)], scale)
+                else:
+                    cv2.putText(view, "Echec", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+                cv2.putText(view, name, (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+            pool.release(frame)
+        else:
+            canvas = frame
+            for tile, (name, column) in enumerate(zip(names, columns_index)):
+                color = COLORS[tile % len(COLORS)]
+                if success[column]:
+                    _draw_box(canvas, boxes[column], color)
+                cv2.putText(canvas, name, (10, 20 + 22 * tile), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+
+        out.write(canvas)
+        written += 1
+
+    cap.release()
+    out.release()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tracking_bench.tracklog",
+                                     description="Rendu à la demande des journaux de boîtes (.npz).")
+    parser.add_argument("log", help="Journal .npz produit par save_track_log.")
+    parser.add_argument("--output", help="Vidéo de sortie (par défaut : à côté du journal).")
+    parser.add_argument("--video", help="Vidéo source (par défaut : celle du journal).")
+    parser.add_argument("--trackers", nargs="+", help="Trackers à dessiner (par défaut : tous).")
+    parser.add_argument("--mosaic", action="store_true", help="Une case par tracker, côte à côte.")
+    parser.add_argument("--columns", type=int, help="Nombre de colonnes de la mosaïque.")
+    args = parser.parse_args(argv)
+
+    suffix = "_mosaic.mp4" if args.mosaic else "_overlay.mp4"
+    output = args.output or os.path.splitext(args.log)[0] + suffix
+    written = render_tracks(args.log, output, args.video, args.trackers, args.mosaic, args.columns)
+    if written is None:
+        return 1
+    print(f"Vidéo enregistrée : {output} ({written} frames)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
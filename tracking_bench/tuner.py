@@ -0,0 +1,295 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from tracking_bench.capture import video_name
+from tracking_bench.evaluation import find_ground_truth, iou, load_ground_truth
+from tracking_bench.manifest import RoiManifest, select_roi, video_hash
+from tracking_bench.scaled import scaled
+from tracking_bench.warm import warm_up
+
+# Trackers essayés par défaut
+CANDIDATES = {
+    "MOSSE": cv2.legacy.TrackerMOSSE_create,
+    "KCF": cv2.legacy.TrackerKCF_create,
+    "MEDIANFLOW": cv2.legacy.TrackerMedianFlow_create,
+    "CSRT": cv2.legacy.TrackerCSRT_create,
+    "MIL": cv2.legacy.TrackerMIL_create,
+    "TLD": cv2.legacy.TrackerTLD_create,
+    "BOOSTING": cv2.legacy.TrackerBoosting_create,
+}
+
+# Échelles de traitement essayées pour chaque tracker
+DEFAULT_SCALES = (1.0, 0.5, 0.25)
+
+# Percentile de la durée d'update comparé au budget
+BUDGET_PERCENTILE = 95
+
+
+def tuned_create(tracker_create, scale):
+    """
+    :return: Fonction de création du tracker à l'échelle `scale` (le tracker lui-même à pleine résolution).
+    """
+    return tracker_create if scale >= 1.0 else scaled(tracker_create, scale=scale)
+
+
+def _trial(video_path, tracker_create, roi, start_frame, frames, reference, min_overlap, limit_ms=None,
+           max_misses=None):
+    """
+    Suit la cible sur le préfixe de calibration et s'arrête dès que l'essai ne peut plus réussir.
+
+    :param reference: Tableau des boîtes de référence du préfixe (None : pas de contrôle du recouvrement).
+    :param limit_ms: Durée d'update à ne pas dépasser au percentile `BUDGET_PERCENTILE` (None : aucune).
+    :param max_misses: Nombre maximal de frames sans accroche (None : aucun).
+    :return: Dictionnaire {"boxes", "success", "update_ms", "misses", "stopped"} ; "stopped" vaut
+             "budget" ou "accroche" si l'essai a été arrêté avant la fin du préfixe.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if start_frame > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    ret, frame = cap.read()
+    if not ret:
+        cap.release()
+        return None
+
+    # Passage à blanc : les coûts du premier init ne doivent pas fausser le classement
+    warm_up(tracker_create, frame.shape)
+    tracker = tracker_create()
+    tracker.init(frame, roi)
+
+    # Dépassements tolérés au percentile visé sur toute la calibration
+    max_over = int((100 - BUDGET_PERCENTILE) / 100 * frames)
+    boxes, success, update_ms = [tuple(roi)], [True], []
+    over = misses = 0
+    stopped = None
+
+    for index in range(1, frames):
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        start = time.perf_counter()
+        ok, box = tracker.update(frame)
+        elapsed = (time.perf_counter() - start) * 1000
+        update_ms.append(elapsed)
+        boxes.append(tuple(box) if ok else (0, 0, 0, 0))
+        success.append(bool(ok))
+
+        expected = reference[index] if reference is not None and index < len(reference) else None
+        locked = ok and (expected is None or not np.isfinite(expected).all()
+                         or float(iou(box, expected)) >= min_overlap)
+        misses += not locked
+
+        # Arrêt anticipé : le budget ou le seuil d'accroche ne peut plus être tenu
+        if limit_ms is not None and elapsed > limit_ms:
+            over += 1
+            if over > max_over:
+                stopped = "budget"
+                break
+        if max_misses is not None and misses > max_misses:
+            stopped = "accroche"
+            break
+
+    cap.release()
+    return {"boxes": np.array(boxes, dtype=np.float64), "success": np.array(success), "update_ms": update_ms,
+            "misses": misses, "stopped": stopped}
+
+
+def autotune(video_path, roi, budget_ms, trackers=None, scales=DEFAULT_SCALES, calibration_frames=150,
+             start_frame=0, ground_truth=None, min_retention=0.9, min_overlap=0.3):
+    """
+    Choisit le tracker et l'échelle de traitement les plus rapides qui tiennent le budget et la précision.
+
+    Chaque couple (tracker, échelle) est essayé sur un préfixe de calibration
+    de la vidéo. Un essai est arrêté dès qu'il ne peut plus réussir : trop
+    d'updates au-delà du budget (ou de la durée du meilleur couple retenu,
+    qu'il ne pourrait plus battre), ou trop de frames sans accroche. La
+    rétention d'accroche est la part des frames où le tracker réussit avec un
+    recouvrement d'au moins `min_overlap` avec la vérité terrain, ou à défaut
+    avec un passage de référence de CSRT pleine résolution sur le préfixe.
+
+    :param video_path: Chemin de la vidéo.
+    :param roi: ROI (x, y, w, h) sur la frame `start_frame`.
+    :param budget_ms: Budget d'update par frame en millisecondes (1000 / FPS visé).
+    :param trackers: Dictionnaire {nom: fonction de création} (par défaut : `CANDIDATES`).
+    :param scales: Échelles de traitement essayées.
+    :param calibration_frames: Longueur du préfixe de calibration en frames.
+    :param start_frame: Frame de départ du préfixe.
+    :param ground_truth: Tableau N×4 de la vérité terrain de la vidéo (None : passage de référence).
+    :param min_retention: Rétention d'accroche minimale (0 à 1).
+    :param min_overlap: Recouvrement minimal avec la référence pour compter une frame comme accrochée.
+    :return: Tuple (configuration retenue ou None, liste des essais).
+    """
+    trackers = trackers or CANDIDATES
+    roi = tuple(int(v) for v in roi)
+
+    if ground_truth is not None:
+        reference = ground_truth[start_frame:start_frame + calibration_frames]
+    else:
+        run = _trial(video_path, cv2.legacy.TrackerCSRT_create, roi, start_frame, calibration_frames, None, 0.0)
+        if run is None:
+            print(f"Erreur : Impossible de lire la vidéo '{video_path}'.")
+            return None, []
+        reference = run["boxes"].copy()
+        reference[~run["success"]] = np.nan
+
+    frames = min(calibration_frames, len(reference))
+    max_misses = int((1 - min_retention) * (frames - 1))
+
+    best = None
+    trials = []
+    for tracker_name, tracker_create in trackers.items():
+        for scale in scales:
+            limit_ms = budget_ms if best is None else min(budget_ms, best["update_p95_ms"])
+            run = _trial(video_path, tuned_create(tracker_create, scale), roi, start_frame, frames, reference,
+                         min_overlap, limit_ms, max_misses)
+            if run is None:
+                continue
+
+            update_ms = run["update_ms"] or [0.0]
+            trial = {
+                "tracker": tracker_name,
+                "scale": scale,
+                "frames": len(run["update_ms"]) + 1,
+                "update_p95_ms": float(np.percentile(update_ms, BUDGET_PERCENTILE)),
+                "update_mean_ms": float(np.mean(update_ms)),
+                "retention": 1 - run["misses"] / max(len(run["update_ms"]), 1),
+                "stopped": run["stopped"],
+            }
+            passed = (run["stopped"] is None and trial["update_p95_ms"] <= budget_ms
+                      and run["misses"] <= max_misses)
+            if passed:
+                trial["status"] = "retenu"
+            elif run["stopped"] == "budget" and limit_ms < budget_ms and trial["update_p95_ms"] <= budget_ms:
+                trial["status"] = "plus lent"  # Dans le budget, mais ne peut plus battre le meilleur couple
+            else:
+                trial["status"] = run["stopped"] or ("accroche" if run["misses"] > max_misses else "budget")
+            trials.append(trial)
+            print(f"  {tracker_name:<12} échelle {scale:<5} : update p95 {trial['update_p95_ms']:.2f} ms, "
+                  f"rétention {trial['retention']:.2f} sur {trial['frames']} frames ({trial['status']})")
+
+            if passed and (best is None or trial["update_p95_ms"] < best["update_p95_ms"]):
+                best = trial
+
+    if best is None:
+        return None, trials
+
+    config = {
+        "tracker": best["tracker"],
+        "scale": best["scale"],
+        "update_p95_ms": best["update_p95_ms"],
+        "retention": best["retention"],
+        "budget_ms": budget_ms,
+        "min_retention": min_retention,
+        "video": video_name(video_path),
+        "video_hash": video_hash(video_path),
+        "calibration_frames": frames,
+        "reference": "vérité terrain" if ground_truth is not None else "CSRT",
+    }
+    return config, trials
+
+
+def save_tuned_config(config, path):
+    """
+    Enregistre la configuration retenue (JSON) pour les lancements suivants.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(config, file, indent=2, ensure_ascii=False)
+
+
+def load_tuned_config(path, source=None):
+    """
+    :param path: Fichier de la configuration.
+    :param source: Source suivie (chemin de vidéo, index de caméra ou URL de flux). Pour une vidéo, la
+                   configuration n'est appliquée que si elle a été réglée sur le même contenu (empreinte
+                   SHA-256, comme `RoiManifest`) : un fichier homonyme ou réencodé ne la reprend pas. Pour
+                   une caméra ou un flux, elle est appliquée avec un avertissement.
+    :return: Configuration enregistrée par `save_tuned_config`, ou None si le fichier n'existe pas ou
+             ne correspond pas à la source.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as file:
+        config = json.load(file)
+
+    if source is None:
+        return config
+    if isinstance(source, int) or not os.path.isfile(source):
+        print(f"Attention : configuration '{path}' réglée sur la vidéo '{config.get('video')}', "
+              f"appliquée à la source {source}.")
+        return config
+    if "video_hash" not in config:
+        print(f"Configuration '{path}' ignorée : pas d'empreinte de la vidéo de réglage, relancer l'auto-réglage.")
+        return None
+    if config["video_hash"] == video_hash(source):
+        return config
+    print(f"Configuration '{path}' ignorée : réglée sur la vidéo '{config.get('video')}', "
+          f"pas sur le contenu de '{os.path.basename(source)}'.")
+    return None
+
+
+def tuned_tracker(config, trackers):
+    """
+    :param config: Configuration de `load_tuned_config`.
+    :param trackers: Dictionnaire {nom: fonction de création} contenant le tracker retenu.
+    :return: Tuple (nom affiché, fonction de création) de la configuration retenue.
+    """
+    tracker_create = tuned_create(trackers[config["tracker"]], config["scale"])
+    name = config["tracker"] if config["scale"] >= 1.0 else f"{config['tracker']}@{config['scale']:g}"
+    return name, tracker_create
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tracking_bench.tuner",
+                                     description="Choix automatique du tracker et de l'échelle pour un budget de latence.")
+    parser.add_argument("video")
+    parser.add_argument("--budget-ms", type=float, default=1000 / 30, help="Budget d'update par frame (ms).")
+    parser.add_argument("--frames", type=int, default=150, help="Longueur du préfixe de calibration.")
+    parser.add_argument("--scales", type=float, nargs="+", default=list(DEFAULT_SCALES))
+    parser.add_argument("--trackers", nargs="+", help="Trackers essayés (par défaut : tous).")
+    parser.add_argument("--min-retention", type=float, default=0.9, help="Rétention d'accroche minimale.")
+    parser.add_argument("--roi", type=int, nargs=4, help="ROI x y w h (par défaut : manifeste ou sélection).")
+    parser.add_argument("--manifest", help="Manifeste des ROI où lire la ROI et la frame de départ.")
+    parser.add_argument("--output", default="tuned_config.json", help="Fichier de la configuration retenue.")
+    args = parser.parse_args(argv)
+
+    start_frame = 0
+    roi = tuple(args.roi) if args.roi else None
+    if roi is None and args.manifest:
+        entry = RoiManifest(args.manifest).resolve(args.video)
+        if entry is not None:
+            roi, start_frame = tuple(entry["roi"]), entry["start_frame"]
+    if roi is None:
+        roi = select_roi(args.video)
+    if roi is None:
+        print("Erreur : Aucune ROI.")
+        return 1
+
+    ground_truth_file = find_ground_truth(args.video)
+    ground_truth = load_ground_truth(ground_truth_file) if ground_truth_file else None
+    trackers = {name: CANDIDATES[name] for name in args.trackers} if args.trackers else CANDIDATES
+
+    print(f"Calibration sur {args.frames} frames de '{args.video}', budget {args.budget_ms:.1f} ms :")
+    config, _ = autotune(args.video, roi, args.budget_ms, trackers, tuple(args.scales), args.frames, start_frame,
+                         ground_truth, args.min_retention)
+    if config is None:
+        print("Aucune configuration ne tient le budget et la rétention demandés.")
+        return 1
+
+    save_tuned_config(config, args.output)
+    print(f"Configuration retenue : {config['tracker']} à l'échelle {config['scale']:g} "
+          f"(update p95 {config['update_p95_ms']:.2f} ms, rétention {config['retention']:.2f}), "
+          f"enregistrée dans : {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
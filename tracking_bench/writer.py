@@ -0,0 +1,68 @@
+import queue
+import threading
+import time
+
+import cv2
+
+
+class AsyncVideoWriter:
+    """
+    Écrivain vidéo qui encode sur un thread séparé.
+
+    `write()` dépose la frame dans une file bornée et rend la main tout de
+    suite ; l'encodage mp4v ne concurrence plus `tracker.update` sur le thread
+    de suivi. Si l'encodeur prend du retard, la file pleine bloque `write()`
+    (contre-pression) au lieu de faire grossir la mémoire. `release()` vide la
+    file et ferme la vidéo proprement.
+
+    La frame passée à `write()` ne doit plus être modifiée par l'appelant. Avec
+    une `FramePool`, elle est rendue à la réserve une fois encodée.
+    """
+
+    def __init__(self, output_path, fourcc, fps, frame_size, queue_size=32, pool=None):
+        """
+        :param output_path: Chemin de la vidéo de sortie.
+        :param fourcc: Code du codec (`cv2.VideoWriter_fourcc`).
+        :param fps: Fréquence d'images de la vidéo de sortie.
+        :param frame_size: Taille des frames (largeur, hauteur).
+        :param queue_size: Nombre maximal de frames en attente d'encodage.
+        :param pool: `FramePool` à laquelle rendre les frames encodées (None : aucune).
+        """
+        self.out = cv2.VideoWriter(output_path, fourcc, fps, frame_size)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.pool = pool
+        self.blocked_time = 0.0  # Temps passé à attendre l'encodeur (s)
+        self.error = None
+        self.thread = threading.Thread(target=self._encode, daemon=True)
+        self.thread.start()
+
+    def isOpened(self):
+        return self.out.isOpened()
+
+    # Boucle du thread d'encodage
+    def _encode(self):
+        while True:
+            frame = self.queue.get()
+            if frame is None:
+                break
+            try:
+                self.out.write(frame)
+            except cv2.error as error:
+                self.error = error
+            if self.pool is not None:
+                self.pool.release(frame)
+
+    def write(self, frame):
+        try:
+            self.queue.put_nowait(frame)
+        except queue.Full:
+            start_time = time.perf_counter()
+            self.queue.put(frame)
+            self.blocked_time += time.perf_counter() - start_time
+
+    def release(self):
+        self.queue.put(None)
+        self.thread.join()
+        self.out.release()
+        if self.error is not None:
+            raise self.error